@@ -0,0 +1,74 @@
+"""
+Benchmark: re-rendering from a saved .nlmbook versus re-parsing the EPUB.
+
+Builds a synthetic EPUB, saves it parsed once, then times converting the
+EPUB to TXT and Markdown against rendering the same outputs from the
+parsed book, and loading the parsed book alone.
+
+Usage:
+    python benchmarks/bench_book_file.py [--chapters 200] [--paragraphs 100]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tests'))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.book_file import read_book_file
+from notebooklm_converter.converter import NotebookLMConverter
+
+WORDS = ["notebook", "chapter", "analysis", "the", "of", "model", "reading", "a", "text", "language"]
+
+
+def timed(function, repeat):
+    """Best wall time of repeat calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--chapters', type=int, default=200)
+    parser.add_argument('--paragraphs', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    chapters = [
+        (f"c{index}.xhtml", chapter_html(f"Chapter {index}", [
+            ' '.join(rng.choice(WORDS) for _ in range(40)) for _ in range(args.paragraphs)
+        ]))
+        for index in range(args.chapters)
+    ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        epub_path = write_epub(os.path.join(temp_dir, "book.epub"), chapters)
+        book_path = os.path.join(temp_dir, "book.nlmbook")
+        outputs = {"TXT": os.path.join(temp_dir, "out.txt"), "MD": os.path.join(temp_dir, "out.md")}
+        converter = NotebookLMConverter()
+
+        parse = timed(lambda: converter.save_parsed(epub_path, book_path), 1)
+        from_epub = timed(lambda: converter.convert_many(epub_path, outputs), args.repeat)
+        from_book = timed(lambda: converter.convert_many(book_path, outputs), args.repeat)
+        load = timed(lambda: sum(len(chapter.blocks) for chapter in read_book_file(book_path).chapters),
+                     args.repeat)
+
+        print(f"EPUB {os.path.getsize(epub_path) / 1e6:.1f} MB, parsed book {os.path.getsize(book_path) / 1e6:.1f} MB")
+        print(f"{'parse and save':<28}{parse:>8.3f} s")
+        print(f"{'TXT+MD from EPUB':<28}{from_epub:>8.3f} s")
+        print(f"{'TXT+MD from parsed book':<28}{from_book:>8.3f} s")
+        print(f"{'load parsed book only':<28}{load:>8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
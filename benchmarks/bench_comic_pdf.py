@@ -0,0 +1,128 @@
+"""
+Benchmark: comic archive to image PDF.
+
+Compares the streaming renderer (serial and with an image thread pool)
+against drawing every page through ReportLab's ImageReader, which decodes
+and re-compresses each image. Each mode runs in a fresh process so the
+reported peak RSS belongs to that mode alone.
+
+Usage:
+    python benchmarks/bench_comic_pdf.py [comic.cbz] [--pages 500] [--workers N]
+
+Without a CBZ argument a synthetic comic is generated (3 JPEG pages for
+every PNG page, 1200x1800 pixels).
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from PIL import Image, ImageDraw
+
+from notebooklm_converter.comic_pdf import default_image_workers, render_comic_pdf
+from notebooklm_converter.comic_reader import ComicArchive
+
+
+def synthetic_comic(path, pages=500, size=(1200, 1800), seed=1):
+    """Write a CBZ of noisy panels, mostly JPEG with every fourth page PNG."""
+    rng = random.Random(seed)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as archive:
+        for index in range(1, pages + 1):
+            image = Image.new('RGB', size, (250, 250, 245))
+            draw = ImageDraw.Draw(image)
+            for _ in range(40):
+                x, y = rng.randrange(size[0]), rng.randrange(size[1])
+                color = tuple(rng.randrange(256) for _ in range(3))
+                draw.rectangle((x, y, x + rng.randrange(50, 400), y + rng.randrange(50, 400)), fill=color, outline=0)
+            buffer = io.BytesIO()
+            if index % 4 == 0:
+                image.save(buffer, 'PNG')
+                name = f"page{index}.png"
+            else:
+                image.save(buffer, 'JPEG', quality=85)
+                name = f"page{index}.jpg"
+            archive.writestr(name, buffer.getvalue())
+
+
+def render_reportlab(comic_path, output_path):
+    """Baseline: one ReportLab canvas page per image via ImageReader."""
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    pdf = canvas.Canvas(output_path)
+    with ComicArchive(comic_path) as comic:
+        for _, data in comic.iter_page_data():
+            image = ImageReader(io.BytesIO(data))
+            width, height = image.getSize()
+            scale = min(612 / width, 792 / height)
+            pdf.setPageSize((width * scale, height * scale))
+            pdf.drawImage(image, 0, 0, width * scale, height * scale)
+            pdf.showPage()
+    pdf.save()
+
+
+def run_mode(mode, comic_path, workers):
+    """Child process: render once and print metrics as JSON."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "out.pdf")
+        start = time.perf_counter()
+        if mode == 'reportlab':
+            render_reportlab(comic_path, output_path)
+        else:
+            render_comic_pdf(comic_path, output_path, workers=1 if mode == 'serial' else workers)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(output_path)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb //= 1024
+    print(json.dumps({'elapsed': elapsed, 'size': size, 'peak_mb': peak_kb / 1024}))
+
+
+def run(comic_path, workers, modes):
+    with ComicArchive(comic_path) as comic:
+        pages = len(comic.pages)
+    print(f"{pages} pages, {os.path.getsize(comic_path) / 1e6:.1f} MB archive, {workers} image workers")
+    print(f"{'mode':<12}{'seconds':>10}{'pages/s':>10}{'PDF MB':>10}{'peak RSS MB':>14}")
+    for mode in modes:
+        output = subprocess.run([sys.executable, __file__, comic_path, '--mode', mode, '--workers', str(workers)],
+                                capture_output=True, text=True, check=True).stdout
+        metrics = json.loads(output.strip().splitlines()[-1])
+        print(f"{mode:<12}{metrics['elapsed']:>10.2f}{pages / metrics['elapsed']:>10.1f}"
+              f"{metrics['size'] / 1e6:>10.1f}{metrics['peak_mb']:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('comic', nargs='?', help="CBZ file (default: synthetic)")
+    parser.add_argument('--pages', type=int, default=500, help="pages in the synthetic comic")
+    parser.add_argument('--workers', type=int, default=default_image_workers())
+    parser.add_argument('--skip-reportlab', action='store_true', help="skip the slow baseline")
+    parser.add_argument('--mode', choices=('reportlab', 'serial', 'pool'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.comic, args.workers)
+        return
+
+    modes = ['serial', 'pool'] if args.skip_reportlab else ['reportlab', 'serial', 'pool']
+    if args.comic:
+        run(args.comic, args.workers, modes)
+        return
+    with tempfile.TemporaryDirectory() as temp_dir:
+        comic_path = os.path.join(temp_dir, "synthetic.cbz")
+        synthetic_comic(comic_path, args.pages)
+        run(comic_path, args.workers, modes)
+
+
+if __name__ == '__main__':
+    main()
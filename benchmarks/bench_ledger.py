@@ -0,0 +1,49 @@
+"""
+Benchmark: job ledger write throughput, batched versus one commit per result.
+
+Records synthetic results for distinct small input files and reports
+results per second for each batch size.
+
+Usage:
+    python benchmarks/bench_ledger.py [--results 20000] [--batch-sizes 1 50 500]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.converter import ConversionResult
+from notebooklm_converter.ledger import JobLedger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--results', type=int, default=20000)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 50, 500])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        inputs = []
+        for index in range(args.results):
+            path = os.path.join(temp_dir, f"book{index}.epub")
+            with open(path, 'wb') as f:
+                f.write(index.to_bytes(4, 'little') * 256)
+            inputs.append(path)
+
+        print(f"{'batch size':>10}{'seconds':>10}{'results/s':>12}")
+        for batch_size in args.batch_sizes:
+            db_path = os.path.join(temp_dir, f"ledger{batch_size}.sqlite")
+            start = time.perf_counter()
+            with JobLedger(db_path, batch_size=batch_size, flush_interval=float('inf')) as ledger:
+                for path in inputs:
+                    ledger.record(ConversionResult(path, path + ".pdf", True, elapsed=0.1, output_format="PDF"))
+            elapsed = time.perf_counter() - start
+            print(f"{batch_size:>10}{elapsed:>10.2f}{args.results / elapsed:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: mixed library through the plain process pool versus the asyncio
+orchestrator.
+
+Calibre is simulated by a stand-in ebook-convert that sleeps for --calibre-seconds
+and copies its input (the "MOBI" files are EPUBs). "pool" runs every book
+in a process pool the way convert_batch() did before the orchestrator, so
+ebook-convert waits happen inside workers; "orchestrator" awaits them on
+an event loop while the workers parse.
+
+Usage:
+    python benchmarks/bench_orchestrator.py [--calibre 6] [--native 12] [--jobs 2]
+"""
+
+import argparse
+import os
+import random
+import stat
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tests'))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.cache import ConversionCache
+from notebooklm_converter.calibre import CALIBRE_BINARY_ENV
+from notebooklm_converter.converter import convert_file_formats
+from notebooklm_converter.orchestrator import orchestrate_batch
+
+WORDS = ["notebook", "chapter", "analysis", "the", "of", "model", "reading", "a", "text", "language"]
+
+STAND_IN_SCRIPT = """#!{python}
+import shutil
+import sys
+import time
+
+time.sleep({seconds})
+shutil.copyfile(sys.argv[1], sys.argv[2])
+"""
+
+
+def pool_batch(input_paths, output_formats, workers, cache):
+    """Every book, Calibre wait included, inside a pool worker."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(convert_file_formats, path, output_formats, cache=cache)
+                   for path in input_paths]
+        return [result for future in futures for result in future.result()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calibre', type=int, default=6, help="books that need ebook-convert")
+    parser.add_argument('--native', type=int, default=12, help="EPUB books")
+    parser.add_argument('--calibre-seconds', type=float, default=1.0)
+    parser.add_argument('--jobs', type=int, default=2)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    chapters = [(f"c{index}.xhtml", chapter_html(f"Chapter {index}", [
+        ' '.join(rng.choice(WORDS) for _ in range(40)) for _ in range(100)
+    ])) for index in range(20)]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        script_path = os.path.join(temp_dir, "ebook-convert")
+        with open(script_path, 'w') as f:
+            f.write(STAND_IN_SCRIPT.format(python=sys.executable, seconds=args.calibre_seconds))
+        os.chmod(script_path, os.stat(script_path).st_mode | stat.S_IEXEC)
+
+        inputs = []
+        total = args.calibre + args.native
+        for index in range(total):
+            # Spread the Calibre books evenly through the library
+            needs_calibre = index * args.calibre // total != (index + 1) * args.calibre // total
+            ext = ".azw3" if needs_calibre else ".epub"
+            path = os.path.join(temp_dir, f"book{index}{ext}")
+            write_epub(path, chapters, title=f"Book {index}")
+            inputs.append(path)
+
+        with mock.patch.dict(os.environ, {CALIBRE_BINARY_ENV: script_path}):
+            print(f"{args.calibre} Calibre + {args.native} native books, {args.jobs} jobs, "
+                  f"ebook-convert {args.calibre_seconds:g} s")
+            for mode in ('pool', 'orchestrator'):
+                # A fresh cache each time so every Calibre book is converted again
+                cache = ConversionCache(os.path.join(temp_dir, f"cache-{mode}"))
+                start = time.perf_counter()
+                if mode == 'pool':
+                    results = pool_batch(inputs, ["TXT"], args.jobs, cache)
+                else:
+                    results = orchestrate_batch(inputs, ["TXT"], workers=args.jobs, cache=cache)
+                elapsed = time.perf_counter() - start
+                failed = sum(1 for result in results if not result.success)
+                print(f"{mode:<14}{elapsed:>8.2f} s  ({failed} failed)")
+
+
+if __name__ == '__main__':
+    main()
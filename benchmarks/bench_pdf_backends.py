@@ -0,0 +1,104 @@
+"""
+Benchmark: every registered PDF backend on the same synthetic corpus.
+
+Each backend renders the same book in a fresh process, so the reported
+peak RSS belongs to that backend alone. Reports wall time, pages per
+second, peak memory and output size.
+
+Usage:
+    python benchmarks/bench_pdf_backends.py [--words 100000] [--backends direct reportlab ...]
+
+The corpus is deterministic: chapters of hard-wrapped paragraphs with the
+occasional section heading, in mixed Latin text.
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter.pdf_backends import available_pdf_backends, get_pdf_backend
+
+WORDS = ["notebook", "chapter", "analysis", "the", "of", "model", "reading", "a", "text", "language",
+         "café", "naïve", "résumé", "and", "(see", "note)", "extraordinary", "is"]
+
+
+def synthetic_book(words, seed=1):
+    """Chapters of 40 paragraphs (20-120 words, wrapped at 12) with a heading every 10."""
+    def chapters():
+        rng = random.Random(seed)
+        remaining = words
+        number = 0
+        while remaining > 0:
+            number += 1
+            blocks = []
+            for index in range(40):
+                if index and index % 10 == 0:
+                    blocks.append(Block(f"Section {number}.{index // 10}", level=2))
+                count = rng.randint(20, 120)
+                paragraph = [rng.choice(WORDS) for _ in range(count)]
+                paragraph[0] = paragraph[0].capitalize()
+                for start in range(0, count, 12):
+                    line = ' '.join(paragraph[start:start + 12])
+                    blocks.append(Block(line + '.' if start + 12 >= count else line))
+                remaining -= count
+            yield Chapter(blocks, title=f"Chapter {number}")
+    return Book(title="Synthetic Book", author="Benchmark", chapters=chapters())
+
+
+def count_pages(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    # The page tree root has the largest /Count in the file
+    return max((int(count) for count in re.findall(rb'/Count\s+(\d+)', data)), default=0)
+
+
+def run_backend(name, words):
+    """Child process: render once and print metrics as JSON."""
+    book = synthetic_book(words)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "out.pdf")
+        start = time.perf_counter()
+        get_pdf_backend(name).render(book, output_path)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(output_path)
+        pages = count_pages(output_path)
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb //= 1024
+    print(json.dumps({'elapsed': elapsed, 'pages': pages, 'size': size, 'peak_mb': peak_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--words', type=int, default=100000, help="size of the synthetic book")
+    parser.add_argument('--backends', nargs='+', default=available_pdf_backends())
+    parser.add_argument('--backend', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.backend:
+        run_backend(args.backend, args.words)
+        return
+
+    print(f"{args.words} words")
+    print(f"{'backend':<12}{'seconds':>10}{'pages':>8}{'pages/s':>10}{'PDF MB':>10}{'peak RSS MB':>14}")
+    for name in args.backends:
+        output = subprocess.run([sys.executable, __file__, '--backend', name, '--words', str(args.words)],
+                                capture_output=True, text=True, check=True).stdout
+        metrics = json.loads(output.strip().splitlines()[-1])
+        print(f"{name:<12}{metrics['elapsed']:>10.2f}{metrics['pages']:>8}"
+              f"{metrics['pages'] / metrics['elapsed']:>10.1f}{metrics['size'] / 1e6:>10.2f}"
+              f"{metrics['peak_mb']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: peak memory of ReportLab PDF output as books grow.
+
+Renders synthetic books of increasing size twice, each time in a fresh
+process: once building the full story list up front (the old behaviour)
+and once through the streaming FlowableStream writer. Peak RSS of the
+list build grows with every paragraph; the streaming build only grows by
+the finished page streams ReportLab's canvas keeps until save().
+
+Usage:
+    python benchmarks/bench_pdf_memory.py [--words 250000 1000000 2000000]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter.reportlab_pdf import iter_book_flowables, write_book_pdf
+
+WORDS = ["notebook", "chapter", "analysis", "the", "of", "model", "reading", "a", "text", "language"]
+WORDS_PER_PARAGRAPH = 20
+PARAGRAPHS_PER_CHAPTER = 100
+
+
+def synthetic_book(words, seed=1):
+    """A Book whose chapters are generated lazily, like read_book() returns."""
+    def chapters():
+        rng = random.Random(seed)
+        paragraphs = words // WORDS_PER_PARAGRAPH
+        for start in range(0, paragraphs, PARAGRAPHS_PER_CHAPTER):
+            count = min(PARAGRAPHS_PER_CHAPTER, paragraphs - start)
+            blocks = [Block(' '.join(rng.choice(WORDS) for _ in range(WORDS_PER_PARAGRAPH)) + '.')
+                      for _ in range(count)]
+            yield Chapter(blocks, title=f"Chapter {start // PARAGRAPHS_PER_CHAPTER + 1}")
+    return Book(title="Synthetic Book", author="Benchmark", chapters=chapters())
+
+
+def render_list(book, output_path):
+    """Old behaviour: every flowable in one story list, then doc.build()."""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+
+    doc = SimpleDocTemplate(output_path, pagesize=letter)
+    doc.build(list(iter_book_flowables(book)))
+
+
+def run_mode(mode, words):
+    """Child process: render once and print metrics as JSON."""
+    book = synthetic_book(words)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "out.pdf")
+        start = time.perf_counter()
+        if mode == 'list':
+            render_list(book, output_path)
+        else:
+            write_book_pdf(book, output_path)
+        elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb //= 1024
+    print(json.dumps({'elapsed': elapsed, 'peak_mb': peak_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--words', type=int, nargs='+', default=[250000, 1000000, 2000000])
+    parser.add_argument('--mode', choices=('list', 'stream'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.words[0])
+        return
+
+    print(f"{'words':>10}{'mode':>8}{'seconds':>10}{'peak RSS MB':>14}")
+    for words in args.words:
+        for mode in ('list', 'stream'):
+            output = subprocess.run([sys.executable, __file__, '--mode', mode, '--words', str(words)],
+                                    capture_output=True, text=True, check=True).stdout
+            metrics = json.loads(output.strip().splitlines()[-1])
+            print(f"{words:>10}{mode:>8}{metrics['elapsed']:>10.2f}{metrics['peak_mb']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
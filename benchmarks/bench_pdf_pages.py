@@ -0,0 +1,112 @@
+"""
+Benchmark: ReportLab PDF throughput before and after paragraph batching.
+
+"before" is the previous renderer: a fresh getSampleStyleSheet() per
+conversion and an escaped, parsed Paragraph plus a Spacer(1, 12) for every
+line. "after" is write_book_pdf(): hard-wrapped lines merged into
+paragraphs, style spacing instead of Spacers, cached styles and no markup
+parsing.
+
+Usage:
+    python benchmarks/bench_pdf_pages.py [book.epub] [--words 200000] [--repeat N]
+
+Without an EPUB argument a synthetic book with hard-wrapped paragraphs is
+generated.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter.epub_reader import read_book
+from notebooklm_converter.reportlab_pdf import write_book_pdf
+
+WORDS = ["notebook", "chapter", "analysis", "the", "of", "model", "reading", "a", "text", "language"]
+
+
+def synthetic_book(words, seed=1):
+    """Paragraphs of 20-120 words, hard-wrapped at about 12 words per line."""
+    rng = random.Random(seed)
+    chapters = []
+    remaining = words
+    while remaining > 0:
+        blocks = []
+        for _ in range(60):
+            count = rng.randint(20, 120)
+            paragraph = [rng.choice(WORDS) for _ in range(count)]
+            paragraph[0] = paragraph[0].capitalize()
+            for start in range(0, count, 12):
+                line = ' '.join(paragraph[start:start + 12])
+                blocks.append(Block(line + '.' if start + 12 >= count else line))
+            remaining -= count
+        chapters.append(Chapter(blocks, title=f"Chapter {len(chapters) + 1}"))
+    return Book(title="Synthetic Book", author="Benchmark", chapters=chapters)
+
+
+def render_before(book, output_path):
+    """Previous renderer, kept here as the baseline."""
+    doc = SimpleDocTemplate(output_path, pagesize=letter)
+    styles = getSampleStyleSheet()
+    story = []
+    if book.title:
+        story.append(Paragraph(escape(book.title), styles['Title']))
+    if book.author:
+        story.append(Paragraph(escape(f"Author: {book.author}"), styles['Normal']))
+        story.append(Spacer(1, 12))
+    for chapter in book.chapters:
+        if chapter.title:
+            story.append(Paragraph(escape(chapter.title), styles[f'Heading{chapter.level}']))
+        for block in chapter.blocks:
+            style = styles[f'Heading{block.level}'] if block.level else styles['Normal']
+            story.append(Paragraph(escape(block.text), style))
+            story.append(Spacer(1, 12))
+    doc.build(story)
+
+
+def count_pages(path):
+    with open(path, 'rb') as f:
+        return len(re.findall(rb'/Type /Page\b(?!s)', f.read()))
+
+
+def run(book, repeat):
+    print(f"{'renderer':<10}{'seconds':>10}{'pages':>8}{'pages/s':>10}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, render in (('before', render_before), ('after', write_book_pdf)):
+            output_path = os.path.join(temp_dir, f"{name}.pdf")
+            best = float('inf')
+            for _ in range(repeat):
+                start = time.perf_counter()
+                render(book, output_path)
+                best = min(best, time.perf_counter() - start)
+            pages = count_pages(output_path)
+            print(f"{name:<10}{best:>10.2f}{pages:>8}{pages / best:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('epub', nargs='?', help="EPUB file (default: synthetic book)")
+    parser.add_argument('--words', type=int, default=200000, help="size of the synthetic book")
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    if args.epub:
+        book = read_book(args.epub).materialize()
+    else:
+        book = synthetic_book(args.words)
+    run(book, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
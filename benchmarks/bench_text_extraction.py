@@ -0,0 +1,81 @@
+"""
+Benchmark: BeautifulSoup vs streaming lxml chapter text extraction.
+
+Usage:
+    python benchmarks/bench_text_extraction.py [book.epub] [--repeat N]
+
+Without an EPUB argument a synthetic chapter set is generated.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.epub_reader import EpubReader
+from notebooklm_converter.text_extraction import extract_text_bs4, extract_text_lxml
+
+WORDS = ["notebook", "chapter", "<em>analysis</em>", "the", "of", "&amp;", "<b>model</b>", "reading", "a", "text"]
+
+
+def synthetic_documents(chapters=40, paragraphs=200, seed=1):
+    """Generate XHTML chapters with inline markup, scripts and styles."""
+    rng = random.Random(seed)
+    documents = []
+    for index in range(chapters):
+        body = "\n".join(
+            "<p>" + " ".join(rng.choice(WORDS) for _ in range(60)) + "</p>"
+            for _ in range(paragraphs)
+        )
+        documents.append((
+            f"chapter{index}.xhtml",
+            (f'<?xml version="1.0" encoding="utf-8"?>\n<html xmlns="http://www.w3.org/1999/xhtml">'
+             f'<head><title>Chapter {index}</title><style>p {{ margin: 0; }}</style></head>'
+             f'<body><h1>Chapter {index}</h1>\n{body}\n<script>var x = {index};</script></body></html>').encode('utf-8'),
+        ))
+    return documents
+
+
+def epub_documents(path):
+    """Load the spine documents of a real EPUB into memory."""
+    with EpubReader(path) as reader:
+        return list(reader.iter_documents())
+
+
+def run(engine, documents, repeat):
+    """Return the best wall time over repeat runs and the extracted size."""
+    best = float('inf')
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = sum(len(engine(data)) for _, data in documents)
+        best = min(best, time.perf_counter() - start)
+    return best, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('epub', nargs='?', help="EPUB file to benchmark (default: synthetic corpus)")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    warnings.simplefilter('ignore')
+    documents = epub_documents(args.epub) if args.epub else synthetic_documents()
+    total_bytes = sum(len(data) for _, data in documents)
+    print(f"{len(documents)} documents, {total_bytes / 1e6:.1f} MB of markup")
+
+    results = {}
+    for name, engine in (("bs4", extract_text_bs4), ("lxml", extract_text_lxml)):
+        elapsed, size = run(engine, documents, args.repeat)
+        results[name] = elapsed
+        print(f"{name:>5}: {elapsed * 1000:8.1f} ms  {total_bytes / 1e6 / elapsed:6.1f} MB/s  {size} chars")
+
+    print(f"speedup: {results['bs4'] / results['lxml']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: console plain-text PDF rendering.
+
+"drawString" is the previous console renderer: simpleSplit() on every line
+and one positioned drawString() per wrapped line. "textobject" is
+write_text_pdf(): one text object per page and cached word widths.
+
+Usage:
+    python benchmarks/bench_text_pdf.py [book.epub] [--words 1000000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from notebooklm_converter.console import NotebookLMConverterConsole
+from notebooklm_converter.epub_reader import read_book
+from notebooklm_converter.text_pdf import write_text_pdf
+
+WORDS = ["notebook", "chapter", "analysis", "the", "of", "model", "reading", "a", "text", "language",
+         "extraordinary", "is", "NotebookLM", "converter", "pages", "and"]
+
+
+def synthetic_lines(words, seed=1):
+    """Paragraph lines of 20-200 words with a blank line every 50 paragraphs."""
+    rng = random.Random(seed)
+    lines = []
+    while words > 0:
+        count = rng.randint(20, 200)
+        lines.append(' '.join(rng.choice(WORDS) for _ in range(count)) + '.')
+        if len(lines) % 50 == 0:
+            lines.append('')
+        words -= count
+    return lines
+
+
+def render_drawstring(lines, output_path):
+    """Previous renderer, kept here as the baseline."""
+    c = canvas.Canvas(str(output_path), pagesize=letter)
+    width, height = letter
+    y_position = height - 50
+    for line in lines:
+        if y_position < 50:
+            c.showPage()
+            y_position = height - 50
+        for wrapped_line in simpleSplit(line, "Helvetica", 12, width - 100):
+            if y_position < 50:
+                c.showPage()
+                y_position = height - 50
+            c.drawString(50, y_position, wrapped_line)
+            y_position -= 15
+    c.save()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('epub', nargs='?', help="EPUB file (default: synthetic text)")
+    parser.add_argument('--words', type=int, default=1000000, help="size of the synthetic text")
+    args = parser.parse_args()
+
+    if args.epub:
+        book = read_book(args.epub).materialize()
+        lines = list(NotebookLMConverterConsole()._iter_lines(book))
+    else:
+        lines = synthetic_lines(args.words)
+
+    print(f"{'renderer':<12}{'seconds':>10}{'PDF MB':>10}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name, render in (('drawString', render_drawstring), ('textobject', write_text_pdf)):
+            output_path = os.path.join(temp_dir, f"{name}.pdf")
+            start = time.perf_counter()
+            render(lines, output_path)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<12}{elapsed:>10.2f}{os.path.getsize(output_path) / 1e6:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: peak memory of TXT and Markdown output as books grow.
+
+"join" builds the whole output string first, as the converter used to;
+"stream" writes through the streaming writers. Each run is a fresh
+process, and chapters are generated lazily like read_book() returns them,
+so peak RSS reflects only what the writer holds on to.
+
+Usage:
+    python benchmarks/bench_text_writers.py [--words 1000000 4000000]
+"""
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter.text_writers import (
+    PARAGRAPH_SEPARATOR,
+    iter_markdown_lines,
+    iter_text_lines,
+    markdown_header,
+    text_header,
+    write_notebooklm_markdown,
+    write_notebooklm_txt,
+)
+
+WORDS = ["notebook", "chapter", "analysis", "the", "of", "model", "reading", "a", "text", "language"]
+TIMESTAMP = "2024-01-01 00:00:00"
+
+
+def synthetic_book(words, seed=1):
+    """A Book of 100-paragraph chapters generated lazily."""
+    def chapters():
+        rng = random.Random(seed)
+        for start in range(0, words // 20, 100):
+            blocks = [Block(' '.join(rng.choice(WORDS) for _ in range(20)) + '.') for _ in range(100)]
+            yield Chapter(blocks, title=f"Chapter {start // 100 + 1}")
+    return Book(title="Synthetic Book", author="Benchmark", chapters=chapters())
+
+
+def write_joined(book, output_path, fmt):
+    """Old behaviour: format the whole document as one string, then write it."""
+    if fmt == 'txt':
+        content = PARAGRAPH_SEPARATOR.join(iter_text_lines(book))
+        content = text_header(TIMESTAMP, f"{len(content)} characters") + content
+    else:
+        content = markdown_header(TIMESTAMP) + PARAGRAPH_SEPARATOR.join(iter_markdown_lines(book))
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def run_mode(mode, fmt, words):
+    """Child process: write once and print metrics as JSON."""
+    book = synthetic_book(words)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, f"out.{fmt}")
+        start = time.perf_counter()
+        if mode == 'join':
+            write_joined(book, output_path, fmt)
+        elif fmt == 'txt':
+            write_notebooklm_txt(book, output_path, TIMESTAMP)
+        else:
+            write_notebooklm_markdown(book, output_path, TIMESTAMP)
+        elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        peak_kb //= 1024
+    print(json.dumps({'elapsed': elapsed, 'peak_mb': peak_kb / 1024}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--words', type=int, nargs='+', default=[1000000, 4000000])
+    parser.add_argument('--mode', choices=('join', 'stream'), help=argparse.SUPPRESS)
+    parser.add_argument('--format', choices=('txt', 'md'), default='txt', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.format, args.words[0])
+        return
+
+    print(f"{'words':>10}{'format':>8}{'mode':>8}{'seconds':>10}{'peak RSS MB':>14}")
+    for words in args.words:
+        for fmt in ('txt', 'md'):
+            for mode in ('join', 'stream'):
+                output = subprocess.run([sys.executable, __file__, '--mode', mode, '--format', fmt,
+                                         '--words', str(words)],
+                                        capture_output=True, text=True, check=True).stdout
+                metrics = json.loads(output.strip().splitlines()[-1])
+                print(f"{words:>10}{fmt:>8}{mode:>8}{metrics['elapsed']:>10.2f}{metrics['peak_mb']:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,26 +7,24 @@
 # Open Command Prompt (cmd) or PowerShell and run:
 # pip install EbookLib beautifulsoup4 lxml xhtml2pdf markdown pillow rarfile
 # 
-# For MOBI/AZW/KFX support, also install Calibre:
+# For KFX support (and MOBI/AZW files the built-in reader cannot open), also install Calibre:
 # Download from: https://calibre-ebook.com/download
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
-from xhtml2pdf import pisa
-import markdown
 import os
-import base64
 import threading
-import re
-import subprocess
 import sys
-import zipfile
-import tempfile
-from PIL import Image
-import io
+
+# Shared extraction code lives in the notebooklm_converter package
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+from notebooklm_converter.calibre import calibre_available, get_bridge
+from notebooklm_converter.comic_reader import ComicArchive
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter.epub_reader import read_book
+from notebooklm_converter.mobi_reader import UnsupportedMobiError, read_mobi
+from notebooklm_converter.pdf_backends import render_pdf
+from notebooklm_converter.text_writers import write_notebooklm_markdown, write_notebooklm_txt
 
 class NotebookLMConverterApp:
     def __init__(self, root):
@@ -268,12 +266,13 @@ class NotebookLMConverterApp:
                 raise Exception(f"Unsupported file format: {file_ext}")
             
             # Convert to output format
-            if output_format == "PDF":
-                self.create_notebooklm_pdf(book_content, output_path)
-            elif output_format == "TXT":
-                self.create_notebooklm_txt(book_content, output_path)
-            elif output_format == "MD":
-                self.create_notebooklm_markdown(book_content, output_path)
+            with book_content:
+                if output_format == "PDF":
+                    self.create_notebooklm_pdf(book_content, output_path)
+                elif output_format == "TXT":
+                    self.create_notebooklm_txt(book_content, output_path)
+                elif output_format == "MD":
+                    self.create_notebooklm_markdown(book_content, output_path)
             
             return True
 
@@ -286,330 +285,110 @@ class NotebookLMConverterApp:
         Extract content from EPUB file.
         """
         try:
-            book = epub.read_epub(epub_path)
-            return self.extract_text_content_from_epub(book)
+            return read_book(epub_path)
         except Exception as e:
             raise Exception(f"Error reading EPUB file: {str(e)}")
 
     def extract_from_mobi(self, mobi_path):
         """
-        Extract content from MOBI/AZW/AZW3 file using Calibre.
+        Extract content from MOBI/AZW/AZW3 file, natively when possible.
         """
         try:
-            # Convert MOBI to temporary EPUB for extraction
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_epub = os.path.join(temp_dir, "temp.epub")
-                
-                result = subprocess.run(['ebook-convert', mobi_path, temp_epub], 
-                                      capture_output=True, text=True, shell=True)
-                if result.returncode != 0:
-                    raise Exception(f"MOBI conversion error: {result.stderr}")
-                
-                return self.extract_from_epub(temp_epub)
-        except FileNotFoundError:
+            return read_mobi(mobi_path)
+        except UnsupportedMobiError:
+            pass  # DRM or HUFF/CDIC books still need Calibre
+
+        if not calibre_available():
             raise Exception("Calibre is not installed. Please install Calibre to process MOBI/AZW files.")
+        try:
+            # Converted once through Calibre, then served from the EPUB cache
+            epub_path = get_bridge().to_epub(mobi_path)
+        except Exception as e:
+            raise Exception(f"MOBI conversion error: {str(e)}")
+
+        # Read all chapters now; the cached EPUB may be evicted later
+        return self.extract_from_epub(epub_path).materialize()
 
     def extract_from_kfx(self, kfx_path):
         """
         Extract content from KFX file (requires Calibre with KFX plugin).
         """
-        try:
-            # Similar to MOBI, requires Calibre
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_epub = os.path.join(temp_dir, "temp.epub")
-                
-                result = subprocess.run(['ebook-convert', kfx_path, temp_epub], 
-                                      capture_output=True, text=True, shell=True)
-                if result.returncode != 0:
-                    raise Exception(f"KFX conversion error: {result.stderr}")
-                
-                return self.extract_from_epub(temp_epub)
-        except FileNotFoundError:
+        if not calibre_available():
             raise Exception("Calibre with KFX plugin is not installed.")
-
-    def extract_from_ibooks(self, ibooks_path):
-        """
-        Extract content from iBooks file.
-        """
         try:
-            # iBooks files are essentially EPUB files
-            return self.extract_from_epub(ibooks_path)
+            # Converted once through Calibre, then served from the EPUB cache
+            epub_path = get_bridge().to_epub(kfx_path)
         except Exception as e:
-            raise Exception(f"Error reading iBooks file: {str(e)}")
+            raise Exception(f"KFX conversion error: {str(e)}")
 
-    def extract_from_comic(self, comic_path):
-        """
-        Extract content from comic book archive (CBR/CBZ).
-        """
-        try:
-            import zipfile
-            from PIL import Image
-            import io
-            
-            file_ext = os.path.splitext(comic_path)[1].lower()
-            image_files = []
-            
-            if file_ext == '.cbz':
-                with zipfile.ZipFile(comic_path, 'r') as zip_file:
-                    for file_info in zip_file.infolist():
-                        if file_info.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp')):
-                            image_data = zip_file.read(file_info.filename)
-                            image_files.append((file_info.filename, image_data))
-            
-            elif file_ext == '.cbr':
-                try:
-                    import rarfile
-                    with rarfile.RarFile(comic_path, 'r') as rar_file:
-                        for file_info in rar_file.infolist():
-                            if file_info.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp')):
-                                image_data = rar_file.read(file_info.filename)
-                                image_files.append((file_info.filename, image_data))
-                except ImportError:
-                    raise Exception("rarfile library is not installed. Please install it with: pip install rarfile")
-            
-            # Convert images to text representation for NotebookLM
-            content = {
-                'title': os.path.splitext(os.path.basename(comic_path))[0],
-                'author': 'Unknown',
-                'chapters': []
-            }
-            
-            # Sort by filename
-            image_files.sort(key=lambda x: x[0])
-            
-            for i, (filename, image_data) in enumerate(image_files, 1):
-                content['chapters'].append({
-                    'title': f'Page {i}',
-                    'content': f'[Image: {filename}]\n\nThis is page {i} of the comic book. The original content is visual and cannot be converted to text format suitable for NotebookLM analysis.'
-                })
-            
-            return content
-            
-        except Exception as e:
-            raise Exception(f"Error reading comic file: {str(e)}")
+        # Read all chapters now; the cached EPUB may be evicted later
+        return self.extract_from_epub(epub_path).materialize()
 
     def extract_from_ibooks(self, ibooks_path):
         """
-        Trích xuất nội dung từ file iBooks (thường là EPUB với extension khác).
+        Extract content from iBooks file.
         """
         try:
-            # iBooks thường là EPUB với extension khác
+            # iBooks files are essentially EPUB files
             return self.extract_from_epub(ibooks_path)
         except Exception as e:
-            raise Exception(f"Lỗi đọc file iBooks: {str(e)}")
+            raise Exception(f"Error reading iBooks file: {str(e)}")
 
     def extract_from_comic(self, comic_path):
         """
         Trích xuất nội dung từ comic book archive (CBR/CBZ).
         """
         try:
-            extracted_text = f"# Comic Book: {os.path.basename(comic_path)}\n\n"
+            book = Book(title=f"Comic Book: {os.path.basename(comic_path)}", source=comic_path)
             
             if comic_path.lower().endswith('.cbz'):
-                # CBZ là file ZIP
-                with zipfile.ZipFile(comic_path, 'r') as zip_ref:
-                    file_list = sorted([f for f in zip_ref.namelist() if f.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp'))])
-                    extracted_text += f"Tổng số trang: {len(file_list)}\n\n"
-                    for i, filename in enumerate(file_list, 1):
-                        extracted_text += f"## Trang {i}: {filename}\n\n"
+                # CBZ là file ZIP; chỉ đọc danh mục trang, không đọc dữ liệu ảnh
+                with ComicArchive(comic_path) as comic:
+                    book.chapters.append(Chapter([Block(f"Tổng số trang: {len(comic.pages)}")]))
+                    for page in comic.pages:
+                        book.chapters.append(Chapter(title=f"Trang {page.number}: {page.name}", level=2, href=page.name))
             elif comic_path.lower().endswith('.cbr'):
                 # CBR là file RAR - cần thư viện xử lý RAR
-                extracted_text += "Đây là file comic book RAR. Cần công cụ đặc biệt để trích xuất.\n"
+                book.chapters.append(Chapter([Block("Đây là file comic book RAR. Cần công cụ đặc biệt để trích xuất.")]))
             
-            return extracted_text
+            return book
         except Exception as e:
             raise Exception(f"Lỗi đọc comic book: {str(e)}")
 
-    def extract_text_content_from_epub(self, book):
-        """
-        Extract text content from EPUB book object optimized for NotebookLM.
-        """
-        text_content = ""
-        
-        # Add metadata headers for NotebookLM
-        title = book.get_metadata('DC', 'title')
-        creator = book.get_metadata('DC', 'creator')
-        
-        if title:
-            text_content += f"# {title[0][0]}\n\n"
-        if creator:
-            text_content += f"**Author:** {creator[0][0]}\n\n"
-        
-        text_content += "---\n\n"
-        
-        for item_id in book.spine:
-            item = book.get_item_with_id(item_id[0])
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                soup = BeautifulSoup(item.get_content(), 'lxml')
-                # Remove script and style tags
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # Special processing for NotebookLM optimization
-                text = soup.get_text()
-                # Clean text for NotebookLM
-                text = re.sub(r'\n\s*\n', '\n\n', text)  # Remove excessive blank lines
-                text = re.sub(r' +', ' ', text)  # Remove excessive spaces
-                text_content += text + "\n\n"
-        
-        return text_content
-
-    def create_notebooklm_pdf(self, content, output_path):
+    def create_notebooklm_pdf(self, book, output_path):
         """
         Create PDF optimized for NotebookLM.
         """
         try:
-            # Create HTML with CSS optimized for NotebookLM
-            html_content = f"""
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{
-                        font-family: 'Times New Roman', serif;
-                        font-size: 12pt;
-                        line-height: 1.6;
-                        margin: 2cm;
-                        color: #333;
-                    }}
-                    h1, h2, h3, h4, h5, h6 {{
-                        color: #2c3e50;
-                        margin-top: 1.5em;
-                        margin-bottom: 0.5em;
-                    }}
-                    h1 {{ font-size: 24pt; border-bottom: 2px solid #3498db; }}
-                    h2 {{ font-size: 18pt; }}
-                    h3 {{ font-size: 14pt; }}
-                    p {{ margin-bottom: 1em; text-align: justify; }}
-                    .chapter {{ page-break-before: always; }}
-                </style>
-            </head>
-            <body>
-                <div class="content">
-                    {self.format_content_for_html(content)}
-                </div>
-            </body>
-            </html>
-            """
-            
-            with open(output_path, "w+b") as pdf_file:
-                pisa_status = pisa.CreatePDF(html_content, dest=pdf_file, encoding='UTF-8')
-
-            if pisa_status.err:
-                raise Exception(f"Error creating PDF: {pisa_status.err}")
+            # xhtml2pdf unless another backend is selected in the environment
+            render_pdf(book, output_path, default='xhtml2pdf')
                 
         except Exception as e:
             raise Exception(f"Error creating PDF for NotebookLM: {str(e)}")
 
-    def create_notebooklm_txt(self, content, output_path):
+    def create_notebooklm_txt(self, book, output_path):
         """
         Create TXT optimized for NotebookLM.
         """
         try:
-            # Clean and format text for NotebookLM
-            optimized_content = self.optimize_text_for_notebooklm(content)
-            
-            with open(output_path, 'w', encoding='utf-8') as txt_file:
-                txt_file.write(optimized_content)
+            # Cleaned lines are written as they are produced; the header's
+            # content length is patched in afterwards
+            write_notebooklm_txt(book, output_path, self.get_current_timestamp())
                 
         except Exception as e:
             raise Exception(f"Error creating TXT for NotebookLM: {str(e)}")
 
-    def create_notebooklm_markdown(self, content, output_path):
+    def create_notebooklm_markdown(self, book, output_path):
         """
         Create Markdown optimized for NotebookLM.
         """
         try:
-            # Convert content to structured Markdown
-            markdown_content = self.format_content_for_markdown(content)
-            
-            with open(output_path, 'w', encoding='utf-8') as md_file:
-                md_file.write(markdown_content)
+            # Structured Markdown, written line by line
+            write_notebooklm_markdown(book, output_path, self.get_current_timestamp())
                 
         except Exception as e:
             raise Exception(f"Error creating Markdown for NotebookLM: {str(e)}")
 
-    def optimize_text_for_notebooklm(self, content):
-        """
-        Optimize text for NotebookLM analysis.
-        """
-        # Clean content
-        lines = content.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line:  # Skip empty lines
-                # Remove unnecessary special characters
-                line = re.sub(r'[^\w\s\.\,\!\?\:\;\-\(\)\[\]\{\}\"\'\/]', '', line)
-                cleaned_lines.append(line)
-        
-        # Reassemble with structure suitable for AI
-        optimized_content = '\n\n'.join(cleaned_lines)
-        
-        # Add header for NotebookLM
-        header = f"""DOCUMENT OPTIMIZED FOR NOTEBOOKLM
-Generated: {self.get_current_timestamp()}
-Content Length: {len(optimized_content)} characters
-
----
-
-"""
-        
-        return header + optimized_content
-
-    def format_content_for_html(self, content):
-        """
-        Format content for HTML output.
-        """
-        # Convert basic markdown-like syntax to HTML
-        html_content = content.replace('\n\n', '</p><p>')
-        html_content = f'<p>{html_content}</p>'
-        
-        # Convert headers
-        html_content = re.sub(r'<p># ([^<]+)</p>', r'<h1>\1</h1>', html_content)
-        html_content = re.sub(r'<p>## ([^<]+)</p>', r'<h2>\1</h2>', html_content)
-        html_content = re.sub(r'<p>### ([^<]+)</p>', r'<h3>\1</h3>', html_content)
-        
-        # Convert bold/italic
-        html_content = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', html_content)
-        html_content = re.sub(r'\*([^*]+)\*', r'<em>\1</em>', html_content)
-        
-        return html_content
-
-    def format_content_for_markdown(self, content):
-        """
-        Format content for Markdown output optimized for NotebookLM.
-        """
-        # Add metadata for NotebookLM
-        markdown_header = f"""---
-title: "Document for NotebookLM"
-format: "Markdown"
-generated: "{self.get_current_timestamp()}"
----
-
-# Document for NotebookLM Analysis
-
-"""
-        
-        # Improve Markdown structure
-        lines = content.split('\n')
-        formatted_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line:
-                # Detect and format headers
-                if line.startswith('#'):
-                    formatted_lines.append(line)
-                elif len(line) > 50 and not line.endswith('.'):
-                    # Might be a title
-                    formatted_lines.append(f"## {line}")
-                else:
-                    formatted_lines.append(line)
-                    
-        return markdown_header + '\n\n'.join(formatted_lines)
-
     def get_current_timestamp(self):
         """
         Get current timestamp.
@@ -3,7 +3,11 @@ Entry point for running NotebookLM Converter as a module.
 This allows the package to be executed with: python -m notebooklm_converter
 """
 
+import multiprocessing
+
 from .app import main
 
 if __name__ == "__main__":
+    # Needed for process pools in frozen (Briefcase) builds
+    multiprocessing.freeze_support()
     main()
@@ -28,8 +28,14 @@ else:
 def main():
     """
     Main entry point for the NotebookLM Converter application.
+    With command line arguments, runs the headless batch CLI instead
+    (or the single-file console converter for '<input> <format> ...').
     Falls back to console mode if GUI is not available.
     """
+    if len(sys.argv) > 1:
+        from .cli import main as cli_main
+        sys.exit(cli_main())
+
     try:
         # Force GUI mode for Windows builds
         if platform.system() == "Windows" and TKINTER_AVAILABLE:
@@ -58,7 +64,7 @@ def main():
         else:
             # Console mode fallback
             print("Starting console mode...")
-            console_main()
+            sys.exit(console_main())
     except Exception as e:
         print(f"Error starting NotebookLM Converter: {e}")
         sys.exit(1)
@@ -0,0 +1,215 @@
+"""
+Binary intermediate format for parsed books (.nlmbook).
+
+A parsed Book is saved once and can then be rendered to any output with
+any writer settings without reading the original ebook again. The file is
+memory-mapped on load: the header index gives each chapter's position, so
+a chapter is decoded straight from its slice of the mapping only when a
+writer asks for it, and nothing else of the file is read.
+
+Layout (all integers little-endian):
+
+    header      magic, version, flags, chapter count, index offset
+    metadata    u32 length + UTF-8 JSON {"title", "author", "source"}
+    chapters    u32 length + chapter record, one per chapter
+    index       (u64 record offset, u32 record length) per chapter
+
+A chapter record is its level, the byte lengths of its title and href
+(NO_STRING for None), its block count, then the title and href, one u32
+end offset (in characters of the chapter text) per block, one u8 level
+per block, and finally the UTF-8 text of all blocks concatenated.
+
+The header is written last, so a file whose writer was interrupted has
+no index and is rejected on load.
+"""
+
+import json
+import mmap
+import struct
+
+from .document import Block, Book, Chapter
+
+
+BOOK_FILE_EXTENSION = '.nlmbook'
+BOOK_FILE_MAGIC = b'NLMBOOK\0'
+BOOK_FILE_VERSION = 1
+
+HEADER = struct.Struct('<8sHHIQ')
+LENGTH = struct.Struct('<I')
+CHAPTER_HEADER = struct.Struct('<BxxxIII')
+INDEX_ENTRY = struct.Struct('<QI')
+NO_STRING = 0xFFFFFFFF
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def _encode_optional(text):
+    return None if text is None else text.encode('utf-8')
+
+
+def encode_chapter(chapter):
+    """Serialize one Chapter to a chapter record (without its length prefix)."""
+    title = _encode_optional(chapter.title)
+    href = _encode_optional(chapter.href)
+    ends = []
+    levels = bytearray()
+    end = 0
+    for block in chapter.blocks:
+        end += len(block.text)
+        ends.append(end)
+        levels.append(block.level)
+    text = ''.join(block.text for block in chapter.blocks).encode('utf-8')
+
+    return b''.join((
+        CHAPTER_HEADER.pack(chapter.level,
+                            NO_STRING if title is None else len(title),
+                            NO_STRING if href is None else len(href),
+                            len(ends)),
+        title or b'',
+        href or b'',
+        struct.pack(f'<{len(ends)}I', *ends),
+        levels,
+        text,
+    ))
+
+
+def write_book_file(book, output_path, source=None):
+    """
+    Stream a Book to output_path in the .nlmbook format, one chapter at a
+    time. source defaults to book.source. Returns the number of chapters.
+    """
+    metadata = json.dumps({
+        'title': book.title,
+        'author': book.author,
+        'source': source if source is not None else book.source,
+    }).encode('utf-8')
+
+    index = []
+    with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(bytes(HEADER.size))
+        f.write(LENGTH.pack(len(metadata)))
+        f.write(metadata)
+        for chapter in book.chapters:
+            record = encode_chapter(chapter)
+            f.write(LENGTH.pack(len(record)))
+            index.append((f.tell(), len(record)))
+            f.write(record)
+
+        index_offset = f.tell()
+        for entry in index:
+            f.write(INDEX_ENTRY.pack(*entry))
+        f.seek(0)
+        f.write(HEADER.pack(BOOK_FILE_MAGIC, BOOK_FILE_VERSION, 0, len(index), index_offset))
+    return len(index)
+
+
+class BookFile:
+    """
+    Memory-mapped reader over a .nlmbook file.
+
+    Usage:
+        with BookFile(path) as book_file:
+            for chapter in book_file:
+                ...
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise Exception(f"Not a parsed book file: {path}")  # Empty file
+        self._view = memoryview(self._mmap)
+        try:
+            self._load()
+        except Exception:
+            self.close()
+            raise
+
+    def _load(self):
+        """Check the header, then read the metadata and the chapter index."""
+        size = len(self._mmap)
+        if size < HEADER.size:
+            raise Exception(f"Not a parsed book file: {self.path}")
+        magic, version, _, count, index_offset = HEADER.unpack_from(self._view)
+        if magic != BOOK_FILE_MAGIC:
+            raise Exception(f"Not a parsed book file: {self.path}")
+        if version != BOOK_FILE_VERSION:
+            raise Exception(f"Unsupported parsed book version {version}: {self.path}")
+        if not index_offset or index_offset + count * INDEX_ENTRY.size > size:
+            raise Exception(f"Incomplete parsed book file: {self.path}")
+
+        (length,) = LENGTH.unpack_from(self._view, HEADER.size)
+        start = HEADER.size + LENGTH.size
+        metadata = json.loads(str(self._view[start:start + length], 'utf-8'))
+        self.title = metadata.get('title')
+        self.author = metadata.get('author')
+        self.source = metadata.get('source')  # The ebook the file was parsed from
+
+        index_end = index_offset + count * INDEX_ENTRY.size
+        self.index = list(INDEX_ENTRY.iter_unpack(self._view[index_offset:index_end]))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release the mapping. Chapters already returned stay valid."""
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            self._mmap.close()
+
+    def __len__(self):
+        return len(self.index)
+
+    def _string(self, offset, length):
+        if length == NO_STRING:
+            return None, offset
+        return str(self._view[offset:offset + length], 'utf-8'), offset + length
+
+    def chapter(self, number):
+        """Decode chapter number (0-based) from its slice of the mapping."""
+        offset, length = self.index[number]
+        end = offset + length
+        level, title_length, href_length, count = CHAPTER_HEADER.unpack_from(self._view, offset)
+        offset += CHAPTER_HEADER.size
+        title, offset = self._string(offset, title_length)
+        href, offset = self._string(offset, href_length)
+        ends = struct.unpack_from(f'<{count}I', self._view, offset)
+        offset += 4 * count
+        levels = struct.unpack_from(f'<{count}B', self._view, offset)
+        offset += count
+        text = str(self._view[offset:end], 'utf-8')
+
+        blocks = []
+        start = 0
+        for block_end, block_level in zip(ends, levels):
+            blocks.append(Block(text[start:block_end], block_level))
+            start = block_end
+        return Chapter(blocks, title=title, level=level, href=href)
+
+    def __iter__(self):
+        for number in range(len(self.index)):
+            yield self.chapter(number)
+
+
+def _iter_chapters(book_file):
+    """Yield every chapter, closing the file when done."""
+    try:
+        yield from book_file
+    finally:
+        book_file.close()
+
+
+def read_book_file(path):
+    """
+    Open a .nlmbook file as a Book whose chapters are decoded lazily from
+    the mapping. The file stays mapped until the chapters have been iterated
+    or the book is closed.
+    """
+    book_file = BookFile(path)
+    return Book(title=book_file.title, author=book_file.author,
+                chapters=_iter_chapters(book_file), source=path, reader=book_file)
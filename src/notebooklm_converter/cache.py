@@ -0,0 +1,312 @@
+"""
+Content-addressed cache of rendered NotebookLM outputs.
+
+Entries are keyed by a SHA-256 of the input file bytes, the output format
+and the converter options that affect the output, so renaming or moving a
+book still hits while any change to its content misses. The cache is a
+plain directory that several processes can share; eviction removes the
+least recently used entries once the total size exceeds max_bytes.
+
+Input hashes are remembered in stat files named after the input's path,
+size and mtime. Each stored object has a sidecar naming the stat file its
+key came from, so evicting the object removes that stat file too (an
+input that is still cached under another key is just hashed again).
+Stat files no object refers to, left by conversions that failed or were
+never stored, are swept once they are older than STAT_FILE_GRACE.
+
+Each instance keeps a running total of the bytes it has stored, so a
+store() only scans the directory when that total goes over max_bytes or
+every RESCAN_INTERVAL stores, which picks up what other processes added.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from . import __version__
+
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+HASH_CHUNK_SIZE = 1024 * 1024
+STAT_SIDECAR_SUFFIX = '.stat'
+# Unreferenced stat files younger than this may belong to a conversion in progress
+STAT_FILE_GRACE = 3600
+RESCAN_INTERVAL = 100
+# Keys whose sidecar is still to be written, remembered per instance
+MAX_PENDING_KEYS = 1024
+
+
+def default_cache_dir():
+    """
+    Return the cache directory: $NOTEBOOKLM_CONVERTER_CACHE, else the
+    platform user cache directory.
+    """
+    override = os.environ.get('NOTEBOOKLM_CONVERTER_CACHE')
+    if override:
+        return override
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    elif os.path.isdir(os.path.expanduser('~/Library/Caches')):
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache'))
+    return os.path.join(base, 'notebooklm-converter')
+
+
+def hash_file(path):
+    """SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """
+    Size-bounded LRU cache of converted files on disk.
+
+    hits and misses count lookups made through this instance (convert_batch
+    adds the lookups its worker processes made through their copies);
+    stats() adds the current size of the shared cache directory.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._key_stat_paths = {}  # Key -> stat file of its input, for the sidecar
+        self._total_bytes = None  # Size of the objects as of the last scan plus what was stored since
+        self._stores_since_scan = 0
+
+    def _object_path(self, key):
+        return os.path.join(self.directory, 'objects', key[:2], key)
+
+    def _stat_path(self, input_path, stat):
+        signature = f"{os.path.abspath(input_path)}\0{stat.st_size}\0{stat.st_mtime_ns}"
+        name = hashlib.sha256(signature.encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(self.directory, 'stat', name[:2], name)
+
+    def known_hash(self, input_path, stat=None):
+        """
+        The digest content_hash() recorded for input_path at its current
+        size and mtime, or None; never reads the input itself.
+        """
+        try:
+            stat = stat or os.stat(input_path)
+            with open(self._stat_path(input_path, stat), 'r', encoding='ascii') as f:
+                digest = f.read().strip()
+        except OSError:
+            return None
+        return digest if len(digest) == 64 else None
+
+    def content_hash(self, input_path):
+        """
+        Hash of the input bytes. Re-hashing an unchanged file (same path,
+        size and mtime) is skipped by remembering the previous digest.
+        """
+        return self._content_hash(input_path)[0]
+
+    def _content_hash(self, input_path):
+        """content_hash() plus the path of the stat file that remembers it."""
+        stat = os.stat(input_path)
+        stat_path = self._stat_path(input_path, stat)
+        digest = self.known_hash(input_path, stat)
+        if digest is None:
+            digest = hash_file(input_path)
+            self._write_atomic(stat_path, digest.encode('ascii'))
+        return digest, stat_path
+
+    def key(self, input_path, output_format, options=None):
+        """Cache key for converting input_path to output_format with options."""
+        digest, stat_path = self._content_hash(input_path)
+        material = json.dumps({
+            'input': digest,
+            'format': output_format,
+            'options': options or {},
+            'version': __version__,
+        }, sort_keys=True)
+        key = hashlib.sha256(material.encode('utf-8')).hexdigest()
+        self._key_stat_paths[key] = stat_path
+        if len(self._key_stat_paths) > MAX_PENDING_KEYS:
+            # Mostly keys that hit or failed; the oldest are dropped
+            del self._key_stat_paths[next(iter(self._key_stat_paths))]
+        return key
+
+    def fetch(self, key, output_path):
+        """
+        Copy the cached output for key to output_path. Returns True on a hit.
+        """
+        object_path = self._object_path(key)
+        try:
+            shutil.copyfile(object_path, output_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return False
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(object_path)
+        except OSError:
+            pass
+        self.hits += 1
+        return True
+
+    def lookup(self, key):
+        """
+        Return the path of the cached object for key, or None. The path stays
+        valid until the entry is evicted.
+        """
+        object_path = self._object_path(key)
+        try:
+            os.utime(object_path)
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return object_path
+
+    def store(self, key, output_path):
+        """
+        Add a freshly converted output to the cache, then evict if over size.
+        Returns the path of the cached object.
+        """
+        object_path = self._object_path(key)
+        try:
+            replaced_size = os.path.getsize(object_path)
+        except OSError:
+            replaced_size = 0
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(object_path), suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(output_path, temp_path)
+            os.replace(temp_path, object_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        stat_path = self._key_stat_paths.pop(key, None)
+        if stat_path is not None:
+            self._write_atomic(object_path + STAT_SIDECAR_SUFFIX,
+                               os.path.relpath(stat_path, self.directory).encode('utf-8', 'surrogateescape'))
+
+        self._stores_since_scan += 1
+        if self._total_bytes is not None:
+            self._total_bytes += os.path.getsize(object_path) - replaced_size
+        if (self._total_bytes is None or self._total_bytes > self.max_bytes
+                or self._stores_since_scan >= RESCAN_INTERVAL):
+            self.evict(keep=object_path)
+        return object_path
+
+    def _write_atomic(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _entries(self, stat_names=None):
+        """
+        Yield (mtime, size, path) for every cached object. If stat_names is
+        a set, the names of the stat files the objects' sidecars refer to are
+        added to it.
+        """
+        root = os.path.join(self.directory, 'objects')
+        if not os.path.isdir(root):
+            return
+        for shard in os.scandir(root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(STAT_SIDECAR_SUFFIX):
+                    if stat_names is not None:
+                        try:
+                            with open(entry.path, 'rb') as f:
+                                stat_names.add(os.path.basename(f.read().decode('utf-8', 'surrogateescape')))
+                        except OSError:
+                            pass
+                    continue
+                if entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                yield stat.st_mtime, stat.st_size, entry.path
+
+    def evict(self, keep=None):
+        """
+        Remove least recently used objects until the cache fits in max_bytes,
+        and stat files no object refers to. The object at path keep (usually
+        the one just stored) is never removed.
+        """
+        stat_names = set()
+        entries = sorted(self._entries(stat_names))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Already evicted by another process
+            except OSError:
+                continue  # Still open elsewhere (Windows)
+            self._remove_stat_file(path)
+            total -= size
+        self._sweep_stat_files(stat_names)
+        self._total_bytes = total
+        self._stores_since_scan = 0
+
+    def _sweep_stat_files(self, stat_names):
+        """Remove stat files older than STAT_FILE_GRACE whose names are not in stat_names."""
+        root = os.path.join(self.directory, 'stat')
+        if not os.path.isdir(root):
+            return
+        cutoff = time.time() - STAT_FILE_GRACE
+        for shard in os.scandir(root):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name in stat_names or entry.name.endswith('.tmp'):
+                    continue
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass  # Removed by another process
+
+    def _remove_stat_file(self, object_path):
+        """Remove an evicted object's sidecar and the stat file it names."""
+        sidecar_path = object_path + STAT_SIDECAR_SUFFIX
+        try:
+            with open(sidecar_path, 'rb') as f:
+                stat_path = os.path.join(self.directory, f.read().decode('utf-8', 'surrogateescape'))
+            os.remove(sidecar_path)
+        except OSError:
+            return  # No sidecar, or another process removed it
+        try:
+            os.remove(stat_path)
+        except OSError:
+            pass
+
+    def stats(self):
+        """Hit/miss counters plus the number and total size of cached objects."""
+        entries = list(self._entries())
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'entries': len(entries),
+            'size_bytes': sum(size for _, size, _ in entries),
+        }
+
+    def clear(self):
+        """Delete every cached object and remembered file hash."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self._total_bytes = None
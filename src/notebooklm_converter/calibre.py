@@ -0,0 +1,199 @@
+"""
+Bridge to Calibre's ebook-convert for formats read through an EPUB.
+
+MOBI/AZW/KFX books are converted to EPUB by ebook-convert, which takes
+several seconds to start. The bridge locates the binary once per process,
+caches each intermediate EPUB under a hash of the input bytes so a book is
+only converted once, and runs conversions in a bounded thread pool so
+prefetching a batch overlaps Calibre with parsing on the calling thread.
+to_epub_async() runs the same conversion as an asyncio subprocess for the
+batch orchestrator.
+"""
+
+import asyncio
+import functools
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .cache import ConversionCache, default_cache_dir
+from .limits import exit_reason
+
+
+CALIBRE_BINARY_ENV = 'NOTEBOOKLM_CONVERTER_EBOOK_CONVERT'
+CALIBRE_FORMATS = ('.mobi', '.azw', '.azw3', '.kfx')
+
+DEFAULT_MAX_CONCURRENT = 2
+DEFAULT_EPUB_CACHE_BYTES = 1024 ** 3
+
+_CANDIDATE_PATHS = {
+    'darwin': ['/Applications/calibre.app/Contents/MacOS/ebook-convert'],
+    'win32': [r'C:\Program Files\Calibre2\ebook-convert.exe',
+              r'C:\Program Files (x86)\Calibre2\ebook-convert.exe'],
+}
+
+
+@functools.lru_cache(maxsize=None)
+def find_ebook_convert():
+    """
+    Return the path of the ebook-convert binary, or None if Calibre is not
+    installed. The lookup runs once per process.
+    """
+    override = os.environ.get(CALIBRE_BINARY_ENV)
+    if override:
+        return override if os.path.isfile(override) else None
+    found = shutil.which('ebook-convert')
+    if found:
+        return found
+    for candidate in _CANDIDATE_PATHS.get(sys.platform, []):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def calibre_available():
+    """True if ebook-convert was found."""
+    return find_ebook_convert() is not None
+
+
+class CalibreBridge:
+    """
+    Converts books to EPUB with ebook-convert, at most max_concurrent at a time.
+
+    Usage:
+        bridge = get_bridge()
+        bridge.prefetch(paths)  # optional, starts conversions in the background
+        epub_path = bridge.to_epub(path)
+    """
+
+    def __init__(self, cache_dir=None, max_concurrent=DEFAULT_MAX_CONCURRENT,
+                 max_bytes=DEFAULT_EPUB_CACHE_BYTES):
+        self.cache = ConversionCache(cache_dir or os.path.join(default_cache_dir(), 'calibre'), max_bytes)
+        self.max_concurrent = max_concurrent
+        self._executor = None
+        self._pending = {}  # Absolute input path -> Future of the EPUB path
+        self._lock = threading.Lock()
+
+    def _submit(self, input_path):
+        """Start converting input_path unless it is already in flight."""
+        input_path = os.path.abspath(input_path)
+        with self._lock:
+            future = self._pending.get(input_path)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent,
+                                                        thread_name_prefix='calibre')
+                future = self._executor.submit(self._convert, input_path)
+                self._pending[input_path] = future
+            return input_path, future
+
+    def prefetch(self, input_paths):
+        """Queue conversions for input_paths without waiting for them."""
+        for input_path in input_paths:
+            self._submit(input_path)
+
+    def to_epub(self, input_path):
+        """
+        Return the path of the cached EPUB for input_path, converting it first
+        if needed. Raises if Calibre is missing or the conversion fails.
+        """
+        input_path, future = self._submit(input_path)
+        try:
+            return future.result()
+        finally:
+            with self._lock:
+                if self._pending.get(input_path) is future:
+                    del self._pending[input_path]
+
+    def _lookup(self, input_path):
+        """Return (cache key, cached EPUB path or None) for input_path."""
+        key = self.cache.key(input_path, 'EPUB')
+        return key, self.cache.lookup(key)
+
+    def _store(self, key, temp_epub, returncode, stderr):
+        """Check an ebook-convert run and move its EPUB into the cache."""
+        if returncode is not None and returncode < 0:
+            # Killed by a signal, e.g. a CPU time limit
+            raise Exception(f"ebook-convert stopped: {exit_reason(returncode)}")
+        if returncode != 0 or not os.path.exists(temp_epub):
+            raise Exception(stderr.strip() or f"ebook-convert exited with status {returncode}")
+        return self.cache.store(key, temp_epub)
+
+    def _convert(self, input_path):
+        """Worker: look the EPUB up in the cache or run ebook-convert."""
+        key, cached_path = self._lookup(input_path)
+        if cached_path:
+            return cached_path
+
+        binary = find_ebook_convert()
+        if binary is None:
+            raise FileNotFoundError("ebook-convert not found")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_epub = os.path.join(temp_dir, "temp.epub")
+            result = subprocess.run([binary, input_path, temp_epub],
+                                    capture_output=True, text=True)
+            return self._store(key, temp_epub, result.returncode, result.stderr)
+
+    async def to_epub_async(self, input_path, semaphore=None, limits=None):
+        """
+        Like to_epub(), but awaits ebook-convert as an asyncio subprocess.
+
+        semaphore, an asyncio.Semaphore shared by the callers, bounds how many
+        ebook-convert processes run at once. Hashing the input and copying
+        the EPUB into the cache run in threads so the event loop stays free.
+        limits, a limits.WorkerLimits, bounds the subprocess's memory and CPU
+        time; past its timeout the subprocess is killed and this raises.
+        """
+        loop = asyncio.get_running_loop()
+        key, cached_path = await loop.run_in_executor(None, self._lookup, input_path)
+        if cached_path:
+            return cached_path
+
+        binary = find_ebook_convert()
+        if binary is None:
+            raise FileNotFoundError("ebook-convert not found")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_epub = os.path.join(temp_dir, "temp.epub")
+            async with semaphore or asyncio.Semaphore():
+                process = await asyncio.create_subprocess_exec(
+                    binary, input_path, temp_epub,
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.PIPE)
+                timeout = None
+                if limits:
+                    limits.limit_subprocess(process.pid)
+                    timeout = limits.timeout
+                try:
+                    _, stderr = await asyncio.wait_for(process.communicate(), timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    # Reap it and close its pipes before the loop goes away
+                    await process.communicate()
+                    raise Exception(f"Timed out after {timeout:g} s")
+            return await loop.run_in_executor(None, self._store, key, temp_epub, process.returncode,
+                                              stderr.decode(errors='replace'))
+
+    def shutdown(self):
+        """Wait for queued conversions and stop the worker threads."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_bridges = {}
+_bridges_lock = threading.Lock()
+
+
+def get_bridge(cache_dir=None):
+    """Return the process-wide bridge for cache_dir, creating it on first use."""
+    with _bridges_lock:
+        bridge = _bridges.get(cache_dir)
+        if bridge is None:
+            bridge = _bridges[cache_dir] = CalibreBridge(cache_dir)
+        return bridge
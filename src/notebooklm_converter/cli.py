@@ -0,0 +1,295 @@
+"""
+Headless batch command line for NotebookLM Converter.
+
+    python -m notebooklm_converter books/ new/*.epub --formats pdf md --jobs 8 --out-dir out/
+
+Inputs may be files, directories (searched recursively for supported
+ebooks) or glob patterns. Files are converted in a process pool and each
+result is printed as soon as it is ready. The exit status is 0 when every
+conversion succeeded, 1 if any failed and 2 for usage errors.
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+
+from .cache import ConversionCache, default_cache_dir
+from .console import CONSOLE_FORMATS, parse_command, render_command
+from .converter import INPUT_EXTENSIONS, convert_batch, default_batch_workers
+from .ledger import JobLedger
+from .limits import WorkerLimits
+from .pdf_backends import PDF_BACKENDS
+
+
+# Command line format names to the converter's output formats
+FORMAT_NAMES = {'pdf': 'PDF', 'txt': 'TXT', 'md': 'MD', 'markdown': 'MD'}
+
+
+def scan_directory(root):
+    """
+    Yield the supported ebooks under root, recursively: each directory's
+    files in name order, then its subdirectories in name order. Hidden
+    files and directories are skipped.
+    """
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            if entry.name.startswith('.'):
+                continue
+            if entry.is_dir():
+                subdirectories.append(entry.path)
+            elif os.path.splitext(entry.name)[1].lower() in INPUT_EXTENSIONS and entry.is_file():
+                yield entry.path
+        # Walk subdirectories depth first, in name order
+        stack.extend(reversed(subdirectories))
+
+
+def collect_inputs(arguments):
+    """
+    Expand files, directories and glob patterns into a list of
+    (input path, directory relative to out-dir), without duplicates.
+
+    Files found under a directory argument keep their path relative to it,
+    so books with the same name in different folders do not collide.
+    Explicit files are kept whatever their extension, so unsupported ones
+    are reported as failures rather than silently dropped; arguments that
+    match nothing are returned as the second element.
+    """
+    inputs = []
+    missing = []
+    seen = set()
+
+    def add(path, relative_dir):
+        key = os.path.abspath(path)
+        if key not in seen:
+            seen.add(key)
+            inputs.append((path, relative_dir))
+
+    for argument in arguments:
+        if glob.has_magic(argument):
+            paths = sorted(glob.glob(argument, recursive=True))
+        else:
+            paths = [argument] if os.path.exists(argument) else []
+        if not paths:
+            missing.append(argument)
+        for path in paths:
+            if os.path.isdir(path):
+                for found in scan_directory(path):
+                    add(found, os.path.relpath(os.path.dirname(found), path))
+            else:
+                add(path, os.curdir)
+    return inputs, missing
+
+
+def parse_formats(values):
+    """Split space- or comma-separated format names into converter formats."""
+    formats = []
+    for value in values:
+        for name in value.split(','):
+            if not name:
+                continue
+            if name.lower() not in FORMAT_NAMES:
+                raise argparse.ArgumentTypeError(
+                    f"invalid format: {name} (choose from {', '.join(FORMAT_NAMES)})")
+            formats.append(FORMAT_NAMES[name.lower()])
+    return list(dict.fromkeys(formats))
+
+
+def add_limit_arguments(parser):
+    """Per-file worker limits, shared by the batch and watch commands."""
+    parser.add_argument('--timeout', type=float, metavar='SECONDS',
+                        help="fail a book that takes longer than this (its worker is killed and replaced)")
+    parser.add_argument('--cpu-limit', type=float, metavar='SECONDS',
+                        help="fail a book that uses more CPU time than this")
+    parser.add_argument('--max-memory', type=int, metavar='MB',
+                        help="cap each worker process's memory; a book that needs more fails")
+
+
+def limits_from_args(parser, args):
+    """WorkerLimits from the parsed limit arguments, or None if none was given."""
+    for name, value in (('--timeout', args.timeout), ('--cpu-limit', args.cpu_limit),
+                        ('--max-memory', args.max_memory)):
+        if value is not None and value <= 0:
+            parser.error(f"{name} must be positive")
+    limits = WorkerLimits(memory=args.max_memory * 1024 ** 2 if args.max_memory else None,
+                          cpu_time=args.cpu_limit, timeout=args.timeout)
+    return limits if limits else None
+
+
+def is_console_command(argv):
+    """
+    True for the single-file console form '<input> <format> [format ...]'
+    (e.g. 'book.epub txt' or 'book.epub pdf,txt'), which predates the batch
+    command line: every argument after the input names console formats and
+    is not an existing file. --chapter-workers and --pdf-backend may appear
+    anywhere, as in console mode.
+    """
+    args = list(argv)
+    for option in ('--chapter-workers', '--pdf-backend'):
+        if option in args:
+            index = args.index(option)
+            del args[index:index + 2]
+    if len(args) < 2 or any(arg.startswith('-') for arg in args):
+        return False
+    return all(
+        not os.path.exists(arg) and all(name in CONSOLE_FORMATS for name in arg.split(',') if name)
+        for arg in args[1:]
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='notebooklm-converter',
+        description="Convert ebooks to NotebookLM-optimized PDF, TXT or Markdown.",
+        epilog="Also: 'parse <input> [book.nlmbook]' saves a parsed book, "
+               "'render <book.nlmbook> [formats]' writes outputs from one and "
+               "'watch <inbox> [options]' converts books as they arrive (see 'watch --help') and "
+               "'<input> <format> ...' (e.g. 'book.epub txt') runs the single-file console converter.",
+    )
+    parser.add_argument('inputs', nargs='+', metavar='INPUT',
+                        help="ebook files, directories (searched recursively) or glob patterns")
+    parser.add_argument('-f', '--formats', nargs='+', default=['pdf'], metavar='FORMAT',
+                        help="output formats: pdf, txt, md (default: pdf); several may be given")
+    parser.add_argument('-j', '--jobs', type=int, default=default_batch_workers(),
+                        help="files converted in parallel (default: number of CPUs)")
+    parser.add_argument('-o', '--out-dir',
+                        help="write outputs here, mirroring input directories (default: next to each input)")
+    parser.add_argument('--skip-existing', action='store_true',
+                        help="leave outputs that already exist untouched")
+    parser.add_argument('--pdf-backend', choices=list(PDF_BACKENDS),
+                        help="PDF renderer (default: $NOTEBOOKLM_CONVERTER_PDF_BACKEND or reportlab)")
+    parser.add_argument('--chapter-workers', type=int, default=1,
+                        help="processes per book for large EPUBs, when --jobs is 1")
+    parser.add_argument('--cache', nargs='?', const=default_cache_dir(), metavar='DIR',
+                        help="reuse outputs and parsed books from a conversion cache "
+                             "(default directory when DIR is omitted)")
+    parser.add_argument('--ledger', metavar='DB',
+                        help="SQLite job ledger: record every result and, when rerun, convert only "
+                             "failed, new or changed books")
+    add_limit_arguments(parser)
+    parser.add_argument('--json', action='store_true', help="print one JSON object per result")
+    return parser
+
+
+def plan_batches(ledger, input_paths, output_formats, output_dirs):
+    """
+    Split the inputs into convert_batch() calls by the formats the ledger
+    says each still needs. Returns ([(paths, formats, output dirs)], jobs already done).
+    """
+    todo = ledger.plan(input_paths, output_formats)
+    groups = {}
+    for index, input_path in enumerate(input_paths):
+        if input_path in todo:
+            groups.setdefault(tuple(todo[input_path]), []).append(index)
+    batches = [([input_paths[index] for index in indexes], list(formats),
+                [output_dirs[index] for index in indexes] if output_dirs else None)
+               for formats, indexes in groups.items()]
+    done = len(input_paths) * len(output_formats) - sum(len(formats) for formats in todo.values())
+    return batches, done
+
+
+def format_result(result):
+    """One human-readable line for a ConversionResult."""
+    if result.skipped:
+        return f"skip  {result.input_path} -> {result.output_path} (exists)"
+    if not result.success:
+        return f"FAIL  {result.input_path} [{result.output_format}]: {result.error}"
+    source = "cache" if result.cached else f"{result.elapsed:.2f}s"
+    return f"ok    {result.input_path} -> {result.output_path} ({source})"
+
+
+def result_json(result):
+    return json.dumps({
+        'input': result.input_path,
+        'format': result.output_format,
+        'output': result.output_path,
+        'status': 'skipped' if result.skipped else 'ok' if result.success else 'failed',
+        'error': result.error,
+        'cached': result.cached,
+        'elapsed': round(result.elapsed, 3),
+    })
+
+
+def main(argv=None):
+    """
+    Run the batch command line; returns the exit status.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'parse':
+        return 0 if parse_command(argv[1:]) else 1
+    if argv and argv[0] == 'render':
+        return 0 if render_command(argv[1:]) else 1
+    if argv and argv[0] == 'watch':
+        from .watch import watch_main
+        return watch_main(argv[1:])
+    if is_console_command(argv):
+        from .console import console_main
+        return console_main(argv)
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        output_formats = parse_formats(args.formats)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if not output_formats:
+        parser.error("no output format given")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    limits = limits_from_args(parser, args)
+
+    inputs, missing = collect_inputs(args.inputs)
+    for argument in missing:
+        print(f"FAIL  {argument}: no such file or no match", file=sys.stderr)
+    if not inputs:
+        print("No input files found", file=sys.stderr)
+        return 2 if not missing else 1
+
+    input_paths = [path for path, _ in inputs]
+    output_dirs = None
+    if args.out_dir:
+        output_dirs = [os.path.normpath(os.path.join(args.out_dir, relative_dir)) for _, relative_dir in inputs]
+
+    cache = ConversionCache(args.cache) if args.cache else None
+    ledger = JobLedger(args.ledger) if args.ledger else None
+    batches = [(input_paths, output_formats, output_dirs)]
+    done = 0
+    if ledger is not None:
+        batches, done = plan_batches(ledger, input_paths, output_formats, output_dirs)
+
+    def on_result(result):
+        if ledger is not None:
+            ledger.record(result)
+        print(result_json(result) if args.json else format_result(result), flush=True)
+
+    results = []
+    try:
+        for batch_paths, batch_formats, batch_dirs in batches:
+            results += convert_batch(batch_paths, batch_formats, workers=args.jobs,
+                                     chapter_workers=args.chapter_workers, on_result=on_result, cache=cache,
+                                     pdf_backend=args.pdf_backend, output_dirs=batch_dirs,
+                                     skip_existing=args.skip_existing, limits=limits)
+    finally:
+        if ledger is not None:
+            ledger.close()
+
+    failed = sum(1 for result in results if not result.success)
+    skipped = sum(1 for result in results if result.skipped)
+    if not args.json:
+        resumed = f", {done} already done" if ledger is not None else ""
+        print(f"{len(results) - failed - skipped} converted, {skipped} skipped, {failed} failed{resumed} "
+              f"({len(input_paths)} files x {len(output_formats)} formats)", file=sys.stderr)
+    return 1 if failed or missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
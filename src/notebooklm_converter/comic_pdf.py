@@ -0,0 +1,133 @@
+"""
+Comic book to image PDF renderer.
+
+Each comic page becomes one PDF page holding the page image. Baseline and
+progressive JPEGs in RGB or grayscale are embedded byte for byte as
+DCTDecode streams; other images are decoded with Pillow (using draft() and
+reduce() to avoid full-size decodes), downscaled and re-encoded as JPEG in
+a thread pool. The PDF is streamed to disk page by page and only a few
+pages are in flight at once, so memory does not grow with the page count.
+"""
+
+import io
+import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+from .comic_reader import ComicArchive
+from .pdf_writer import PdfWriter
+
+
+# Pages are fitted into a US Letter box (in points), keeping their aspect ratio
+PAGE_BOX = (612.0, 792.0)
+# Longest side, in pixels, of re-encoded (non-JPEG) pages
+MAX_PAGE_PIXELS = 2400
+JPEG_QUALITY = 90
+
+PASSTHROUGH_MODES = {'RGB': b'/DeviceRGB', 'L': b'/DeviceGray'}
+
+
+def default_image_workers():
+    """Number of image decode threads to use when none is configured."""
+    return min(8, os.cpu_count() or 1)
+
+
+def prepare_page(data, max_pixels=MAX_PAGE_PIXELS):
+    """
+    Return (jpeg bytes, width, height, color space) for one page image.
+    JPEGs in RGB or grayscale are returned unchanged.
+    """
+    image = Image.open(io.BytesIO(data))
+    if image.format == 'JPEG' and image.mode in PASSTHROUGH_MODES:
+        width, height = image.size
+        return data, width, height, PASSTHROUGH_MODES[image.mode]
+
+    # Let the decoder skip detail we would throw away (JPEG only), then
+    # shrink by an integer factor, which is much cheaper than resize()
+    image.draft('RGB', (max_pixels, max_pixels))
+    factor = math.ceil(max(image.size) / max_pixels)
+    if factor > 1:
+        image = image.reduce(factor)
+
+    if image.mode in ('RGBA', 'LA', 'P', 'PA'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    elif image.mode not in PASSTHROUGH_MODES:
+        image = image.convert('RGB')
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=JPEG_QUALITY)
+    width, height = image.size
+    return buffer.getvalue(), width, height, PASSTHROUGH_MODES[image.mode]
+
+
+def iter_prepared_pages(comic, workers=1, max_pixels=MAX_PAGE_PIXELS):
+    """
+    Yield prepare_page() results in page order. With workers > 1, pages are
+    decoded in a thread pool with at most two pages per worker in flight.
+    """
+    if workers <= 1:
+        for _, data in comic.iter_page_data():
+            yield prepare_page(data, max_pixels)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='comic') as executor:
+        pending = deque()
+        for _, data in comic.iter_page_data():
+            pending.append(executor.submit(prepare_page, data, max_pixels))
+            while len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class ImagePdfWriter(PdfWriter):
+    """
+    Minimal PDF writer for pages that each hold one JPEG image.
+
+    Objects are written as soon as a page is added; only their byte offsets
+    are kept for the cross-reference table written by close().
+    """
+
+    def add_page(self, jpeg, width, height, color_space, page_box=PAGE_BOX):
+        """Add a page showing a JPEG, scaled to fit page_box."""
+        image_id, content_id = self._allocate(), self._allocate()
+
+        scale = min(page_box[0] / width, page_box[1] / height)
+        page_width, page_height = width * scale, height * scale
+
+        self._write_stream(image_id, b'/Type /XObject /Subtype /Image /Width %d /Height %d '
+                           b'/ColorSpace %s /BitsPerComponent 8 /Filter /DCTDecode'
+                           % (width, height, color_space), jpeg)
+        self._write_content(content_id,
+                            b'q %.2f 0 0 %.2f 0 0 cm /Im0 Do Q' % (page_width, page_height))
+        self._add_page(page_width, page_height,
+                       b'<< /XObject << /Im0 %d 0 R >> >>' % image_id, content_id)
+
+
+def render_comic_pdf(comic_path, output_path, title=None, workers=1, max_pixels=MAX_PAGE_PIXELS):
+    """
+    Write every page of a comic archive into an image PDF at output_path.
+    Returns the number of pages written.
+    """
+    if not PIL_AVAILABLE:
+        raise Exception("Comic PDF support not available. Please install Pillow.")
+
+    with ComicArchive(comic_path) as comic:
+        if not comic.pages:
+            raise Exception("No page images found in comic archive")
+        with open(output_path, 'wb') as f:
+            writer = ImagePdfWriter(f)
+            for jpeg, width, height, color_space in iter_prepared_pages(comic, workers, max_pixels):
+                writer.add_page(jpeg, width, height, color_space)
+            writer.close(title)
+        return len(writer.page_ids)
@@ -0,0 +1,119 @@
+"""
+Lazy page manifest for comic book archives (CBZ).
+
+The manifest is built from the zip central directory (infolist()) alone,
+so scanning a comic costs the same whether it has 10 pages or 1000. Page
+bytes are only read when a writer asks for them, one page at a time.
+"""
+
+import os
+import re
+import zipfile
+
+from .document import Block, Book, Chapter
+
+
+COMIC_EXTENSIONS = ('.cbr', '.cbz')
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp')
+
+_DIGITS = re.compile(r'(\d+)')
+
+
+def natural_sort_key(name):
+    """
+    Sort key ordering embedded numbers by value: page2.jpg before page10.jpg.
+    """
+    parts = _DIGITS.split(name.lower())
+    # Odd positions hold the digit runs; the str/int alternation keeps tuples comparable
+    return tuple(int(part) if index % 2 else part for index, part in enumerate(parts))
+
+
+def _is_page(info):
+    """True for image members, skipping directories and macOS resource forks."""
+    name = info.filename
+    if info.is_dir() or not name.lower().endswith(IMAGE_EXTENSIONS):
+        return False
+    return not (name.startswith('__MACOSX/') or os.path.basename(name).startswith('._'))
+
+
+class ComicPage:
+    """
+    One page of a comic: its number, archive member name and sizes.
+    """
+
+    __slots__ = ('number', 'name', 'size', 'compressed_size')
+
+    def __init__(self, number, name, size, compressed_size):
+        self.number = number
+        self.name = name
+        self.size = size
+        self.compressed_size = compressed_size
+
+    def __repr__(self):
+        return f"ComicPage({self.number}, {self.name!r})"
+
+
+class ComicArchive:
+    """
+    Comic archive whose pages are listed up front and read on demand.
+
+    Usage:
+        with ComicArchive(path) as comic:
+            for page in comic.pages:
+                with comic.open_page(page) as stream:
+                    ...
+    """
+
+    def __init__(self, comic_path):
+        self.comic_path = comic_path
+        file_ext = os.path.splitext(comic_path)[1].lower()
+        if file_ext == '.cbr':
+            # CBR support temporarily disabled to avoid dependency conflicts
+            raise Exception("CBR format is not supported in this build. Please convert to CBZ format first.")
+        self.zip_file = zipfile.ZipFile(comic_path, 'r')
+        infos = sorted((info for info in self.zip_file.infolist() if _is_page(info)),
+                       key=lambda info: natural_sort_key(info.filename))
+        self.pages = [ComicPage(number, info.filename, info.file_size, info.compress_size)
+                      for number, info in enumerate(infos, 1)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the underlying archive."""
+        self.zip_file.close()
+
+    def open_page(self, page):
+        """Open a page as a binary stream, decompressed as it is read."""
+        return self.zip_file.open(page.name)
+
+    def read_page(self, page):
+        """Read the bytes of a single page."""
+        return self.zip_file.read(page.name)
+
+    def iter_page_data(self):
+        """Yield (page, bytes) in reading order, one page in memory at a time."""
+        for page in self.pages:
+            yield page, self.read_page(page)
+
+
+def read_comic(comic_path):
+    """
+    Describe a comic as a Book with one chapter per page. Only the archive
+    directory is read; writers reopen book.source for the page images.
+    """
+    with ComicArchive(comic_path) as comic:
+        pages = comic.pages
+
+    chapters = [Chapter([Block(f"Total pages: {len(pages)}")])]
+    for page in pages:
+        chapters.append(Chapter(
+            [Block(f"[Image: {page.name}]"),
+             Block(f"This is page {page.number} of the comic book. The original content is visual and cannot be converted to text format suitable for NotebookLM analysis.")],
+            title=f"Page {page.number}: {page.name}", level=2, href=page.name))
+
+    return Book(title=f"Comic Book: {os.path.splitext(os.path.basename(comic_path))[0]}",
+                chapters=chapters, source=comic_path)
@@ -2,25 +2,34 @@
 Console version of NotebookLM Converter for environments without GUI support.
 """
 
-import os
+import functools
 import sys
 from pathlib import Path
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
+
+from .book_file import BOOK_FILE_EXTENSION
+from .converter import NotebookLMConverter, render
+from .document import fan_out
+from .epub_reader import read_book
+from .mobi_reader import MOBI_EXTENSIONS, read_mobi
+from .pdf_backends import PDF_BACKENDS, render_pdf
+from .text_pdf import iter_book_lines
+
+
+# Output formats of the single-file console form
+CONSOLE_FORMATS = ('pdf', 'txt', 'markdown')
 
 
 class NotebookLMConverterConsole:
     """Console version of the NotebookLM Converter."""
     
-    def __init__(self):
+    def __init__(self, chapter_workers=1, pdf_backend=None):
         self.supported_formats = ['.epub', '.mobi', '.azw', '.azw3']
-        self.output_formats = ['pdf', 'txt', 'markdown']
+        self.output_formats = list(CONSOLE_FORMATS)
+        self.chapter_workers = chapter_workers
+        self.pdf_backend = pdf_backend  # None: environment setting, else "canvas"
     
     def convert_file(self, input_file, output_format='pdf'):
-        """Convert a single ebook file."""
+        """Convert a single ebook file to one format or a list of formats, reading it once."""
         try:
             input_path = Path(input_file)
             if not input_path.exists():
@@ -31,115 +40,182 @@ class NotebookLMConverterConsole:
                 print(f"Error: Unsupported format {input_path.suffix}")
                 return False
             
-            # Read the ebook
-            if input_path.suffix.lower() == '.epub':
-                content = self._read_epub(input_path)
-            else:
+            if input_path.suffix.lower() not in ('.epub',) + MOBI_EXTENSIONS:
                 print(f"Format {input_path.suffix} not yet supported in console mode")
                 return False
             
-            # Generate output
-            output_path = input_path.with_suffix(f'.{output_format}')
-            
-            if output_format == 'txt':
-                self._save_as_txt(content, output_path)
-            elif output_format == 'pdf':
-                self._save_as_pdf(content, output_path)
-            elif output_format == 'markdown':
-                self._save_as_markdown(content, output_path)
-            
-            print(f"Successfully converted {input_file} to {output_path}")
+            # Every output consumes the same chapter stream, reading the book once
+            output_formats = [output_format] if isinstance(output_format, str) else output_format
+            output_paths = [input_path.with_suffix(f'.{output_format}') for output_format in output_formats]
+            with self._read(input_path) as book:
+                errors = fan_out(book, [
+                    functools.partial(self._save, output_format=output_format, output_path=output_path)
+                    for output_format, output_path in zip(output_formats, output_paths)
+                ])
+            for output_format, output_path, error in zip(output_formats, output_paths, errors):
+                if error is not None:
+                    if output_format != 'pdf':
+                        raise error
+                    print(f"Error creating PDF: {error}")
+                    # Fallback to text, reading the book again
+                    output_path = output_path.with_suffix('.txt')
+                    with self._read(input_path) as book:
+                        self._save_as_txt(book, output_path)
+                
+                print(f"Successfully converted {input_file} to {output_path}")
             return True
             
         except Exception as e:
             print(f"Error converting {input_file}: {e}")
             return False
     
+    def _read(self, input_path):
+        """Read an ebook; its chapters are extracted as they are consumed."""
+        if input_path.suffix.lower() == '.epub':
+            return self._read_epub(input_path)
+        return self._read_mobi(input_path)
+    
     def _read_epub(self, epub_path):
-        """Read EPUB file and extract text content."""
-        book = epub.read_epub(str(epub_path))
-        content = []
-        
-        for item in book.get_items():
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                soup = BeautifulSoup(item.get_content(), 'html.parser')
-                text = soup.get_text()
-                if text.strip():
-                    content.append(text.strip())
-        
-        return '\n\n'.join(content)
-    
-    def _save_as_txt(self, content, output_path):
+        """Read EPUB file and extract its chapters."""
+        return read_book(str(epub_path), chapter_workers=self.chapter_workers)
+    
+    def _read_mobi(self, mobi_path):
+        """Read an unencrypted MOBI/AZW/AZW3 file and extract its chapters."""
+        return read_mobi(str(mobi_path), chapter_workers=self.chapter_workers)
+    
+    def _save(self, book, output_format, output_path):
+        """Write book to output_path in one output format."""
+        if output_format == 'txt':
+            self._save_as_txt(book, output_path)
+        elif output_format == 'pdf':
+            self._save_as_pdf(book, output_path)
+        elif output_format == 'markdown':
+            self._save_as_markdown(book, output_path)
+    
+    def _iter_lines(self, book):
+        """Yield output lines: one per block, a blank line between chapters."""
+        return iter_book_lines(book)
+    
+    def _save_as_txt(self, book, output_path):
         """Save content as plain text."""
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+            for line in self._iter_lines(book):
+                f.write(line)
+                f.write('\n')
     
-    def _save_as_pdf(self, content, output_path):
+    def _save_as_pdf(self, book, output_path):
         """Save content as PDF."""
-        try:
-            from reportlab.pdfgen import canvas
-            from reportlab.lib.pagesizes import letter
-            from reportlab.lib.utils import simpleSplit
-            
-            c = canvas.Canvas(str(output_path), pagesize=letter)
-            width, height = letter
-            
-            # Split content into lines that fit the page
-            lines = content.split('\n')
-            y_position = height - 50
-            
-            for line in lines:
-                if y_position < 50:  # Start new page
-                    c.showPage()
-                    y_position = height - 50
-                
-                # Split long lines
-                wrapped_lines = simpleSplit(line, "Helvetica", 12, width - 100)
-                for wrapped_line in wrapped_lines:
-                    if y_position < 50:
-                        c.showPage()
-                        y_position = height - 50
-                    
-                    c.drawString(50, y_position, wrapped_line)
-                    y_position -= 15
-            
-            c.save()
-        except Exception as e:
-            print(f"Error creating PDF: {e}")
-            # Fallback to text
-            self._save_as_txt(content, output_path.with_suffix('.txt'))
+        render_pdf(book, output_path, self.pdf_backend, default='canvas')
     
-    def _save_as_markdown(self, content, output_path):
+    def _save_as_markdown(self, book, output_path):
         """Save content as Markdown."""
         # Simple markdown conversion
-        markdown_content = f"# {output_path.stem}\n\n{content}"
         with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+            f.write(f"# {output_path.stem}\n\n")
+            for line in self._iter_lines(book):
+                f.write(line)
+                f.write('\n')
+
+
+# Console format names to the converter's output formats
+RENDER_FORMATS = {'pdf': 'PDF', 'txt': 'TXT', 'markdown': 'MD', 'md': 'MD'}
+
 
+def parse_command(args, chapter_workers=1):
+    """parse <input_file> [book_file]: save the parsed book for later renders."""
+    if not args:
+        print(f"Usage: python -m notebooklm_converter parse <input_file> [output{BOOK_FILE_EXTENSION}]")
+        return False
+    input_file = args[0]
+    book_path = args[1] if len(args) > 1 else str(Path(input_file).with_suffix(BOOK_FILE_EXTENSION))
+    try:
+        count = NotebookLMConverter(chapter_workers=chapter_workers).save_parsed(input_file, book_path)
+    except Exception as e:
+        print(f"Error parsing {input_file}: {e}")
+        return False
+    print(f"Saved {count} chapters to {book_path}")
+    return True
 
-def console_main():
-    """Main function for console version."""
+
+def render_command(args, pdf_backend=None):
+    """render <book_file> [output_format ...]: write outputs from a parsed book."""
+    if not args:
+        print(f"Usage: python -m notebooklm_converter render <book{BOOK_FILE_EXTENSION}> [output_format ...]")
+        return False
+    output_formats = [fmt for arg in args[1:] for fmt in arg.split(',') if fmt] or ['pdf']
+    for output_format in output_formats:
+        if output_format not in RENDER_FORMATS:
+            print(f"Invalid output format: {output_format}")
+            return False
+    try:
+        results = render(args[0], list(dict.fromkeys(RENDER_FORMATS[fmt] for fmt in output_formats)),
+                         pdf_backend=pdf_backend)
+    except Exception as e:
+        print(f"Error rendering {args[0]}: {e}")
+        return False
+    for result in results:
+        if result.success:
+            print(f"Successfully rendered {result.input_path} to {result.output_path}")
+        else:
+            print(f"Error rendering {result.input_path} to {result.output_format}: {result.error}")
+    return all(result.success for result in results)
+
+
+def console_main(argv=None):
+    """Main function for console version; returns the exit status."""
     print("NotebookLM Converter - Console Mode")
     print("===================================")
     
-    converter = NotebookLMConverterConsole()
+    args = sys.argv[1:] if argv is None else list(argv)
+    chapter_workers = 1
+    if '--chapter-workers' in args:
+        index = args.index('--chapter-workers')
+        try:
+            chapter_workers = int(args[index + 1])
+        except (IndexError, ValueError):
+            print("--chapter-workers requires a number")
+            return 2
+        del args[index:index + 2]
+    pdf_backend = None
+    if '--pdf-backend' in args:
+        index = args.index('--pdf-backend')
+        if index + 1 >= len(args) or args[index + 1] not in PDF_BACKENDS:
+            print(f"--pdf-backend requires one of: {', '.join(PDF_BACKENDS)}")
+            return 2
+        pdf_backend = args[index + 1]
+        del args[index:index + 2]
+    
+    if args and args[0] == 'parse':
+        return 0 if parse_command(args[1:], chapter_workers) else 1
+    if args and args[0] == 'render':
+        return 0 if render_command(args[1:], pdf_backend) else 1
+
+    converter = NotebookLMConverterConsole(chapter_workers=chapter_workers, pdf_backend=pdf_backend)
     
-    if len(sys.argv) < 2:
-        print("Usage: python -m notebooklm_converter <input_file> [output_format]")
-        print("Output formats: pdf, txt, markdown (default: pdf)")
-        return
+    if len(args) < 1:
+        print("Usage: python -m notebooklm_converter <input_file> [output_format ...] [--chapter-workers N] "
+              "[--pdf-backend NAME]")
+        print("Output formats: pdf, txt, markdown (default: pdf); several may be given, "
+              "e.g. 'pdf txt' or 'pdf,txt'")
+        print(f"PDF backends: {', '.join(PDF_BACKENDS)} (default: canvas)")
+        print(f"Save a parsed book: python -m notebooklm_converter parse <input_file> [output{BOOK_FILE_EXTENSION}]")
+        print(f"Render a parsed book: python -m notebooklm_converter render <book{BOOK_FILE_EXTENSION}> "
+              "[output_format ...]")
+        print("Convert many files at once: python -m notebooklm_converter --help")
+        return 2
     
-    input_file = sys.argv[1]
-    output_format = sys.argv[2] if len(sys.argv) > 2 else 'pdf'
+    input_file = args[0]
+    output_formats = [fmt for arg in args[1:] for fmt in arg.split(',') if fmt] or ['pdf']
     
-    if output_format not in converter.output_formats:
-        print(f"Invalid output format: {output_format}")
-        print(f"Supported formats: {', '.join(converter.output_formats)}")
-        return
+    for output_format in output_formats:
+        if output_format not in converter.output_formats:
+            print(f"Invalid output format: {output_format}")
+            print(f"Supported formats: {', '.join(converter.output_formats)}")
+            return 2
     
-    success = converter.convert_file(input_file, output_format)
-    sys.exit(0 if success else 1)
+    success = converter.convert_file(input_file, list(dict.fromkeys(output_formats)))
+    return 0 if success else 1
 
 
 if __name__ == "__main__":
-    console_main()
+    sys.exit(console_main())
@@ -0,0 +1,605 @@
+"""
+Headless conversion core for NotebookLM Converter.
+
+NotebookLMConverter holds the extraction and output logic with no
+dependency on tkinter, so it can run inside worker processes.
+convert_batch() converts many files, in a process pool when asked to,
+and reports a ConversionResult per file. Given a ConversionCache, unchanged
+books are served from the cache without being parsed again, and the parsed
+book itself is kept so rendering it with other settings skips the parse.
+Parsed books can also be saved explicitly (save_parsed) and rendered later
+without the original ebook (render).
+"""
+
+import functools
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from .book_file import BOOK_FILE_EXTENSION, read_book_file, write_book_file
+from .cache import ConversionCache, hash_file
+from .calibre import CALIBRE_FORMATS, calibre_available, get_bridge
+from .comic_pdf import default_image_workers, render_comic_pdf
+from .comic_reader import COMIC_EXTENSIONS, read_comic
+from .document import fan_out
+from .epub_reader import read_book
+from .limits import worker_pool
+from .mobi_reader import MOBI_EXTENSIONS, UnsupportedMobiError, is_native_mobi, read_mobi
+from .pdf_backends import get_pdf_backend, resolve_pdf_backend
+from .text_writers import (
+    PARAGRAPH_SEPARATOR,
+    iter_markdown_lines,
+    iter_text_lines,
+    markdown_header,
+    text_header,
+    write_notebooklm_markdown,
+    write_notebooklm_txt,
+)
+
+
+OUTPUT_EXTENSIONS = {
+    "PDF": ".pdf",
+    "TXT": ".txt",
+    "MD": ".md",
+}
+# Parsed books kept next to the conversion cache, in their own directory
+PARSED_CACHE_BYTES = 1024 ** 3
+# Every input extension convert_many() can read
+INPUT_EXTENSIONS = (('.epub',) + MOBI_EXTENSIONS + ('.kfx', '.ibooks', '.iba') + COMIC_EXTENSIONS
+                    + (BOOK_FILE_EXTENSION,))
+
+
+def output_path_for(input_path, output_format, output_dir=None):
+    """
+    Return the output path next to the input file (or in output_dir),
+    e.g. book_NotebookLM.pdf.
+    """
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    directory = os.path.dirname(input_path) if output_dir is None else output_dir
+    return os.path.join(directory, f"{base_name}_NotebookLM{OUTPUT_EXTENSIONS[output_format]}")
+
+
+def default_batch_workers():
+    """Number of file-level worker processes to use when none is configured."""
+    return os.cpu_count() or 1
+
+
+class NotebookLMConverter:
+    """
+    Converts ebooks to NotebookLM-optimized PDF, TXT or Markdown.
+    """
+
+    def __init__(self, chapter_workers=1, cache=None, pdf_backend=None):
+        self.chapter_workers = chapter_workers  # Process pool size for large books
+        self.cache = cache  # Optional ConversionCache of rendered outputs
+        self.pdf_backend = resolve_pdf_backend(pdf_backend)  # Name in pdf_backends.PDF_BACKENDS
+        self._parsed_cache = None
+
+    def convert_ebook(self, input_path, output_path, output_format):
+        """
+        Convert a single ebook file to the specified format optimized for NotebookLM.
+        """
+        try:
+            self.convert(input_path, output_path, output_format)
+            return True
+
+        except Exception as e:
+            print(f"Error converting {input_path}: {str(e)}")
+            return False
+
+    def convert(self, input_path, output_path, output_format):
+        """
+        Like convert_ebook(), but raises on failure instead of returning False.
+        Returns True when the output was copied from the conversion cache.
+        """
+        outcome = self.convert_many(input_path, {output_format: output_path})[output_format]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def convert_many(self, input_path, outputs):
+        """
+        Convert one ebook to several formats, reading and parsing it once.
+
+        outputs maps each output format to its output path. Returns a dict
+        mapping each format to True (copied from the conversion cache),
+        False (rendered) or the Exception its writer raised. Errors reading
+        the input are raised.
+        """
+        for output_format in outputs:
+            if output_format not in OUTPUT_EXTENSIONS:
+                raise Exception(f"Unsupported output format: {output_format}")
+
+        outcomes = {}
+        cache_keys = {}
+        if self.cache is not None:
+            for output_format, output_path in outputs.items():
+                cache_keys[output_format] = self.cache.key(input_path, output_format, self.cache_options())
+                if self.cache.fetch(cache_keys[output_format], output_path):
+                    outcomes[output_format] = True
+        pending = [output_format for output_format in outputs if output_format not in outcomes]
+        if not pending:
+            return outcomes
+
+        file_ext = os.path.splitext(input_path)[1].lower()
+        parsed_key = parsed_path = None
+        if self.cache is not None and file_ext not in COMIC_EXTENSIONS and file_ext != BOOK_FILE_EXTENSION:
+            parsed_key = self.parsed_cache().key(input_path, "BOOK")
+            parsed_path = self.parsed_cache().lookup(parsed_key)
+        if parsed_path is not None:
+            book_content = read_book_file(parsed_path)
+        else:
+            book_content = self.extract(input_path)
+
+        # Every selected writer consumes the same chapter stream, one thread each
+        writers = [
+            functools.partial(self.write_output, output_format=output_format,
+                              output_path=outputs[output_format], file_ext=file_ext)
+            for output_format in pending
+        ]
+        save_path = None
+        if parsed_key is not None and parsed_path is None:
+            # Save the parsed book alongside the outputs for later re-renders
+            fd, save_path = tempfile.mkstemp(suffix=BOOK_FILE_EXTENSION)
+            os.close(fd)
+            writers.append(functools.partial(write_book_file, output_path=save_path, source=input_path))
+
+        try:
+            errors = fan_out(book_content, writers)
+            if save_path is not None and errors.pop() is None:
+                self.parsed_cache().store(parsed_key, save_path)
+        finally:
+            book_content.close()
+            if save_path is not None:
+                os.remove(save_path)
+
+        for output_format, error in zip(pending, errors):
+            if error is None and output_format in cache_keys:
+                self.cache.store(cache_keys[output_format], outputs[output_format])
+            outcomes[output_format] = error if error is not None else False
+        return outcomes
+
+    def extract(self, input_path):
+        """
+        Read an input file as a Book, choosing the reader by its extension.
+        """
+        file_ext = os.path.splitext(input_path)[1].lower()
+
+        if file_ext == '.epub':
+            return self.extract_from_epub(input_path)
+        elif file_ext in MOBI_EXTENSIONS:
+            return self.extract_from_mobi(input_path)
+        elif file_ext == '.kfx':
+            return self.extract_from_kfx(input_path)
+        elif file_ext in ['.ibooks', '.iba']:
+            return self.extract_from_ibooks(input_path)
+        elif file_ext in COMIC_EXTENSIONS:
+            return self.extract_from_comic(input_path)
+        elif file_ext == BOOK_FILE_EXTENSION:
+            return read_book_file(input_path)
+        else:
+            raise Exception(f"Unsupported file format: {file_ext}")
+
+    def save_parsed(self, input_path, book_path):
+        """
+        Parse an ebook and save it as a .nlmbook file for render().
+        Returns the number of chapters saved.
+        """
+        if os.path.splitext(input_path)[1].lower() in COMIC_EXTENSIONS:
+            raise Exception("Comic archives are rendered from their images and cannot be saved parsed")
+        with self.extract(input_path) as book:
+            return write_book_file(book, book_path, source=input_path)
+
+    def parsed_cache(self):
+        """
+        The cache of parsed books, kept in the conversion cache directory.
+        Their keys ignore the writer settings, so any re-render can use them.
+        """
+        if self._parsed_cache is None:
+            self._parsed_cache = ConversionCache(os.path.join(self.cache.directory, 'parsed'),
+                                                 PARSED_CACHE_BYTES)
+        return self._parsed_cache
+
+    def write_output(self, book, output_format, output_path, file_ext):
+        """
+        Write an extracted book in one output format.
+        """
+        if output_format == "PDF" and file_ext in COMIC_EXTENSIONS:
+            # Comics become an image PDF of their pages instead of placeholder text
+            self.create_comic_pdf(book, output_path)
+        elif output_format == "PDF":
+            self.create_notebooklm_pdf(book, output_path)
+        elif output_format == "TXT":
+            self.create_notebooklm_txt(book, output_path)
+        elif output_format == "MD":
+            self.create_notebooklm_markdown(book, output_path)
+        else:
+            raise Exception(f"Unsupported output format: {output_format}")
+
+    def cache_options(self):
+        """
+        Converter settings that change the rendered output, hashed into cache keys.
+        """
+        return {"pdf_backend": self.pdf_backend}
+
+    def extract_from_epub(self, epub_path):
+        """
+        Extract content from EPUB file.
+        """
+        try:
+            return read_book(epub_path, chapter_workers=self.chapter_workers)
+        except Exception as e:
+            raise Exception(f"Error reading EPUB file: {str(e)}")
+
+    def extract_from_mobi(self, mobi_path):
+        """
+        Extract content from MOBI/AZW/AZW3 file, natively when possible.
+        """
+        try:
+            return read_mobi(mobi_path, chapter_workers=self.chapter_workers)
+        except UnsupportedMobiError:
+            pass  # DRM or HUFF/CDIC books still need Calibre
+
+        if not calibre_available():
+            raise Exception("Calibre is not installed. Please install Calibre to process MOBI/AZW files.")
+        try:
+            # Converted once through Calibre, then served from the EPUB cache
+            epub_path = self.calibre_bridge().to_epub(mobi_path)
+        except Exception as e:
+            raise Exception(f"MOBI conversion error: {str(e)}")
+
+        # Read all chapters now; the cached EPUB may be evicted later
+        return self.extract_from_epub(epub_path).materialize()
+
+    def extract_from_kfx(self, kfx_path):
+        """
+        Extract content from KFX file (requires Calibre with KFX plugin).
+        """
+        if not calibre_available():
+            raise Exception("Calibre with KFX plugin is not installed.")
+        try:
+            # Converted once through Calibre, then served from the EPUB cache
+            epub_path = self.calibre_bridge().to_epub(kfx_path)
+        except Exception as e:
+            raise Exception(f"KFX conversion error: {str(e)}")
+
+        # Read all chapters now; the cached EPUB may be evicted later
+        return self.extract_from_epub(epub_path).materialize()
+
+    def calibre_bridge(self):
+        """
+        Return the process-wide Calibre bridge, keeping its EPUBs next to the
+        conversion cache when one is configured.
+        """
+        cache_dir = os.path.join(self.cache.directory, 'calibre') if self.cache is not None else None
+        return get_bridge(cache_dir)
+
+    def extract_from_ibooks(self, ibooks_path):
+        """
+        Extract content from iBooks file.
+        """
+        try:
+            # iBooks files are essentially EPUB files
+            return self.extract_from_epub(ibooks_path)
+        except Exception as e:
+            raise Exception(f"Error reading iBooks file: {str(e)}")
+
+    def extract_from_comic(self, comic_path):
+        """
+        Extract content from comic book archive (CBR/CBZ).
+        """
+        try:
+            # Only the archive directory is read; page images stay on disk
+            return read_comic(comic_path)
+            
+        except Exception as e:
+            raise Exception(f"Error reading comic file: {str(e)}")
+
+    def create_notebooklm_pdf(self, book, output_path):
+        """
+        Create PDF optimized for NotebookLM.
+        """
+        backend = get_pdf_backend(self.pdf_backend)
+        try:
+            backend.render(book, output_path)
+
+        except Exception as e:
+            raise Exception(f"Error creating PDF for NotebookLM: {str(e)}")
+
+    def create_comic_pdf(self, book, output_path):
+        """
+        Create an image PDF with one page per comic page.
+        """
+        try:
+            render_comic_pdf(book.source, output_path, title=book.title,
+                             workers=default_image_workers())
+        except Exception as e:
+            raise Exception(f"Error creating comic PDF: {str(e)}")
+
+    def create_notebooklm_txt(self, book, output_path):
+        """
+        Create TXT optimized for NotebookLM.
+        """
+        try:
+            # Cleaned lines are written as they are produced; the header's
+            # content length is patched in afterwards
+            write_notebooklm_txt(book, output_path, self.get_current_timestamp())
+                
+        except Exception as e:
+            raise Exception(f"Error creating TXT for NotebookLM: {str(e)}")
+
+    def create_notebooklm_markdown(self, book, output_path):
+        """
+        Create Markdown optimized for NotebookLM.
+        """
+        try:
+            # Structured Markdown, written line by line
+            write_notebooklm_markdown(book, output_path, self.get_current_timestamp())
+                
+        except Exception as e:
+            raise Exception(f"Error creating Markdown for NotebookLM: {str(e)}")
+
+    def optimize_text_for_notebooklm(self, book):
+        """
+        Optimize text for NotebookLM analysis, returned as one string.
+        """
+        optimized_content = PARAGRAPH_SEPARATOR.join(iter_text_lines(book))
+        return text_header(self.get_current_timestamp(), f"{len(optimized_content)} characters") + optimized_content
+
+    def format_content_for_markdown(self, book):
+        """
+        Format content for Markdown output optimized for NotebookLM, returned as one string.
+        """
+        return markdown_header(self.get_current_timestamp()) + PARAGRAPH_SEPARATOR.join(iter_markdown_lines(book))
+
+    def get_current_timestamp(self):
+        """
+        Get current timestamp.
+        """
+        from datetime import datetime
+        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+class ConversionResult:
+    """
+    Outcome of converting one input file to one output format.
+    """
+
+    __slots__ = ('input_path', 'output_path', 'success', 'error', 'elapsed', 'cached', 'output_format',
+                 'skipped', 'input_hash')
+
+    def __init__(self, input_path, output_path, success, error=None, elapsed=0.0, cached=False,
+                 output_format=None, skipped=False, input_hash=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.success = success
+        self.error = error
+        self.elapsed = elapsed
+        self.cached = cached  # Output was served from the conversion cache
+        self.output_format = output_format
+        self.skipped = skipped  # The output already existed and was left alone
+        self.input_hash = input_hash  # SHA-256 of the input, None if it was not read
+
+    def __repr__(self):
+        status = "ok" if self.success else f"failed: {self.error}"
+        return f"ConversionResult({self.input_path!r}, {self.output_format!r}, {status})"
+
+
+def output_formats_list(output_format):
+    """Accept one output format or an iterable of them; return a list."""
+    return [output_format] if isinstance(output_format, str) else list(output_format)
+
+
+def _error_text(error):
+    """Message for a failed result; MemoryError and the like have none of their own."""
+    return str(error) or type(error).__name__
+
+
+def _count_cache_lookups(cache, file_results):
+    """
+    Add the output cache lookups a worker process made to cache's counters:
+    each result that was not skipped is a hit if cached, else a miss.
+    """
+    if cache is None:
+        return
+    for result in file_results:
+        if result.cached:
+            cache.hits += 1
+        elif not result.skipped:
+            cache.misses += 1
+
+
+def _input_hash(input_path, cache=None):
+    """SHA-256 of an input, reusing the cache's digest; None if it cannot be read."""
+    try:
+        return cache.content_hash(input_path) if cache is not None else hash_file(input_path)
+    except OSError:
+        return None
+
+
+def _outputs_exist(input_path, output_formats, output_dir=None):
+    """True if every output of input_path already exists, so skip_existing leaves it unread."""
+    return all(os.path.exists(output_path_for(input_path, output_format, output_dir))
+               for output_format in output_formats)
+
+
+def _needs_calibre(input_path):
+    """True if input_path can only be read through a Calibre conversion."""
+    file_ext = os.path.splitext(input_path)[1].lower()
+    if file_ext in MOBI_EXTENSIONS:
+        return not is_native_mobi(input_path)
+    return file_ext in CALIBRE_FORMATS
+
+
+def convert_file_formats(input_path, output_formats, chapter_workers=1, converter=None, cache=None,
+                         pdf_backend=None, output_dir=None, skip_existing=False):
+    """
+    Convert one file to each of output_formats, parsing it once, and return
+    a ConversionResult per format instead of raising. Outputs go next to the
+    input unless output_dir is given (it is created if needed). With
+    skip_existing, formats whose output file already exists are reported as
+    skipped, and the file is not read at all if every output exists.
+    Each result carries the SHA-256 of the input (for the job ledger); when
+    the file is not read it is only known if the cache remembers it.
+    This is the unit of work sent to batch worker processes.
+    """
+    start = time.perf_counter()
+    outputs = {}
+    outcomes = {}
+    input_hash = None
+    try:
+        for output_format in output_formats:
+            outputs[output_format] = output_path_for(input_path, output_format, output_dir)
+        pending = {output_format: output_path for output_format, output_path in outputs.items()
+                   if not (skip_existing and os.path.exists(output_path))}
+        if pending:
+            if output_dir is not None:
+                os.makedirs(output_dir, exist_ok=True)
+            converter = converter or NotebookLMConverter(chapter_workers=chapter_workers, cache=cache,
+                                                         pdf_backend=pdf_backend)
+            input_hash = _input_hash(input_path, converter.cache)
+            outcomes = converter.convert_many(input_path, pending)
+        else:
+            cache = converter.cache if converter is not None else cache
+            input_hash = cache.known_hash(input_path) if cache is not None else None
+    except Exception as e:
+        elapsed = time.perf_counter() - start
+        return [ConversionResult(input_path, outputs.get(output_format), False, _error_text(e), elapsed,
+                                 output_format=output_format, input_hash=input_hash)
+                for output_format in output_formats]
+
+    elapsed = time.perf_counter() - start
+    results = []
+    for output_format in output_formats:
+        if output_format not in outcomes:
+            results.append(ConversionResult(input_path, outputs[output_format], True,
+                                            output_format=output_format, skipped=True, input_hash=input_hash))
+            continue
+        outcome = outcomes[output_format]
+        if isinstance(outcome, Exception):
+            results.append(ConversionResult(input_path, outputs[output_format], False, _error_text(outcome),
+                                            elapsed, output_format=output_format, input_hash=input_hash))
+        else:
+            results.append(ConversionResult(input_path, outputs[output_format], True, elapsed=elapsed,
+                                            cached=outcome, output_format=output_format, input_hash=input_hash))
+    return results
+
+
+def convert_file(input_path, output_format, chapter_workers=1, converter=None, cache=None,
+                 pdf_backend=None):
+    """
+    Convert one file to one format and return a ConversionResult instead of raising.
+    """
+    return convert_file_formats(input_path, [output_format], chapter_workers, converter, cache,
+                                pdf_backend)[0]
+
+
+def render(book_path, output_formats, pdf_backend=None, output_dir=None):
+    """
+    Render a saved .nlmbook file to each of output_formats without touching
+    the original ebook, returning a ConversionResult per format.
+    """
+    if os.path.splitext(book_path)[1].lower() != BOOK_FILE_EXTENSION:
+        raise Exception(f"Not a parsed book file: {book_path}")
+    return convert_file_formats(book_path, output_formats_list(output_formats), pdf_backend=pdf_backend,
+                                output_dir=output_dir)
+
+
+def convert_batch(input_paths, output_format, workers=1, chapter_workers=1, on_result=None,
+                  cache=None, pdf_backend=None, output_dirs=None, skip_existing=False, limits=None):
+    """
+    Convert several files and return their ConversionResults in input order.
+
+    output_format is one format or a list of them; each file is parsed once
+    and every format is written from that one pass, with one result per
+    file and format (formats in the order given).
+
+    With workers > 1 the files are converted in a process pool of that size
+    (each file then parses its chapters serially), with at most two files
+    per worker in flight so large batches are not queued up front. Batches
+    with books that need Calibre are run by the asyncio orchestrator
+    instead, which awaits ebook-convert outside the pool.
+    on_result, if given, is called from the calling thread with each result
+    as soon as it is ready.
+    cache, a ConversionCache, is shared by all workers through its directory.
+    pdf_backend names the PDF renderer (see pdf_backends); None uses the
+    environment setting or the default. output_dirs, if given, holds one
+    output directory (or None, for next to the input) per input path.
+    skip_existing leaves outputs that already exist untouched.
+    limits, a limits.WorkerLimits, bounds the memory, CPU time and
+    wall-clock time of each file; files always run in worker processes
+    then (even with workers=1), and a file that breaches a limit fails
+    without stopping the batch.
+    """
+    output_formats = output_formats_list(output_format)
+    results = [None] * (len(input_paths) * len(output_formats))
+    if output_dirs is None:
+        output_dirs = [None] * len(input_paths)
+
+    def record(index, file_results):
+        offset = index * len(output_formats)
+        results[offset:offset + len(file_results)] = file_results
+        if on_result:
+            for result in file_results:
+                on_result(result)
+
+    def record_failure(index, error):
+        record(index, [ConversionResult(input_paths[index], None, False, _error_text(error),
+                                        output_format=output_format)
+                       for output_format in output_formats])
+
+    if not limits and (workers <= 1 or len(input_paths) <= 1):
+        converter = NotebookLMConverter(chapter_workers=chapter_workers, cache=cache,
+                                        pdf_backend=pdf_backend)
+        # Let Calibre convert the next books while earlier ones are parsed
+        calibre_inputs = [path for index, path in enumerate(input_paths) if _needs_calibre(path)
+                          and not (skip_existing and _outputs_exist(path, output_formats, output_dirs[index]))]
+        if len(calibre_inputs) > 1 and calibre_available():
+            converter.calibre_bridge().prefetch(calibre_inputs)
+        for index, input_path in enumerate(input_paths):
+            record(index, convert_file_formats(input_path, output_formats, converter=converter,
+                                               output_dir=output_dirs[index], skip_existing=skip_existing))
+        return results
+
+    if calibre_available() and any(_needs_calibre(path) for path in input_paths):
+        # Waiting on ebook-convert would hold pool workers idle
+        from .orchestrator import orchestrate_batch
+        return orchestrate_batch(input_paths, output_formats, workers=workers, on_result=on_result, cache=cache,
+                                 pdf_backend=pdf_backend, output_dirs=output_dirs, skip_existing=skip_existing,
+                                 limits=limits)
+
+    workers = max(1, min(workers, len(input_paths)))
+    tasks = enumerate(input_paths)
+    with worker_pool(workers, limits) as executor:
+        pending = {}
+
+        def submit(count):
+            for index, input_path in itertools.islice(tasks, count):
+                try:
+                    future = executor.submit(convert_file_formats, input_path, output_formats, cache=cache,
+                                             pdf_backend=pdf_backend, output_dir=output_dirs[index],
+                                             skip_existing=skip_existing)
+                except Exception as e:
+                    # The pool broke after an earlier worker died
+                    record_failure(index, e)
+                else:
+                    pending[future] = index
+
+        submit(workers * 2)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    file_results = future.result()
+                except Exception as e:
+                    # The worker process died (e.g. killed by the OS) or breached a limit
+                    record_failure(index, e)
+                else:
+                    _count_cache_lookups(cache, file_results)
+                    record(index, file_results)
+            submit(len(done))
+
+    return results
@@ -0,0 +1,192 @@
+"""
+Direct text PDF backend for NotebookLM Converter.
+
+NotebookLM only needs selectable text, so this backend skips layout
+engines entirely: paragraphs are wrapped greedily with the built-in
+Helvetica metrics and written as text operators, one content stream per
+page, straight to disk through PdfWriter. Chapters are consumed lazily and
+only the current page is held in memory. Content streams can optionally
+be Flate compressed with zlib.
+
+Text is drawn in the standard Helvetica fonts with WinAnsiEncoding, so
+characters outside Windows-1252 are shown as '?'.
+"""
+
+from .document import iter_paragraphs
+from .pdf_writer import PdfWriter
+from .text_pdf import wrap_line
+
+
+# Glyph widths (1/1000 em) for WinAnsiEncoding bytes 32-255
+HELVETICA_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584, 761,
+    556, 0, 222, 556, 333, 1000, 556, 556, 333, 1000, 667, 333, 1000, 0, 611, 0,
+    0, 222, 222, 333, 333, 350, 556, 1000, 333, 1000, 500, 333, 944, 0, 500, 667,
+    278, 333, 556, 556, 556, 556, 260, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 556, 537, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    667, 667, 667, 667, 667, 667, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 500, 556, 556, 556, 556, 278, 278, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 584, 611, 556, 556, 556, 556, 500, 556, 500,
+)
+HELVETICA_BOLD_WIDTHS = (
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584, 761,
+    556, 0, 278, 556, 500, 1000, 556, 556, 333, 1000, 667, 333, 1000, 0, 611, 0,
+    0, 278, 278, 500, 500, 350, 556, 1000, 333, 1000, 556, 333, 944, 0, 500, 667,
+    278, 333, 556, 556, 556, 556, 280, 556, 333, 737, 370, 556, 584, 333, 737, 333,
+    400, 584, 333, 333, 333, 611, 556, 278, 333, 333, 365, 556, 834, 834, 834, 611,
+    722, 722, 722, 722, 722, 722, 1000, 722, 667, 667, 667, 667, 278, 278, 278, 278,
+    722, 722, 778, 778, 778, 778, 778, 584, 778, 722, 722, 722, 722, 667, 667, 611,
+    556, 556, 556, 556, 556, 556, 889, 556, 556, 556, 556, 556, 278, 278, 278, 278,
+    611, 611, 611, 611, 611, 611, 611, 584, 611, 611, 611, 611, 611, 556, 611, 556,
+)
+
+FONTS = {
+    b'F1': (b'Helvetica', HELVETICA_WIDTHS),
+    b'F2': (b'Helvetica-Bold', HELVETICA_BOLD_WIDTHS),
+}
+
+# US Letter, in points, with one-inch margins
+PAGE_SIZE = (612.0, 792.0)
+MARGIN = 72.0
+
+
+class TextStyle:
+    """
+    Font resource name, size, line leading and space after a paragraph, in points.
+    """
+
+    __slots__ = ('font', 'size', 'leading', 'space_after')
+
+    def __init__(self, font, size, leading, space_after):
+        self.font = font
+        self.size = size
+        self.leading = leading
+        self.space_after = space_after
+
+
+STYLES = {
+    'Title': TextStyle(b'F2', 20, 26, 10),
+    'Author': TextStyle(b'F1', 11, 14, 14),
+    'Body': TextStyle(b'F1', 11, 14, 7),
+    1: TextStyle(b'F2', 16, 21, 7),
+    2: TextStyle(b'F2', 14, 18, 6),
+    3: TextStyle(b'F2', 12, 16, 5),
+    4: TextStyle(b'F2', 11, 14, 5),
+    5: TextStyle(b'F2', 11, 14, 5),
+    6: TextStyle(b'F2', 11, 14, 5),
+}
+
+# Control characters become spaces before escaping
+_CONTROL = bytes(32 if byte < 32 else byte for byte in range(256))
+
+
+def encode_text(text):
+    """Encode text as WinAnsi bytes, with '?' for unsupported characters."""
+    return text.encode('cp1252', 'replace').translate(_CONTROL)
+
+
+def _escape(data):
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class FontWidths(dict):
+    """Rendered width of each word in one built-in font and size, measured on first use."""
+
+    def __init__(self, font, size):
+        super().__init__()
+        self.table = FONTS[font][1]
+        self.scale = size / 1000.0
+        self.space = self.table[0] * self.scale
+
+    def __missing__(self, word):
+        table = self.table
+        width = self[word] = sum(table[byte - 32] for byte in encode_text(word)) * self.scale
+        return width
+
+
+class TextPdfWriter(PdfWriter):
+    """
+    Lays out paragraphs of plain text top to bottom, writing each page's
+    content stream as soon as the page is full.
+    """
+
+    def __init__(self, f, compress=True, page_size=PAGE_SIZE, margin=MARGIN):
+        super().__init__(f, compress)
+        self.page_size = page_size
+        self.margin = margin
+        self.line_width = page_size[0] - 2 * margin
+        self.widths = {}
+        self._ops = []
+        self._font = None
+        self._y = page_size[1] - margin
+
+        font_ids = {}
+        for name, (base_font, _) in FONTS.items():
+            font_ids[name] = self._allocate()
+            self._write_object(font_ids[name], b'<< /Type /Font /Subtype /Type1 /BaseFont /%s '
+                               b'/Encoding /WinAnsiEncoding >>' % base_font)
+        self.resources = b'<< /Font << %s >> >>' % b' '.join(
+            b'/%s %d 0 R' % (name, object_id) for name, object_id in font_ids.items())
+
+    def _finish_page(self):
+        content_id = self._allocate()
+        self._write_content(content_id, b'BT\n' + b''.join(self._ops) + b'ET')
+        self._add_page(self.page_size[0], self.page_size[1], self.resources, content_id)
+        self._ops = []
+        self._font = None
+        self._y = self.page_size[1] - self.margin
+
+    def add_paragraph(self, text, style):
+        """Wrap text to the page width and add it, starting new pages as needed."""
+        key = (style.font, style.size)
+        widths = self.widths.get(key)
+        if widths is None:
+            widths = self.widths[key] = FontWidths(style.font, style.size)
+
+        for line in wrap_line(text, self.line_width, widths):
+            if self._ops and self._y - style.leading < self.margin:
+                self._finish_page()
+            if self._font != key:
+                self._ops.append(b'/%s %d Tf\n' % key)
+                self._font = key
+            self._y -= style.leading
+            self._ops.append(b'1 0 0 1 %.2f %.2f Tm (%s) Tj\n'
+                             % (self.margin, self._y, _escape(encode_text(line))))
+        self._y -= style.space_after
+
+    def close(self, title=None):
+        """Write the last page, then the document trailer."""
+        if self._ops or not self.page_ids:
+            self._finish_page()
+        super().close(title)
+
+
+def write_direct_pdf(book, output_path, compress=True):
+    """
+    Write a book's text straight to a PDF at output_path.
+    Returns the number of pages written.
+    """
+    with open(output_path, 'wb') as f:
+        writer = TextPdfWriter(f, compress)
+        if book.title:
+            writer.add_paragraph(book.title, STYLES['Title'])
+        if book.author:
+            writer.add_paragraph(f"Author: {book.author}", STYLES['Author'])
+        for chapter in book.chapters:
+            if chapter.title:
+                writer.add_paragraph(chapter.title, STYLES[chapter.level])
+            for block in iter_paragraphs(chapter.blocks):
+                writer.add_paragraph(block.text, STYLES[block.level] if block.level else STYLES['Body'])
+        writer.close(book.title)
+        return len(writer.page_ids)
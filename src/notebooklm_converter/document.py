@@ -0,0 +1,228 @@
+"""
+Document intermediate representation shared by extractors and writers.
+
+Extractors produce a Book whose chapters hold already-normalized blocks,
+so writers never re-split one big concatenated string. The records use
+__slots__ to keep per-block overhead small on books with hundreds of
+thousands of paragraphs.
+"""
+
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from .normalizer import iter_lines
+
+
+# A body line ending with one of these closes its paragraph
+PARAGRAPH_END = ('.', '!', '?', ':', ';', '"', "'", ')', ']', '\u201d', '\u2019', '\u2026')
+
+
+class Block:
+    """
+    A paragraph (level 0) or heading (level 1-6) of normalized text.
+    """
+
+    __slots__ = ('level', 'text')
+
+    def __init__(self, text, level=0):
+        self.text = text
+        self.level = level
+
+    def __repr__(self):
+        return f"Block(level={self.level}, text={self.text[:30]!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return NotImplemented
+        return self.level == other.level and self.text == other.text
+
+
+class Chapter:
+    """
+    One spine document (or comic page): an optional title, its heading
+    level, the source href inside the ebook and the list of blocks.
+    """
+
+    __slots__ = ('title', 'level', 'href', 'blocks')
+
+    def __init__(self, blocks=None, title=None, level=1, href=None):
+        self.blocks = blocks if blocks is not None else []
+        self.title = title
+        self.level = level
+        self.href = href
+
+    def __repr__(self):
+        return f"Chapter(title={self.title!r}, href={self.href!r}, blocks={len(self.blocks)})"
+
+    @classmethod
+    def from_sections(cls, sections, title=None, level=1, href=None):
+        """
+        Build a chapter from (heading level, text) sections. Heading text
+        becomes a single block at its level; body text is one block per
+        non-empty line.
+        """
+        blocks = []
+        for section_level, text in sections:
+            if section_level:
+                line = ' '.join(text.split())
+                if line:
+                    blocks.append(Block(line, section_level))
+            else:
+                blocks.extend(Block(line) for line in iter_lines(text))
+        return cls(blocks, title=title, level=level, href=href)
+
+
+class Book:
+    """
+    Book metadata plus its chapters.
+
+    chapters is any iterable of Chapter records. Streaming extractors
+    return a generator so only one chapter is alive at a time; call
+    materialize() when the chapters must be walked more than once.
+    reader is the open file the chapters are read from, if any; close()
+    (or leaving a with block) releases it even if the chapters were never
+    iterated.
+    """
+
+    __slots__ = ('title', 'author', 'source', 'chapters', 'reader')
+
+    def __init__(self, title=None, author=None, chapters=None, source=None, reader=None):
+        self.title = title
+        self.author = author
+        self.chapters = chapters if chapters is not None else []
+        self.source = source
+        self.reader = reader
+
+    def __repr__(self):
+        return f"Book(title={self.title!r}, author={self.author!r}, source={self.source!r})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Stop lazy chapter extraction and close the reader."""
+        close_chapters = getattr(self.chapters, 'close', None)
+        if close_chapters is not None:
+            close_chapters()
+        if self.reader is not None:
+            self.reader.close()
+
+    def materialize(self):
+        """Read all chapters into a list (idempotent) and return the book."""
+        if not isinstance(self.chapters, list):
+            self.chapters = list(self.chapters)
+        return self
+
+
+def iter_paragraphs(blocks):
+    """
+    Merge body blocks that are one paragraph hard-wrapped across lines.
+
+    A body block is joined to the previous one when the previous block does
+    not end a sentence and this one starts with a lowercase letter.
+    Headings are passed through unchanged and always end a paragraph.
+    """
+    parts = []
+    for block in blocks:
+        if block.level:
+            if parts:
+                yield Block(' '.join(parts))
+                parts = []
+            yield block
+        elif parts and not parts[-1].endswith(PARAGRAPH_END) and block.text[:1].islower():
+            parts.append(block.text)
+        else:
+            if parts:
+                yield Block(' '.join(parts))
+            parts = [block.text]
+    if parts:
+        yield Block(' '.join(parts))
+
+
+class _ChapterFeed:
+    """
+    Bounded hand-off of chapters from the reading thread to one consumer.
+    """
+
+    END = object()
+
+    def __init__(self, size):
+        self.queue = queue.Queue(size)
+        self.closed = False  # Set once the consumer stops reading
+
+    def put(self, item):
+        # Never block on a consumer that has stopped reading
+        while not self.closed:
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def __iter__(self):
+        while True:
+            item = self.queue.get()
+            if item is self.END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+def fan_out(book, consumers, queue_size=4):
+    """
+    Call every consumer with the book in its own thread, reading
+    book.chapters only once.
+
+    Each consumer gets a Book with the same metadata whose chapters arrive
+    through a bounded queue, so a lazily read book stays lazy and the
+    consumers run concurrently. Returns one exception (or None) per
+    consumer; an error while reading the chapters is raised once every
+    consumer has stopped.
+    """
+    if not consumers:
+        return []
+    if len(consumers) == 1:
+        # Nothing to share: run the consumer in the calling thread
+        try:
+            consumers[0](book)
+            return [None]
+        except Exception as e:
+            return [e]
+    if isinstance(book.chapters, list):
+        # Already in memory: every consumer reads the same list
+        feeds = None
+        views = [book] * len(consumers)
+    else:
+        feeds = [_ChapterFeed(queue_size) for _ in consumers]
+        views = [Book(book.title, book.author, iter(feed), book.source) for feed in feeds]
+
+    def run(index):
+        try:
+            consumers[index](views[index])
+        finally:
+            if feeds:
+                feeds[index].closed = True
+
+    read_error = None
+    with ThreadPoolExecutor(max_workers=len(consumers), thread_name_prefix='writer') as executor:
+        futures = [executor.submit(run, index) for index in range(len(consumers))]
+        if feeds:
+            try:
+                for chapter in book.chapters:
+                    if all(feed.closed for feed in feeds):
+                        break
+                    for feed in feeds:
+                        feed.put(chapter)
+            except Exception as e:
+                read_error = e
+            for feed in feeds:
+                feed.put(read_error or _ChapterFeed.END)
+        errors = [future.exception() for future in futures]
+
+    if read_error is not None:
+        raise read_error
+    return errors
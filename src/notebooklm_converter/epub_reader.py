@@ -0,0 +1,347 @@
+"""
+Streaming EPUB reader for NotebookLM Converter.
+
+Reads only the container, the OPF package document and the spine from the
+EPUB zip archive. Spine documents are opened one at a time when iterated, so
+images, fonts and stylesheets are never loaded and memory stays bounded by
+the largest single chapter instead of the whole book.
+
+Chapter titles and levels come from the table of contents (the EPUB 3 nav
+document, or the NCX of EPUB 2), and heading blocks from the <h1>-<h6>
+markup of each document.
+"""
+
+import os
+import posixpath
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import unquote
+
+from lxml import etree
+
+from .document import Book, Chapter
+from .text_extraction import extract_sections
+
+
+CONTAINER_PATH = "META-INF/container.xml"
+OPF_MEDIA_TYPE = "application/oebps-package+xml"
+DOCUMENT_MEDIA_TYPES = ("application/xhtml+xml", "text/html")
+
+NAMESPACES = {
+    "container": "urn:oasis:names:tc:opendocument:xmlns:container",
+    "opf": "http://www.idpf.org/2007/opf",
+    "dc": "http://purl.org/dc/elements/1.1/",
+    "ncx": "http://www.daisy.org/z3986/2005/ncx/",
+    "xhtml": "http://www.w3.org/1999/xhtml",
+}
+EPUB_TYPE = "{http://www.idpf.org/2007/ops}type"
+MAX_HEADING_LEVEL = 6
+
+# Chapters are shipped to worker processes in batches of at least this many
+# bytes so IPC overhead stays small next to parsing time
+CHAPTER_BATCH_BYTES = 512 * 1024
+# Books whose spine is smaller than this are parsed serially; pool start-up
+# would cost more than it saves
+PARALLEL_MIN_BYTES = 4 * 1024 * 1024
+
+_XML_PARSER = etree.XMLParser(recover=True, resolve_entities=False, no_network=True)
+
+
+class EpubReader:
+    """
+    Lazy reader over the spine documents of an EPUB archive.
+
+    Usage:
+        with EpubReader(path) as reader:
+            for href, data in reader.iter_documents():
+                ...
+    """
+
+    def __init__(self, epub_path):
+        self.epub_path = epub_path
+        self.zip_file = zipfile.ZipFile(epub_path, 'r')
+        self.metadata = {}
+        self.manifest = {}
+        self.spine = []
+        self.toc_id = None
+        self.nav_id = None
+        try:
+            self.opf_path = self._find_opf_path()
+            self.opf_dir = posixpath.dirname(self.opf_path)
+            self._load_package()
+        except Exception:
+            self.zip_file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the underlying zip archive."""
+        self.zip_file.close()
+
+    @property
+    def title(self):
+        """First dc:title of the book, or None."""
+        titles = self.metadata.get('title')
+        return titles[0] if titles else None
+
+    @property
+    def creator(self):
+        """First dc:creator of the book, or None."""
+        creators = self.metadata.get('creator')
+        return creators[0] if creators else None
+
+    def _read_xml(self, name):
+        """Parse a small XML member of the archive."""
+        return etree.fromstring(self.zip_file.read(name), _XML_PARSER)
+
+    def _find_opf_path(self):
+        """Locate the OPF package document through META-INF/container.xml."""
+        try:
+            container = self._read_xml(CONTAINER_PATH)
+        except KeyError:
+            raise Exception("Missing META-INF/container.xml")
+
+        for rootfile in container.iterfind('.//container:rootfile', NAMESPACES):
+            if rootfile.get('media-type') == OPF_MEDIA_TYPE and rootfile.get('full-path'):
+                return rootfile.get('full-path')
+
+        raise Exception("No OPF package document declared in container.xml")
+
+    def _load_package(self):
+        """Read metadata, manifest and spine from the OPF document."""
+        try:
+            package = self._read_xml(self.opf_path)
+        except KeyError:
+            raise Exception(f"Missing package document: {self.opf_path}")
+
+        metadata = package.find('opf:metadata', NAMESPACES)
+        if metadata is not None:
+            for element in metadata.iterfind('dc:*', NAMESPACES):
+                name = etree.QName(element).localname
+                if element.text and element.text.strip():
+                    self.metadata.setdefault(name, []).append(element.text.strip())
+
+        manifest = package.find('opf:manifest', NAMESPACES)
+        if manifest is not None:
+            for item in manifest.iterfind('opf:item', NAMESPACES):
+                item_id = item.get('id')
+                href = item.get('href')
+                if item_id and href:
+                    self.manifest[item_id] = (unquote(href), item.get('media-type', ''))
+                    if 'nav' in (item.get('properties') or '').split():
+                        self.nav_id = item_id
+
+        spine = package.find('opf:spine', NAMESPACES)
+        if spine is not None:
+            self.toc_id = spine.get('toc')
+            for itemref in spine.iterfind('opf:itemref', NAMESPACES):
+                idref = itemref.get('idref')
+                if idref in self.manifest:
+                    self.spine.append(idref)
+
+    def member_name(self, href):
+        """Resolve a manifest href (relative to the OPF) to an archive member name."""
+        return posixpath.normpath(posixpath.join(self.opf_dir, href))
+
+    def iter_spine_hrefs(self):
+        """
+        Yield the hrefs of the XHTML spine documents in reading order.
+        """
+        for item_id in self.spine:
+            href, media_type = self.manifest[item_id]
+            if media_type in DOCUMENT_MEDIA_TYPES:
+                yield href
+
+    def spine_size(self):
+        """Total uncompressed size in bytes of the spine documents."""
+        total = 0
+        for href in self.iter_spine_hrefs():
+            try:
+                total += self.zip_file.getinfo(self.member_name(href)).file_size
+            except KeyError:
+                pass
+        return total
+
+    def _iter_ncx_entries(self, toc):
+        """Yield (label, src, depth) for each navPoint of an NCX document."""
+        def walk(parent, depth):
+            for point in parent.iterfind('ncx:navPoint', NAMESPACES):
+                label = point.find('ncx:navLabel/ncx:text', NAMESPACES)
+                content = point.find('ncx:content', NAMESPACES)
+                if label is not None and content is not None:
+                    yield ''.join(label.itertext()), content.get('src'), depth
+                yield from walk(point, depth + 1)
+
+        nav_map = toc.find('ncx:navMap', NAMESPACES)
+        if nav_map is not None:
+            yield from walk(nav_map, 1)
+
+    def _iter_nav_entries(self, toc):
+        """Yield (label, href, depth) for each link of an EPUB 3 toc nav."""
+        def walk(ordered_list, depth):
+            for item in ordered_list.iterfind('xhtml:li', NAMESPACES):
+                link = item.find('xhtml:a', NAMESPACES)
+                if link is not None:
+                    yield ''.join(link.itertext()), link.get('href'), depth
+                for child in item.iterfind('xhtml:ol', NAMESPACES):
+                    yield from walk(child, depth + 1)
+
+        navs = list(toc.iter('{%s}nav' % NAMESPACES['xhtml']))
+        navs.sort(key=lambda nav: nav.get(EPUB_TYPE) != 'toc')
+        if navs:
+            for ordered_list in navs[0].iterfind('xhtml:ol', NAMESPACES):
+                yield from walk(ordered_list, 1)
+
+    def toc_titles(self):
+        """
+        Map spine hrefs to (title, depth) from the table of contents.
+
+        Prefers the EPUB 3 nav document and falls back to the NCX. Only the
+        first entry pointing into each spine document is kept, and depths
+        are clamped to 1-6. Returns {} when there is no usable TOC; a broken
+        TOC never stops the book from being read.
+        """
+        if self.nav_id in self.manifest:
+            toc_id, iter_entries = self.nav_id, self._iter_nav_entries
+        elif self.toc_id in self.manifest:
+            toc_id, iter_entries = self.toc_id, self._iter_ncx_entries
+        else:
+            return {}
+
+        toc_name = self.member_name(self.manifest[toc_id][0])
+        try:
+            toc = self._read_xml(toc_name)
+        except (KeyError, etree.LxmlError):
+            return {}
+        if toc is None:
+            return {}
+
+        entries = {}
+        toc_dir = posixpath.dirname(toc_name)
+        for label, target, depth in iter_entries(toc):
+            label = ' '.join(label.split())
+            if not label or not target:
+                continue
+            member = posixpath.normpath(posixpath.join(toc_dir, unquote(target.split('#', 1)[0])))
+            entries.setdefault(member, (label, min(depth, MAX_HEADING_LEVEL)))
+
+        return {href: entries[self.member_name(href)]
+                for href in self.iter_spine_hrefs() if self.member_name(href) in entries}
+
+    def read_document(self, href):
+        """Read the raw bytes of a single spine document."""
+        return self.zip_file.read(self.member_name(href))
+
+    def iter_documents(self):
+        """
+        Yield (href, raw bytes) for each spine document, reading one member at a time.
+        Documents listed in the spine but missing from the archive are skipped.
+        """
+        for href in self.iter_spine_hrefs():
+            try:
+                data = self.read_document(href)
+            except KeyError:
+                continue
+            yield href, data
+
+
+def parse_chapter(href, data, engine='auto'):
+    """Extract and normalize one spine document into a Chapter."""
+    return Chapter.from_sections(extract_sections(data, engine), href=href)
+
+
+def _parse_batch(batch, engine):
+    """Worker entry point: parse a batch of (href, bytes) documents."""
+    return [parse_chapter(href, data, engine) for href, data in batch]
+
+
+def _iter_batches(documents, batch_bytes):
+    """Group consecutive documents until each batch reaches batch_bytes."""
+    batch = []
+    size = 0
+    for href, data in documents:
+        batch.append((href, data))
+        size += len(data)
+        if size >= batch_bytes:
+            yield batch
+            batch = []
+            size = 0
+    if batch:
+        yield batch
+
+
+def _iter_chapters_parallel(documents, engine, workers):
+    """
+    Parse documents in a process pool, yielding chapters in spine order.
+
+    At most two batches per worker are in flight, so memory stays bounded
+    no matter how far the pool gets ahead of the consumer.
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for batch in _iter_batches(documents, CHAPTER_BATCH_BYTES):
+            pending.append(executor.submit(_parse_batch, batch, engine))
+            while len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def apply_toc_title(chapter, title, level):
+    """
+    Give a chapter its TOC title, dropping the lines up to and including
+    its first heading that only repeat it (usually the <title> and <h1>).
+    """
+    chapter.title = title
+    chapter.level = level
+    key = title.casefold()
+    for index, block in enumerate(chapter.blocks):
+        if block.level:
+            chapter.blocks[:index + 1] = [b for b in chapter.blocks[:index + 1] if b.text.casefold() != key]
+            break
+
+
+def _iter_chapters(reader, engine='auto', chapter_workers=1):
+    """
+    Extract spine documents in order, titled from the reader's table of
+    contents, closing the reader when done.
+    """
+    titles = reader.toc_titles()
+    if chapter_workers > 1 and reader.spine_size() >= PARALLEL_MIN_BYTES:
+        chapters = _iter_chapters_parallel(reader.iter_documents(), engine, chapter_workers)
+    else:
+        chapters = (parse_chapter(href, data, engine) for href, data in reader.iter_documents())
+    try:
+        for chapter in chapters:
+            if chapter.blocks:
+                if chapter.href in titles:
+                    apply_toc_title(chapter, *titles[chapter.href])
+                yield chapter
+    finally:
+        # Shuts the worker pool down if the consumer stops early
+        chapters.close()
+        reader.close()
+
+
+def default_chapter_workers():
+    """Number of chapter workers to use when none is configured."""
+    return os.cpu_count() or 1
+
+
+def read_book(epub_path, engine='auto', chapter_workers=1):
+    """
+    Open an EPUB as a Book whose chapters are extracted lazily, in spine order.
+
+    With chapter_workers > 1, large books are parsed in a process pool of
+    that size; smaller books are always parsed in-process. The archive
+    stays open until the chapters have been iterated or the book is closed.
+    """
+    reader = EpubReader(epub_path)
+    return Book(title=reader.title, author=reader.creator,
+                chapters=_iter_chapters(reader, engine, chapter_workers), source=epub_path, reader=reader)
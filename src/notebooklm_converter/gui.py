@@ -5,42 +5,34 @@ Contains the main GUI application class for the NotebookLM Converter.
 
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import ebooklib
-from ebooklib import epub
-from bs4 import BeautifulSoup
-try:
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.pagesizes import letter
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-    from reportlab.lib.styles import getSampleStyleSheet
-    PDF_AVAILABLE = True
-except ImportError:
-    PDF_AVAILABLE = False
-import markdown
 import os
-import base64
+import queue
 import threading
-import re
-import subprocess
-import sys
-import zipfile
-import tempfile
-from PIL import Image
-import io
 
+from .cache import ConversionCache
+from .converter import NotebookLMConverter, convert_batch, default_batch_workers
+from .epub_reader import default_chapter_workers
 
-class NotebookLMConverterApp:
+
+class NotebookLMConverterApp(NotebookLMConverter):
     def __init__(self, root):
         """
         Initialize the NotebookLM Converter application.
         """
+        super().__init__(chapter_workers=default_chapter_workers(), cache=ConversionCache())
         self.root = root
         self.root.title("NotebookLM Converter")
         self.root.geometry("650x450")
         self.root.configure(bg="#f0f0f0")
 
         self.input_paths = []  # Changed to support multiple files
-        self.output_format = tk.StringVar(value="PDF")
+        self.output_formats = {  # Any combination; each book is parsed once for all of them
+            "PDF": tk.BooleanVar(value=True),
+            "TXT": tk.BooleanVar(value=False),
+            "MD": tk.BooleanVar(value=False),
+        }
+        self.batch_workers = default_batch_workers()  # Process pool size for multi-file batches
+        self.progress_queue = queue.Queue()  # Worker thread -> Tk thread progress messages
 
         # --- Main Frame ---
         main_frame = tk.Frame(self.root, padx=20, pady=20, bg="#f0f0f0")
@@ -75,24 +67,24 @@ class NotebookLMConverterApp:
         self.file_label.pack(side=tk.LEFT, padx=(15, 0))
 
         # --- Output Format Frame ---
-        format_frame = tk.LabelFrame(main_frame, text="2. Select Output Format for NotebookLM", font=("Helvetica", 12, "bold"), bg="#f0f0f0", fg="#333", padx=10, pady=10)
+        format_frame = tk.LabelFrame(main_frame, text="2. Select Output Formats for NotebookLM", font=("Helvetica", 12, "bold"), bg="#f0f0f0", fg="#333", padx=10, pady=10)
         format_frame.pack(fill=tk.X, pady=20)
 
-        # --- Radio buttons for formats ---
+        # --- Check buttons for formats ---
         formats = [
             ("PDF", "PDF", "Portable Document Format - Optimized for NotebookLM with proper formatting"),
             ("TXT", "TXT", "Plain Text - Clean text optimized for AI processing"),
             ("Markdown", "MD", "Markdown - Structured format with metadata for AI analysis")
         ]
 
-        # Create layout for radio buttons
+        # Create layout for check buttons
         for i, (display_name, value, description) in enumerate(formats):
             frame = tk.Frame(format_frame, bg="#f0f0f0")
             frame.pack(anchor="w", padx=10, pady=8)
             
-            radio = tk.Radiobutton(frame, text=display_name, variable=self.output_format, value=value, 
-                                 font=("Helvetica", 12, "bold"), bg="#f0f0f0", fg="#333")
-            radio.pack(anchor="w")
+            check = tk.Checkbutton(frame, text=display_name, variable=self.output_formats[value],
+                                   font=("Helvetica", 12, "bold"), bg="#f0f0f0", fg="#333")
+            check.pack(anchor="w")
             
             desc_label = tk.Label(frame, text=description, font=("Helvetica", 9), bg="#f0f0f0", fg="#666")
             desc_label.pack(anchor="w", padx=(25, 0))
@@ -177,411 +169,99 @@ class NotebookLMConverterApp:
         if not self.input_paths:
             messagebox.showerror("Error", "Please select at least one ebook file first.")
             return
+        output_formats = [value for value, selected in self.output_formats.items() if selected.get()]
+        if not output_formats:
+            messagebox.showerror("Error", "Please select at least one output format.")
+            return
         
         # Disable the convert button during conversion
         self.convert_button.config(state=tk.DISABLED)
         self.progress.start()
         self.status_label.config(text="Converting files for NotebookLM...")
         
-        # Start conversion in a separate thread
-        conversion_thread = threading.Thread(target=self.convert_files)
+        # Start conversion in a separate thread; it reports back through progress_queue
+        conversion_thread = threading.Thread(target=self.convert_files,
+                                             args=(list(self.input_paths), output_formats))
         conversion_thread.daemon = True
         conversion_thread.start()
+        self.root.after(100, self.poll_conversion_progress, 0, len(self.input_paths) * len(output_formats))
 
-    def convert_files(self):
+    def convert_files(self, input_paths, output_formats):
         """
-        Convert all selected files to the chosen format optimized for NotebookLM.
+        Convert all selected files to the chosen formats optimized for NotebookLM.
+        Runs on the background thread; batches use a pool of worker processes.
         """
-        output_format = self.output_format.get()
-        successful_conversions = 0
-        total_files = len(self.input_paths)
-        errors = []
-        
-        for i, input_path in enumerate(self.input_paths, 1):
-            try:
-                # Update status for current file
-                filename = os.path.basename(input_path)
-                self.root.after(0, lambda f=filename, curr=i, total=total_files: 
-                               self.status_label.config(text=f"Converting {curr}/{total}: {f}"))
-                
-                # Determine output file path
-                base_name = os.path.splitext(os.path.basename(input_path))[0]
-                directory = os.path.dirname(input_path)
-                
-                if output_format == "PDF":
-                    output_path = os.path.join(directory, f"{base_name}_NotebookLM.pdf")
-                elif output_format == "TXT":
-                    output_path = os.path.join(directory, f"{base_name}_NotebookLM.txt")
-                elif output_format == "MD":
-                    output_path = os.path.join(directory, f"{base_name}_NotebookLM.md")
-                
-                # Convert the file
-                if self.convert_ebook(input_path, output_path, output_format):
-                    successful_conversions += 1
+        try:
+            results = convert_batch(
+                input_paths, output_formats,
+                workers=self.batch_workers,
+                chapter_workers=self.chapter_workers,
+                on_result=lambda result: self.progress_queue.put(("result", result)),
+                cache=self.cache,
+                pdf_backend=self.pdf_backend,
+            )
+        except Exception as e:
+            self.progress_queue.put(("error", str(e)))
+            return
+        self.progress_queue.put(("done", results))
+
+    def poll_conversion_progress(self, completed, total_files):
+        """
+        Drain progress messages on the Tk thread until the batch is done.
+        """
+        try:
+            while True:
+                kind, payload = self.progress_queue.get_nowait()
+                if kind == "result":
+                    completed += 1
+                    filename = os.path.basename(payload.input_path)
+                    self.status_label.config(text=f"Converted {completed}/{total_files}: {filename} ({payload.output_format})")
+                elif kind == "done":
+                    self.show_conversion_summary(payload)
+                    return
                 else:
-                    errors.append(f"Failed to convert: {filename}")
-                    
-            except Exception as e:
-                error_msg = f"Error converting {os.path.basename(input_path)}: {str(e)}"
-                errors.append(error_msg)
+                    self.progress.stop()
+                    self.convert_button.config(state=tk.NORMAL)
+                    messagebox.showerror("Conversion Failed", f"Conversion failed:\n{payload}")
+                    self.status_label.config(text="Conversion failed")
+                    return
+        except queue.Empty:
+            pass
+        self.root.after(100, self.poll_conversion_progress, completed, total_files)
+
+    def show_conversion_summary(self, results):
+        """
+        Stop the progress bar and report success, partial success or failure.
+        """
+        total_files = len(results)  # One result per file and output format
+        unit = "outputs" if len({result.output_format for result in results}) > 1 else "files"
+        successful_conversions = sum(1 for result in results if result.success)
+        cached_conversions = sum(1 for result in results if result.cached)
+        errors = [
+            f"Error converting {os.path.basename(result.input_path)} to {result.output_format}: {result.error}"
+            for result in results if not result.success
+        ]
         
         # Stop progress bar and update UI
-        self.root.after(0, self.progress.stop)
-        self.root.after(0, lambda: self.convert_button.config(state=tk.NORMAL))
+        self.progress.stop()
+        self.convert_button.config(state=tk.NORMAL)
         
         # Show completion message
         if successful_conversions == total_files:
             if total_files == 1:
                 message = f"Successfully converted 1 file for NotebookLM!"
             else:
-                message = f"Successfully converted all {total_files} files for NotebookLM!"
-            self.root.after(0, lambda: messagebox.showinfo("Conversion Complete", message))
-            self.root.after(0, lambda: self.status_label.config(text="Conversion completed successfully!"))
+                message = f"Successfully converted all {total_files} {unit} for NotebookLM!"
+            messagebox.showinfo("Conversion Complete", message)
+            if cached_conversions:
+                self.status_label.config(text=f"Conversion completed successfully! ({cached_conversions} from cache)")
+            else:
+                self.status_label.config(text="Conversion completed successfully!")
         elif successful_conversions > 0:
-            message = f"Converted {successful_conversions} out of {total_files} files.\n\nErrors:\n" + "\n".join(errors)
-            self.root.after(0, lambda: messagebox.showwarning("Partial Success", message))
-            self.root.after(0, lambda: self.status_label.config(text=f"Partial success: {successful_conversions}/{total_files} files converted"))
+            message = f"Converted {successful_conversions} out of {total_files} {unit}.\n\nErrors:\n" + "\n".join(errors)
+            messagebox.showwarning("Partial Success", message)
+            self.status_label.config(text=f"Partial success: {successful_conversions}/{total_files} {unit} converted")
         else:
             message = f"Failed to convert any files.\n\nErrors:\n" + "\n".join(errors)
-            self.root.after(0, lambda: messagebox.showerror("Conversion Failed", message))
-            self.root.after(0, lambda: self.status_label.config(text="Conversion failed"))
-
-    def convert_ebook(self, input_path, output_path, output_format):
-        """
-        Convert a single ebook file to the specified format optimized for NotebookLM.
-        """
-        try:
-            # Determine input file type
-            file_ext = os.path.splitext(input_path)[1].lower()
-            
-            if file_ext == '.epub':
-                book_content = self.extract_from_epub(input_path)
-            elif file_ext in ['.mobi', '.azw', '.azw3']:
-                book_content = self.extract_from_mobi(input_path)
-            elif file_ext == '.kfx':
-                book_content = self.extract_from_kfx(input_path)
-            elif file_ext in ['.ibooks', '.iba']:
-                book_content = self.extract_from_ibooks(input_path)
-            elif file_ext in ['.cbr', '.cbz']:
-                book_content = self.extract_from_comic(input_path)
-            else:
-                raise Exception(f"Unsupported file format: {file_ext}")
-            
-            # Convert to output format
-            if output_format == "PDF":
-                self.create_notebooklm_pdf(book_content, output_path)
-            elif output_format == "TXT":
-                self.create_notebooklm_txt(book_content, output_path)
-            elif output_format == "MD":
-                self.create_notebooklm_markdown(book_content, output_path)
-            
-            return True
-
-        except Exception as e:
-            print(f"Error converting {input_path}: {str(e)}")
-            return False
-
-    def extract_from_epub(self, epub_path):
-        """
-        Extract content from EPUB file.
-        """
-        try:
-            book = epub.read_epub(epub_path)
-            return self.extract_text_content_from_epub(book)
-        except Exception as e:
-            raise Exception(f"Error reading EPUB file: {str(e)}")
-
-    def extract_from_mobi(self, mobi_path):
-        """
-        Extract content from MOBI/AZW/AZW3 file using Calibre.
-        """
-        try:
-            # Convert MOBI to temporary EPUB for extraction
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_epub = os.path.join(temp_dir, "temp.epub")
-                
-                result = subprocess.run(['ebook-convert', mobi_path, temp_epub], 
-                                      capture_output=True, text=True, shell=True)
-                if result.returncode != 0:
-                    raise Exception(f"MOBI conversion error: {result.stderr}")
-                
-                return self.extract_from_epub(temp_epub)
-        except FileNotFoundError:
-            raise Exception("Calibre is not installed. Please install Calibre to process MOBI/AZW files.")
-
-    def extract_from_kfx(self, kfx_path):
-        """
-        Extract content from KFX file (requires Calibre with KFX plugin).
-        """
-        try:
-            # Similar to MOBI, requires Calibre
-            with tempfile.TemporaryDirectory() as temp_dir:
-                temp_epub = os.path.join(temp_dir, "temp.epub")
-                
-                result = subprocess.run(['ebook-convert', kfx_path, temp_epub], 
-                                      capture_output=True, text=True, shell=True)
-                if result.returncode != 0:
-                    raise Exception(f"KFX conversion error: {result.stderr}")
-                
-                return self.extract_from_epub(temp_epub)
-        except FileNotFoundError:
-            raise Exception("Calibre with KFX plugin is not installed.")
-
-    def extract_from_ibooks(self, ibooks_path):
-        """
-        Extract content from iBooks file.
-        """
-        try:
-            # iBooks files are essentially EPUB files
-            return self.extract_from_epub(ibooks_path)
-        except Exception as e:
-            raise Exception(f"Error reading iBooks file: {str(e)}")
-
-    def extract_from_comic(self, comic_path):
-        """
-        Extract content from comic book archive (CBR/CBZ).
-        """
-        try:
-            import zipfile
-            from PIL import Image
-            import io
-            
-            file_ext = os.path.splitext(comic_path)[1].lower()
-            image_files = []
-            
-            if file_ext == '.cbz':
-                with zipfile.ZipFile(comic_path, 'r') as zip_file:
-                    for file_info in zip_file.infolist():
-                        if file_info.filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.bmp')):
-                            image_data = zip_file.read(file_info.filename)
-                            image_files.append((file_info.filename, image_data))
-            
-            elif file_ext == '.cbr':
-                # CBR support temporarily disabled to avoid dependency conflicts
-                raise Exception("CBR format is not supported in this build. Please convert to CBZ format first.")
-            
-            # Convert images to text representation for NotebookLM
-            content_text = f"# Comic Book: {os.path.splitext(os.path.basename(comic_path))[0]}\n\n"
-            content_text += f"Total pages: {len(image_files)}\n\n"
-            
-            # Sort by filename
-            image_files.sort(key=lambda x: x[0])
-            
-            for i, (filename, image_data) in enumerate(image_files, 1):
-                content_text += f"## Page {i}: {filename}\n\n"
-                content_text += f"[Image: {filename}]\n\nThis is page {i} of the comic book. The original content is visual and cannot be converted to text format suitable for NotebookLM analysis.\n\n"
-            
-            return content_text
-            
-        except Exception as e:
-            raise Exception(f"Error reading comic file: {str(e)}")
-
-    def extract_text_content_from_epub(self, book):
-        """
-        Extract text content from EPUB book object optimized for NotebookLM.
-        """
-        text_content = ""
-        
-        # Add metadata headers for NotebookLM
-        title = book.get_metadata('DC', 'title')
-        creator = book.get_metadata('DC', 'creator')
-        
-        if title:
-            text_content += f"# {title[0][0]}\n\n"
-        if creator:
-            text_content += f"**Author:** {creator[0][0]}\n\n"
-        
-        text_content += "---\n\n"
-        
-        for item_id in book.spine:
-            item = book.get_item_with_id(item_id[0])
-            if item.get_type() == ebooklib.ITEM_DOCUMENT:
-                soup = BeautifulSoup(item.get_content(), 'lxml')
-                # Remove script and style tags
-                for script in soup(["script", "style"]):
-                    script.decompose()
-                
-                # Special processing for NotebookLM optimization
-                text = soup.get_text()
-                # Clean text for NotebookLM
-                text = re.sub(r'\n\s*\n', '\n\n', text)  # Remove excessive blank lines
-                text = re.sub(r' +', ' ', text)  # Remove excessive spaces
-                text_content += text + "\n\n"
-        
-        return text_content
-
-    def create_notebooklm_pdf(self, content, output_path):
-        """
-        Create PDF optimized for NotebookLM.
-        """
-        try:
-            # Create HTML with CSS optimized for NotebookLM
-            html_content = f"""
-            <html>
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{
-                        font-family: 'Times New Roman', serif;
-                        font-size: 12pt;
-                        line-height: 1.6;
-                        margin: 2cm;
-                        color: #333;
-                    }}
-                    h1, h2, h3, h4, h5, h6 {{
-                        color: #2c3e50;
-                        margin-top: 1.5em;
-                        margin-bottom: 0.5em;
-                    }}
-                    h1 {{ font-size: 24pt; border-bottom: 2px solid #3498db; }}
-                    h2 {{ font-size: 18pt; }}
-                    h3 {{ font-size: 14pt; }}
-                    p {{ margin-bottom: 1em; text-align: justify; }}
-                    .chapter {{ page-break-before: always; }}
-                </style>
-            </head>
-            <body>
-                <div class="content">
-                    {self.format_content_for_html(content)}
-                </div>
-            </body>
-            </html>
-            """
-            
-            if not PDF_AVAILABLE:
-                raise Exception("PDF support not available. Please install reportlab.")
-            
-            # Use ReportLab for PDF generation
-            doc = SimpleDocTemplate(output_path, pagesize=letter)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            # Clean content for PDF
-            clean_content = BeautifulSoup(content, 'html.parser').get_text()
-            
-            # Add content as paragraphs
-            for line in clean_content.split('\n'):
-                if line.strip():
-                    story.append(Paragraph(line.strip(), styles['Normal']))
-                    story.append(Spacer(1, 12))
-            
-            doc.build(story)
-                
-        except Exception as e:
-            raise Exception(f"Error creating PDF for NotebookLM: {str(e)}")
-
-    def create_notebooklm_txt(self, content, output_path):
-        """
-        Create TXT optimized for NotebookLM.
-        """
-        try:
-            # Clean and format text for NotebookLM
-            optimized_content = self.optimize_text_for_notebooklm(content)
-            
-            with open(output_path, 'w', encoding='utf-8') as txt_file:
-                txt_file.write(optimized_content)
-                
-        except Exception as e:
-            raise Exception(f"Error creating TXT for NotebookLM: {str(e)}")
-
-    def create_notebooklm_markdown(self, content, output_path):
-        """
-        Create Markdown optimized for NotebookLM.
-        """
-        try:
-            # Convert content to structured Markdown
-            markdown_content = self.format_content_for_markdown(content)
-            
-            with open(output_path, 'w', encoding='utf-8') as md_file:
-                md_file.write(markdown_content)
-                
-        except Exception as e:
-            raise Exception(f"Error creating Markdown for NotebookLM: {str(e)}")
-
-    def optimize_text_for_notebooklm(self, content):
-        """
-        Optimize text for NotebookLM analysis.
-        """
-        # Clean content
-        lines = content.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line:  # Skip empty lines
-                # Remove unnecessary special characters
-                line = re.sub(r'[^\w\s\.\,\!\?\:\;\-\(\)\[\]\{\}\"\'\/]', '', line)
-                cleaned_lines.append(line)
-        
-        # Reassemble with structure suitable for AI
-        optimized_content = '\n\n'.join(cleaned_lines)
-        
-        # Add header for NotebookLM
-        header = f"""DOCUMENT OPTIMIZED FOR NOTEBOOKLM
-Generated: {self.get_current_timestamp()}
-Content Length: {len(optimized_content)} characters
-
----
-
-"""
-        
-        return header + optimized_content
-
-    def format_content_for_html(self, content):
-        """
-        Format content for HTML output.
-        """
-        # Convert basic markdown-like syntax to HTML
-        html_content = content.replace('\n\n', '</p><p>')
-        html_content = f'<p>{html_content}</p>'
-        
-        # Convert headers
-        html_content = re.sub(r'<p># ([^<]+)</p>', r'<h1>\1</h1>', html_content)
-        html_content = re.sub(r'<p>## ([^<]+)</p>', r'<h2>\1</h2>', html_content)
-        html_content = re.sub(r'<p>### ([^<]+)</p>', r'<h3>\1</h3>', html_content)
-        
-        # Convert bold/italic
-        html_content = re.sub(r'\*\*([^*]+)\*\*', r'<strong>\1</strong>', html_content)
-        html_content = re.sub(r'\*([^*]+)\*', r'<em>\1</em>', html_content)
-        
-        return html_content
-
-    def format_content_for_markdown(self, content):
-        """
-        Format content for Markdown output optimized for NotebookLM.
-        """
-        # Add metadata for NotebookLM
-        markdown_header = f"""---
-title: "Document for NotebookLM"
-format: "Markdown"
-generated: "{self.get_current_timestamp()}"
----
-
-# Document for NotebookLM Analysis
-
-"""
-        
-        # Improve Markdown structure
-        lines = content.split('\n')
-        formatted_lines = []
-        
-        for line in lines:
-            line = line.strip()
-            if line:
-                # Detect and format headers
-                if line.startswith('#'):
-                    formatted_lines.append(line)
-                elif len(line) > 50 and not line.endswith('.'):
-                    # Might be a title
-                    formatted_lines.append(f"## {line}")
-                else:
-                    formatted_lines.append(line)
-                    
-        return markdown_header + '\n\n'.join(formatted_lines)
-
-    def get_current_timestamp(self):
-        """
-        Get current timestamp.
-        """
-        from datetime import datetime
-        return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            messagebox.showerror("Conversion Failed", message)
+            self.status_label.config(text="Conversion failed")
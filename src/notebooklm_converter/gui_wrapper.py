@@ -34,7 +34,7 @@ def force_gui_mode():
         print(f"GUI mode not available: {e}")
         print("Falling back to console mode...")
         from notebooklm_converter.console import console_main
-        console_main()
+        sys.exit(console_main())
     except Exception as e:
         print(f"Error starting GUI: {e}")
         sys.exit(1)
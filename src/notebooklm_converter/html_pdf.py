@@ -0,0 +1,85 @@
+"""
+xhtml2pdf (pisa) PDF rendering for NotebookLM Converter.
+
+The book is formatted as one styled HTML document and rendered by pisa.
+This is the original desktop app's PDF output; it is the slowest backend
+and needs the whole document in memory, but keeps its CSS styling.
+"""
+
+from importlib.util import find_spec
+from xml.sax.saxutils import escape
+
+# xhtml2pdf takes about a second and 60 MB to import, so it is only
+# imported when this backend actually renders
+XHTML2PDF_AVAILABLE = find_spec('xhtml2pdf') is not None
+
+
+HTML_TEMPLATE = """
+<html>
+<head>
+    <meta charset="UTF-8">
+    <style>
+        body {{
+            font-family: 'Times New Roman', serif;
+            font-size: 12pt;
+            line-height: 1.6;
+            margin: 2cm;
+            color: #333;
+        }}
+        h1, h2, h3, h4, h5, h6 {{
+            color: #2c3e50;
+            margin-top: 1.5em;
+            margin-bottom: 0.5em;
+        }}
+        h1 {{ font-size: 24pt; border-bottom: 2px solid #3498db; }}
+        h2 {{ font-size: 18pt; }}
+        h3 {{ font-size: 14pt; }}
+        p {{ margin-bottom: 1em; text-align: justify; }}
+        .chapter {{ page-break-before: always; }}
+    </style>
+</head>
+<body>
+    <div class="content">
+        {content}
+    </div>
+</body>
+</html>
+"""
+
+
+def format_book_html(book):
+    """
+    Format a book's headings and paragraphs as HTML elements.
+    """
+    html_parts = []
+    if book.title:
+        html_parts.append(f"<h1>{escape(book.title)}</h1>")
+    if book.author:
+        html_parts.append(f"<p><strong>Author:</strong> {escape(book.author)}</p>")
+
+    for chapter in book.chapters:
+        if chapter.title:
+            html_parts.append(f"<h{chapter.level}>{escape(chapter.title)}</h{chapter.level}>")
+        for block in chapter.blocks:
+            if block.level:
+                html_parts.append(f"<h{block.level}>{escape(block.text)}</h{block.level}>")
+            else:
+                html_parts.append(f"<p>{escape(block.text)}</p>")
+
+    return '\n'.join(html_parts)
+
+
+def write_html_pdf(book, output_path):
+    """
+    Render a book to PDF through xhtml2pdf.
+    """
+    if not XHTML2PDF_AVAILABLE:
+        raise Exception("xhtml2pdf is not installed. Please install xhtml2pdf.")
+    from xhtml2pdf import pisa
+
+    html_content = HTML_TEMPLATE.format(content=format_book_html(book))
+    with open(output_path, "w+b") as pdf_file:
+        pisa_status = pisa.CreatePDF(html_content, dest=pdf_file, encoding='UTF-8')
+
+    if pisa_status.err:
+        raise Exception(f"Error creating PDF: {pisa_status.err}")
@@ -0,0 +1,194 @@
+"""
+Resumable job ledger for large batch conversions.
+
+Every finished (input, output format) job is recorded in a SQLite database
+with the input's size, mtime and SHA-256, its status, timing, output path
+and error. The hash is computed by the worker that converts the input and
+arrives on the ConversionResult, so the ledger never reads the inputs
+itself; a skipped input keeps the hash recorded for it before. A later
+run over the same inputs asks the ledger for the plan
+and converts only what is missing: jobs that failed, inputs that are new or
+have changed since, and outputs that have disappeared.
+
+The database runs in WAL mode and results are buffered and written in
+batched transactions (every batch_size results or flush_interval seconds),
+so recording thousands of results per minute costs a few commits per
+second. A crash loses at most the last unflushed batch, which the next
+run simply converts again.
+"""
+
+import os
+import sqlite3
+import time
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    input_path TEXT NOT NULL,
+    output_format TEXT NOT NULL,
+    input_hash TEXT,
+    input_size INTEGER,
+    input_mtime_ns INTEGER,
+    status TEXT NOT NULL,
+    output_path TEXT,
+    error TEXT,
+    elapsed REAL,
+    cached INTEGER NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 1,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (input_path, output_format)
+) WITHOUT ROWID
+"""
+
+UPSERT = """
+INSERT INTO jobs (input_path, output_format, input_hash, input_size, input_mtime_ns, status,
+                  output_path, error, elapsed, cached, finished_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (input_path, output_format) DO UPDATE SET
+    input_hash = excluded.input_hash,
+    input_size = excluded.input_size,
+    input_mtime_ns = excluded.input_mtime_ns,
+    status = excluded.status,
+    output_path = excluded.output_path,
+    error = excluded.error,
+    elapsed = excluded.elapsed,
+    cached = excluded.cached,
+    attempts = jobs.attempts + 1,
+    finished_at = excluded.finished_at
+"""
+
+DONE_STATUSES = ('ok', 'skipped')
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+
+
+def result_status(result):
+    """Ledger status of a ConversionResult."""
+    if result.skipped:
+        return 'skipped'
+    return 'ok' if result.success else 'failed'
+
+
+class JobLedger:
+    """
+    SQLite ledger of conversion jobs.
+
+    Usage:
+        with JobLedger("run.sqlite") as ledger:
+            todo = ledger.plan(input_paths, ["PDF", "TXT"])
+            convert_batch(..., on_result=ledger.record)
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Autocommit mode; flush() opens its own transactions
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA busy_timeout=5000")
+        self.connection.execute(SCHEMA)
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._known_hashes = {}  # Absolute path -> (size, mtime_ns, hash) from plan()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Write any buffered results and close the database."""
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+
+    def plan(self, input_paths, output_formats):
+        """
+        Return {input path: [output formats still to convert]} for the inputs
+        with work left, in input order. A job is done when it succeeded (or
+        was skipped) for the input's current size and mtime and its output
+        file still exists.
+        """
+        rows = {}
+        for row in self.connection.execute(
+                "SELECT input_path, output_format, status, input_size, input_mtime_ns, output_path, input_hash "
+                "FROM jobs"):
+            rows[row[0], row[1]] = row[2:]
+
+        todo = {}
+        for input_path in input_paths:
+            key = os.path.abspath(input_path)
+            try:
+                stat = os.stat(input_path)
+                signature = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                signature = None
+            remaining = []
+            for output_format in output_formats:
+                row = rows.get((key, output_format))
+                if row is not None and signature is not None and row[1:3] == signature:
+                    self._known_hashes[key] = signature + (row[4],)
+                    if row[0] in DONE_STATUSES and row[3] and os.path.exists(row[3]):
+                        continue
+                remaining.append(output_format)
+            if remaining:
+                todo[input_path] = remaining
+        return todo
+
+    def _input_identity(self, result):
+        """
+        (size, mtime_ns, sha256) of a result's input. The hash is the one the
+        worker computed, else the one recorded before if the input is unchanged.
+        """
+        key = os.path.abspath(result.input_path)
+        try:
+            stat = os.stat(result.input_path)
+        except OSError:
+            return None, None, result.input_hash
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if result.input_hash is not None:
+            identity = signature + (result.input_hash,)
+            self._known_hashes[key] = identity
+            return identity
+        known = self._known_hashes.get(key)
+        if known is not None and known[:2] == signature:
+            return known
+        return signature + (None,)
+
+    def record(self, result):
+        """Buffer one ConversionResult; flushes when the batch is full or old enough."""
+        size, mtime_ns, input_hash = self._input_identity(result)
+        self._buffer.append((
+            os.path.abspath(result.input_path), result.output_format, input_hash, size, mtime_ns,
+            result_status(result), result.output_path and os.path.abspath(result.output_path),
+            result.error, result.elapsed, int(bool(result.cached)), time.time(),
+        ))
+        if (len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write buffered results in one transaction."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        with self.connection:
+            self.connection.execute("BEGIN")
+            self.connection.executemany(UPSERT, self._buffer)
+        self._buffer = []
+
+    def summary(self):
+        """Number of recorded jobs per status."""
+        self.flush()
+        return dict(self.connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+
+    def failures(self):
+        """[(input path, output format, error)] of the jobs that failed last time they ran."""
+        self.flush()
+        return self.connection.execute(
+            "SELECT input_path, output_format, error FROM jobs WHERE status = 'failed' "
+            "ORDER BY input_path, output_format").fetchall()
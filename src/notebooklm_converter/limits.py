@@ -0,0 +1,324 @@
+"""
+Per-file time and memory limits for batch worker processes.
+
+A pathological ebook (a giant single-file chapter, a zip bomb) can stall
+or exhaust memory in the process that parses it. LimitedProcessPool is a
+process pool executor whose workers run under WorkerLimits:
+
+- memory caps each worker's address space (RLIMIT_AS), so an oversized
+  allocation fails with MemoryError instead of taking the machine down;
+- cpu_time caps the CPU seconds one file may use (RLIMIT_CPU, reset for
+  every file), after which the kernel kills the worker;
+- timeout caps the wall-clock time of one file, after which the pool
+  kills the worker.
+
+The orchestrator applies the same limits to the ebook-convert processes
+it runs itself (see CalibreBridge.to_epub_async); their memory and CPU
+limits are Linux only.
+
+A worker that breaches a limit is replaced and only its file fails; the
+other workers carry on. The resource limits need the Unix resource module
+and are skipped where it is missing; the timeout works everywhere. Limits
+are inherited by subprocesses a worker starts, such as ebook-convert.
+"""
+
+import math
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from multiprocessing.connection import wait as wait_for_handles
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class WorkerLimits:
+    """
+    Bounds for each file a worker converts; None leaves one unbounded.
+
+    memory is the address space of a worker process in bytes, cpu_time
+    and timeout are seconds of CPU and wall-clock time per file.
+    """
+
+    def __init__(self, memory=None, cpu_time=None, timeout=None):
+        self.memory = memory
+        self.cpu_time = cpu_time
+        self.timeout = timeout
+
+    def __bool__(self):
+        return any(value is not None for value in (self.memory, self.cpu_time, self.timeout))
+
+    def __repr__(self):
+        return f"WorkerLimits(memory={self.memory!r}, cpu_time={self.cpu_time!r}, timeout={self.timeout!r})"
+
+    def apply_memory(self):
+        """Cap this process's address space (once, when a worker starts)."""
+        if resource is None or self.memory is None:
+            return
+        _set_soft_limit(resource.RLIMIT_AS, self.memory)
+
+    def start_cpu_clock(self):
+        """Allow this process cpu_time more CPU seconds (before each file)."""
+        if resource is None or self.cpu_time is None:
+            return
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _set_soft_limit(resource.RLIMIT_CPU, math.ceil(usage.ru_utime + usage.ru_stime + self.cpu_time))
+
+    def limit_subprocess(self, pid):
+        """
+        Apply memory and cpu_time to a subprocess started outside the pool
+        (such as ebook-convert). Needs prlimit, so it does nothing outside
+        Linux; a preexec_fn would avoid that but can deadlock in a parent
+        with threads.
+        """
+        if resource is None or not hasattr(resource, 'prlimit'):
+            return
+        if self.memory is not None:
+            _set_soft_limit(resource.RLIMIT_AS, self.memory, pid)
+        if self.cpu_time is not None:
+            _set_soft_limit(resource.RLIMIT_CPU, math.ceil(self.cpu_time), pid)
+
+
+def _set_soft_limit(which, value, pid=None):
+    """Lower the soft limit of this process, or of process pid."""
+    try:
+        if pid is None:
+            soft, hard = resource.getrlimit(which)
+        else:
+            soft, hard = resource.prlimit(pid, which)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        if pid is None:
+            resource.setrlimit(which, (value, hard))
+        else:
+            resource.prlimit(pid, which, (value, hard))
+    except (ValueError, OSError):
+        pass  # Not supported here (e.g. RLIMIT_AS on macOS), or the process is gone
+
+
+def exit_reason(exitcode):
+    """Human-readable cause of a worker's exit code."""
+    if exitcode is not None and exitcode < 0:
+        if exitcode == -getattr(signal, 'SIGXCPU', 0):
+            return "CPU time limit exceeded"
+        if exitcode == -getattr(signal, 'SIGKILL', 0):
+            return "killed, possibly out of memory"
+        try:
+            return f"killed by {signal.Signals(-exitcode).name}"
+        except ValueError:
+            pass
+    return f"exit code {exitcode}"
+
+
+def _worker_main(connection, limits, initializer, initargs):
+    """Run tasks received on connection until told to stop or the pool goes away."""
+    if limits is not None:
+        limits.apply_memory()
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        try:
+            task = connection.recv()
+        except (EOFError, OSError):
+            return
+        if task is None:
+            return
+        fn, args, kwargs = task
+        if limits is not None:
+            limits.start_cpu_clock()
+        # Messages are (success, result or exception, whether this worker is retiring)
+        try:
+            message = (True, fn(*args, **kwargs), False)
+        except MemoryError:
+            # Start afresh rather than run on in a process that hit its limit
+            connection.send((False, Exception("Out of memory (worker memory limit exceeded)"), True))
+            return
+        except BaseException as e:
+            message = (False, e, False)
+        try:
+            connection.send(message)
+        except Exception as e:
+            # The result did not pickle; nothing was sent
+            connection.send((False, Exception(f"Could not return the result: {e}"), False))
+
+
+class _Worker:
+    """One worker process and the task it is running."""
+
+    def __init__(self, context, limits, initializer, initargs):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, daemon=True,
+                                       args=(child_connection, limits, initializer, initargs))
+        self.process.start()
+        child_connection.close()
+        self.future = None
+        self.deadline = None
+
+    def stop(self, kill=False):
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.connection.send(None)
+            except OSError:
+                pass
+        self.process.join()
+        self.connection.close()
+
+
+class LimitedProcessPool(Executor):
+    """
+    Process pool executor that enforces WorkerLimits on every task and
+    replaces workers that breach them, failing only the task they ran.
+
+    Usage:
+        with LimitedProcessPool(4, WorkerLimits(memory=2 * 1024 ** 3, timeout=300)) as executor:
+            future = executor.submit(convert_file_formats, path, ["PDF"])
+    """
+
+    def __init__(self, max_workers=None, limits=None, initializer=None, initargs=(), mp_context=None):
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._limits = limits
+        self._initializer = initializer
+        self._initargs = initargs
+        self._context = mp_context or multiprocessing.get_context()
+        self._tasks = deque()  # (future, fn, args, kwargs) not yet given to a worker
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._woken = False
+        self._wakeup_reader, self._wakeup_writer = multiprocessing.Pipe(duplex=False)
+        self._thread = threading.Thread(target=self._manage, name='limited-pool', daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._tasks.append((future, fn, args, kwargs))
+            self._wake()
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._shutdown = True
+            if cancel_futures:
+                while self._tasks:
+                    self._tasks.popleft()[0].cancel()
+            self._wake()
+        if wait:
+            self._thread.join()
+
+    def _wake(self):
+        """Wake the manager thread (called with the lock held)."""
+        if not self._woken:
+            self._woken = True
+            self._wakeup_writer.send_bytes(b'')
+
+    def _manage(self):
+        """Manager thread: hand out tasks, collect results, enforce timeouts."""
+        workers = []
+        timeout = self._limits.timeout if self._limits is not None else None
+        while True:
+            while self._wakeup_reader.poll():
+                self._wakeup_reader.recv_bytes()
+            with self._lock:
+                self._woken = False
+                shutting_down = self._shutdown
+                queued = bool(self._tasks)
+
+            # Give queued tasks to idle workers, starting new ones up to the limit
+            idle = [worker for worker in workers if worker.future is None]
+            while queued and (idle or len(workers) < self._max_workers):
+                with self._lock:
+                    if not self._tasks:
+                        break
+                    future, fn, args, kwargs = self._tasks.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                while idle and not idle[-1].process.is_alive():
+                    # Died between tasks; replace it
+                    dead = idle.pop()
+                    workers.remove(dead)
+                    dead.stop(kill=True)
+                if idle:
+                    worker = idle.pop()
+                else:
+                    worker = _Worker(self._context, self._limits, self._initializer, self._initargs)
+                    workers.append(worker)
+                try:
+                    worker.connection.send((fn, args, kwargs))
+                except Exception as e:
+                    # The task did not pickle
+                    future.set_exception(e)
+                    idle.append(worker)
+                    continue
+                worker.future = future
+                worker.deadline = time.monotonic() + timeout if timeout is not None else None
+
+            busy = [worker for worker in workers if worker.future is not None]
+            if shutting_down and not busy and not self._tasks:
+                break
+
+            deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+            wait_time = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+            handles = [self._wakeup_reader]
+            for worker in busy:
+                handles += [worker.connection, worker.process.sentinel]
+            ready = wait_for_handles(handles, wait_time)
+
+            now = time.monotonic()
+            for worker in busy:
+                error = None
+                if worker.connection in ready:
+                    try:
+                        success, value, retiring = worker.connection.recv()
+                    except (EOFError, OSError):
+                        worker.process.join()
+                        error = Exception(f"Worker process died ({exit_reason(worker.process.exitcode)})")
+                    except Exception as e:
+                        # The result did not unpickle
+                        success, value, retiring = False, e, False
+                    if error is None:
+                        future, worker.future = worker.future, None
+                        if success:
+                            future.set_result(value)
+                        else:
+                            future.set_exception(value)
+                        if not retiring and worker.process.is_alive():
+                            continue
+                        # It is exiting after running out of memory (it may not have yet)
+                elif worker.process.sentinel in ready:
+                    worker.process.join()
+                    error = Exception(f"Worker process died ({exit_reason(worker.process.exitcode)})")
+                elif worker.deadline is not None and now >= worker.deadline:
+                    error = Exception(f"Timed out after {timeout:g} s")
+                else:
+                    continue
+
+                # Replace the worker; only its own task fails
+                workers.remove(worker)
+                worker.stop(kill=True)
+                if error is not None:
+                    worker.future.set_exception(error)
+
+        for worker in workers:
+            worker.stop()
+        self._wakeup_reader.close()
+        self._wakeup_writer.close()
+
+
+def worker_pool(workers, limits=None, initializer=None, initargs=()):
+    """
+    Return a ProcessPoolExecutor of workers processes, or a
+    LimitedProcessPool when limits sets any bound.
+    """
+    if limits:
+        return LimitedProcessPool(workers, limits, initializer, initargs)
+    return ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs)
@@ -0,0 +1,326 @@
+"""
+Native reader for unencrypted MOBI, AZW and AZW3 (KF8) ebooks.
+
+Parses the PalmDB record table and the MOBI/EXTH headers, decompresses
+PalmDOC text records one at a time and splits the resulting markup into
+chapters: at <mbp:pagebreak> for MOBI 6 books and at each <html> part for
+KF8 books. Chapters go through the same extraction as EPUB spine
+documents, so no Calibre round trip is needed. Books this reader cannot
+handle (DRM, HUFF/CDIC compression) raise UnsupportedMobiError and are
+left to Calibre.
+"""
+
+import re
+import struct
+
+from .document import Book
+from .epub_reader import _iter_chapters
+
+
+MOBI_EXTENSIONS = ('.mobi', '.azw', '.azw3')
+
+PALMDB_HEADER_SIZE = 78
+PALMDB_TYPES = (b'BOOKMOBI', b'TEXtREAd')
+
+NO_COMPRESSION = 1
+PALMDOC_COMPRESSION = 2
+HUFF_CDIC_COMPRESSION = 17480
+
+NULL_INDEX = 0xFFFFFFFF
+
+EXTH_AUTHOR = 100
+EXTH_KF8_BOUNDARY = 121
+EXTH_UPDATED_TITLE = 503
+
+TEXT_ENCODINGS = {1252: 'cp1252', 65001: 'utf-8'}
+
+# MOBI 6 chapters end at page breaks; KF8 text is a run of <html> parts
+_MOBI6_SEPARATOR = re.compile(br'<mbp:pagebreak[^>]*>', re.IGNORECASE)
+_KF8_SEPARATOR = re.compile(br'<html[\s>]', re.IGNORECASE)
+# How far back into already-searched text a separator may start
+_SEPARATOR_LOOKBACK = 256
+
+_LITERAL_RUN = re.compile(br'[\x00\x09-\x7f]+')
+
+# Kindle markup rarely has newlines between paragraphs; add one after each
+# block-level element so paragraphs become separate blocks
+_BLOCK_END = re.compile(br'(</(?:p|div|h[1-6]|li|blockquote|tr|title)\s*>|<br\s*/?>)', re.IGNORECASE)
+
+
+class UnsupportedMobiError(Exception):
+    """The book cannot be read natively (DRM, HUFF/CDIC, unknown layout)."""
+
+
+def palmdoc_decompress(data):
+    """
+    Decompress one PalmDOC (LZ77) text record.
+    """
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        # Plain ASCII is by far the most common case; copy whole runs at once
+        run = _LITERAL_RUN.match(data, i)
+        if run:
+            out += run.group()
+            i = run.end()
+            continue
+
+        c = data[i]
+        i += 1
+        if c <= 0x08:
+            # The next c bytes are copied verbatim
+            out += data[i:i + c]
+            i += c
+        elif c >= 0xC0:
+            # A space followed by an ASCII character
+            out.append(0x20)
+            out.append(c ^ 0x80)
+        else:
+            # 0x80-0xBF: back-reference of 3-10 bytes, up to 2047 bytes back
+            if i >= n:
+                break
+            pair = (c << 8) | data[i]
+            i += 1
+            distance = (pair >> 3) & 0x07FF
+            length = (pair & 0x07) + 3
+            if distance == 0 or distance > len(out):
+                raise ValueError("Corrupt PalmDOC back-reference")
+            start = len(out) - distance
+            if distance >= length:
+                out += out[start:start + length]
+            else:
+                # Overlapping copy repeats the last distance bytes
+                for offset in range(length):
+                    out.append(out[start + offset])
+    return bytes(out)
+
+
+def _trailing_entry_size(data):
+    """Size of a trailing entry, stored as a backward variable-width integer."""
+    size = 0
+    for byte in data[-4:]:
+        if byte & 0x80:
+            size = 0
+        size = (size << 7) | (byte & 0x7F)
+    return size
+
+
+def trim_trailing_entries(data, extra_flags):
+    """Strip the trailing entries flagged in the MOBI header from a text record."""
+    flags = extra_flags >> 1
+    while flags:
+        if flags & 1:
+            size = _trailing_entry_size(data)
+            data = data[:len(data) - size] if size <= len(data) else b''
+        flags >>= 1
+    if extra_flags & 1 and data:
+        # Multibyte character overlap
+        data = data[:len(data) - ((data[-1] & 0x03) + 1)]
+    return data
+
+
+class MobiReader:
+    """
+    Lazy reader over the text of a MOBI/AZW/AZW3 file.
+
+    Offers the same iter_documents()/spine_size()/toc_titles()/close()
+    interface as EpubReader, so chapters are produced by the shared chapter pipeline.
+    """
+
+    def __init__(self, mobi_path):
+        self.mobi_path = mobi_path
+        self.file = open(mobi_path, 'rb')
+        self.title = None
+        self.author = None
+        self.is_kf8 = False
+        try:
+            self._load()
+        except UnsupportedMobiError:
+            self.file.close()
+            raise
+        except (struct.error, IndexError, ValueError) as e:
+            self.file.close()
+            raise UnsupportedMobiError(f"Unrecognized MOBI layout: {str(e)}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Close the underlying file."""
+        self.file.close()
+
+    def read_record(self, index):
+        """Read the raw bytes of one PalmDB record."""
+        start = self.offsets[index]
+        self.file.seek(start)
+        return self.file.read(self.offsets[index + 1] - start)
+
+    def _load(self):
+        """Read the PalmDB record table and the headers of the book section."""
+        header = self.file.read(PALMDB_HEADER_SIZE)
+        if len(header) < PALMDB_HEADER_SIZE or header[60:68] not in PALMDB_TYPES:
+            raise UnsupportedMobiError("Not a MOBI/PalmDOC file")
+        palm_type = header[60:68]
+        record_count, = struct.unpack_from('>H', header, 76)
+        table = self.file.read(record_count * 8)
+        self.offsets = [struct.unpack_from('>L', table, index * 8)[0] for index in range(record_count)]
+        self.file.seek(0, 2)
+        self.offsets.append(self.file.tell())
+
+        self.section = 0
+        self.title = header[:32].split(b'\0', 1)[0].decode('cp1252', 'replace') or None
+        exth = self._load_section_header(palm_type)
+
+        boundary = exth.get(EXTH_KF8_BOUNDARY)
+        if boundary:
+            kf8_start, = struct.unpack('>L', boundary[0][:4])
+            if kf8_start != NULL_INDEX and 0 < kf8_start < record_count:
+                # Combination file: prefer the KF8 half, which keeps the markup
+                self.section = kf8_start
+                exth = self._load_section_header(palm_type) or exth
+
+        title = exth.get(EXTH_UPDATED_TITLE)
+        if title:
+            self.title = title[0].decode(self.encoding, 'replace')
+        author = exth.get(EXTH_AUTHOR)
+        if author:
+            self.author = author[0].decode(self.encoding, 'replace')
+
+    def _load_section_header(self, palm_type):
+        """Parse the PalmDOC/MOBI header of the current section; return its EXTH records."""
+        record = self.read_record(self.section)
+        compression, = struct.unpack_from('>H', record, 0)
+        self.text_length, self.text_record_count, _, encryption = struct.unpack_from('>LHHH', record, 4)
+        if encryption:
+            raise UnsupportedMobiError("Book is encrypted (DRM)")
+        if compression == HUFF_CDIC_COMPRESSION:
+            raise UnsupportedMobiError("HUFF/CDIC compression is not supported")
+        if compression not in (NO_COMPRESSION, PALMDOC_COMPRESSION):
+            raise UnsupportedMobiError(f"Unknown compression type {compression}")
+        self.compression = compression
+        self.encoding = 'cp1252'
+        self.extra_flags = 0
+        self.flow_end = self.text_length
+
+        if palm_type == b'TEXtREAd' or record[16:20] != b'MOBI':
+            return {}
+
+        header_length, _, text_encoding = struct.unpack_from('>LLL', record, 20)
+        file_version, = struct.unpack_from('>L', record, 36)
+        if text_encoding not in TEXT_ENCODINGS:
+            raise UnsupportedMobiError(f"Unknown text encoding {text_encoding}")
+        self.encoding = TEXT_ENCODINGS[text_encoding]
+        self.is_kf8 = file_version >= 8
+
+        full_name_offset, full_name_length = struct.unpack_from('>LL', record, 84)
+        full_name = record[full_name_offset:full_name_offset + full_name_length]
+        if full_name:
+            self.title = full_name.decode(self.encoding, 'replace')
+        if header_length >= 0xE4 and file_version >= 5:
+            self.extra_flags, = struct.unpack_from('>H', record, 0xF2)
+        if self.is_kf8 and header_length >= 0xB8:
+            fdst_index, fdst_count = struct.unpack_from('>LL', record, 0xC0)
+            if fdst_index != NULL_INDEX and fdst_count > 1:
+                self._load_flow_table(self.section + fdst_index)
+
+        exth = {}
+        exth_flags, = struct.unpack_from('>L', record, 128)
+        exth_start = 16 + header_length
+        if exth_flags & 0x40 and record[exth_start:exth_start + 4] == b'EXTH':
+            count, = struct.unpack_from('>L', record, exth_start + 8)
+            position = exth_start + 12
+            for _ in range(count):
+                record_type, length = struct.unpack_from('>LL', record, position)
+                exth.setdefault(record_type, []).append(record[position + 8:position + length])
+                position += length
+        return exth
+
+    def _load_flow_table(self, index):
+        """KF8 text is followed by CSS/SVG flows; only the first flow is text."""
+        record = self.read_record(index)
+        if record[:4] == b'FDST':
+            _, flow_end = struct.unpack_from('>LL', record, 12)
+            self.flow_end = min(self.text_length, flow_end)
+
+    def spine_size(self):
+        """Uncompressed size in bytes of the book text."""
+        return self.flow_end
+
+    def toc_titles(self):
+        """
+        MOBI tables of contents are not read; chapters are titled only by
+        their heading markup.
+        """
+        return {}
+
+    def iter_text(self):
+        """Yield the decompressed text records, up to the end of the text flow."""
+        remaining = self.flow_end
+        for index in range(self.section + 1, self.section + 1 + self.text_record_count):
+            if remaining <= 0:
+                break
+            data = trim_trailing_entries(self.read_record(index), self.extra_flags)
+            if self.compression == PALMDOC_COMPRESSION:
+                data = palmdoc_decompress(data)
+            data = data[:remaining]
+            remaining -= len(data)
+            yield data
+
+    def iter_documents(self):
+        """
+        Yield (href, UTF-8 markup) for each chapter, decompressing one record at a time.
+        """
+        if self.is_kf8:
+            parts = _split_stream(self.iter_text(), _KF8_SEPARATOR, keep_separator=True)
+        else:
+            parts = _split_stream(self.iter_text(), _MOBI6_SEPARATOR, keep_separator=False)
+        for index, part in enumerate(parts):
+            part = _BLOCK_END.sub(br'\1\n', part)
+            if self.encoding != 'utf-8':
+                part = part.decode(self.encoding, 'replace').encode('utf-8')
+            yield f"part{index:04d}.html", part
+
+
+def _split_stream(pieces, separator, keep_separator):
+    """
+    Split a stream of byte strings at every match of separator. With
+    keep_separator the match starts the next part, otherwise it is dropped.
+    """
+    buffer = bytearray()
+    minimum_start = 1 if keep_separator else 0
+    for piece in pieces:
+        search_from = max(minimum_start, len(buffer) - _SEPARATOR_LOOKBACK)
+        buffer += piece
+        while True:
+            match = separator.search(buffer, search_from)
+            if not match:
+                break
+            if match.start() or not keep_separator:
+                yield bytes(buffer[:match.start()])
+            del buffer[:match.start() if keep_separator else match.end()]
+            search_from = minimum_start
+    if buffer:
+        yield bytes(buffer)
+
+
+def is_native_mobi(mobi_path):
+    """True if the book can be read without Calibre."""
+    try:
+        MobiReader(mobi_path).close()
+    except (OSError, UnsupportedMobiError):
+        return False
+    return True
+
+
+def read_mobi(mobi_path, engine='auto', chapter_workers=1):
+    """
+    Open a MOBI/AZW/AZW3 book as a Book whose chapters are extracted lazily.
+    Raises UnsupportedMobiError for books that need Calibre.
+    """
+    reader = MobiReader(mobi_path)
+    return Book(title=reader.title, author=reader.author,
+                chapters=_iter_chapters(reader, engine, chapter_workers), source=mobi_path, reader=reader)
@@ -0,0 +1,61 @@
+"""
+Text normalizer shared by the GUI, console and legacy converters.
+
+Every function here makes a single left-to-right pass over its input using
+str.split/str.join/str.translate, so runtime is linear in the input size
+regardless of how whitespace is distributed. This replaces the chains of
+full-string re.sub calls that used to run on every chapter.
+"""
+
+# Punctuation kept by the NotebookLM character filter, in addition to
+# word characters and whitespace
+ALLOWED_PUNCTUATION = ".,!?:;-()[]{}\"'/"
+
+
+class _CharacterFilter(dict):
+    """
+    str.translate table removing everything except word characters,
+    whitespace and ALLOWED_PUNCTUATION.
+
+    The Latin-1 range is precomputed; other code points are classified on
+    first use and cached, so each distinct character is inspected once.
+    """
+
+    def __init__(self):
+        super().__init__()
+        for code_point in range(256):
+            self[code_point]
+
+    def __missing__(self, code_point):
+        char = chr(code_point)
+        if char.isalnum() or char == '_' or char.isspace() or char in ALLOWED_PUNCTUATION:
+            value = code_point
+        else:
+            value = None
+        self[code_point] = value
+        return value
+
+
+CHARACTER_FILTER = _CharacterFilter()
+
+
+def normalize_line(line, filter_chars=False):
+    """
+    Collapse whitespace in a single line, optionally applying the character filter.
+    """
+    if filter_chars:
+        line = line.translate(CHARACTER_FILTER)
+    return ' '.join(line.split())
+
+
+def iter_lines(text, filter_chars=False):
+    """
+    Yield the non-empty lines of text with whitespace collapsed, optionally
+    passing them through the NotebookLM character filter first.
+    """
+    if filter_chars:
+        text = text.translate(CHARACTER_FILTER)
+    for line in text.split('\n'):
+        line = ' '.join(line.split())
+        if line:
+            yield line
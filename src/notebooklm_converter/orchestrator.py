@@ -0,0 +1,135 @@
+"""
+asyncio orchestrator for batches that mix native and Calibre-bound books.
+
+A MOBI/AZW/KFX book that needs Calibre spends almost all of its time
+waiting for ebook-convert. Converted inside a process pool worker, that
+wait holds a CPU slot idle. The orchestrator splits such a book in two
+stages instead:
+
+1. ebook-convert runs as an asyncio subprocess, at most subprocess_slots
+   at a time, and its EPUB lands in the Calibre cache;
+2. parsing and rendering go to the process pool like any native book (the
+   worker finds the EPUB in the cache and does not run Calibre again).
+
+CPU workers take books whose Calibre stage has finished first and native
+books otherwise, so in a mixed library both the CPU and the subprocess
+slots stay busy instead of strictly alternating.
+"""
+
+import asyncio
+import functools
+import os
+
+from .calibre import DEFAULT_MAX_CONCURRENT, calibre_available, get_bridge
+from .converter import (
+    ConversionResult,
+    _count_cache_lookups,
+    _error_text,
+    _needs_calibre,
+    _outputs_exist,
+    convert_file_formats,
+    output_formats_list,
+)
+from .limits import worker_pool
+
+
+async def convert_batch_async(input_paths, output_formats, executor, workers,
+                              subprocess_slots=DEFAULT_MAX_CONCURRENT, on_result=None, cache=None,
+                              pdf_backend=None, output_dirs=None, skip_existing=False, limits=None):
+    """
+    Convert input_paths with CPU work in executor (workers processes) and
+    ebook-convert runs awaited on the event loop. Arguments and the returned
+    ConversionResults (in input order) are as for converter.convert_batch();
+    limits also bound the ebook-convert runs.
+    """
+    output_formats = output_formats_list(output_formats)
+    results = [None] * (len(input_paths) * len(output_formats))
+    if output_dirs is None:
+        output_dirs = [None] * len(input_paths)
+    loop = asyncio.get_running_loop()
+
+    def record(index, file_results):
+        offset = index * len(output_formats)
+        results[offset:offset + len(file_results)] = file_results
+        if on_result:
+            for result in file_results:
+                on_result(result)
+
+    def record_failure(index, error):
+        record(index, [ConversionResult(input_paths[index], None, False, _error_text(error),
+                                        output_format=output_format)
+                       for output_format in output_formats])
+
+    # Without Calibre every book goes straight to the pool, which reports the error;
+    # so does a book whose outputs all exist, which the worker skips unread
+    calibre_indexes = []
+    native_indexes = []
+    use_calibre = calibre_available()
+    for index, input_path in enumerate(input_paths):
+        if (use_calibre and _needs_calibre(input_path)
+                and not (skip_existing and _outputs_exist(input_path, output_formats, output_dirs[index]))):
+            calibre_indexes.append(index)
+        else:
+            native_indexes.append(index)
+
+    # Same EPUB cache as NotebookLMConverter.calibre_bridge() in the workers
+    bridge = get_bridge(os.path.join(cache.directory, 'calibre') if cache is not None else None)
+    semaphore = asyncio.Semaphore(subprocess_slots)
+    calibre_queue = iter(calibre_indexes)
+    native_queue = iter(native_indexes)
+    ready = asyncio.Queue()  # Indexes whose EPUB is cached; None once the Calibre stage is over
+
+    async def calibre_stage():
+        for index in calibre_queue:
+            try:
+                await bridge.to_epub_async(input_paths[index], semaphore, limits)
+            except Exception as e:
+                record_failure(index, f"Calibre conversion error: {_error_text(e)}")
+            else:
+                ready.put_nowait(index)
+
+    async def cpu_stage():
+        while True:
+            if not ready.empty():
+                index = ready.get_nowait()
+            else:
+                index = next(native_queue, None)
+                if index is None:
+                    index = await ready.get()
+            if index is None:
+                # Calibre stage over: pass the marker on, finish the native books
+                ready.put_nowait(None)
+                index = next(native_queue, None)
+                if index is None:
+                    return
+
+            task = functools.partial(convert_file_formats, input_paths[index], output_formats, cache=cache,
+                                     pdf_backend=pdf_backend, output_dir=output_dirs[index],
+                                     skip_existing=skip_existing)
+            try:
+                file_results = await loop.run_in_executor(executor, task)
+            except Exception as e:
+                # The worker process died (e.g. killed by the OS) or breached a limit
+                record_failure(index, e)
+            else:
+                _count_cache_lookups(cache, file_results)
+                record(index, file_results)
+
+    cpu_tasks = [asyncio.ensure_future(cpu_stage()) for _ in range(workers)]
+    await asyncio.gather(*(calibre_stage() for _ in range(min(subprocess_slots, len(calibre_indexes)))))
+    ready.put_nowait(None)
+    await asyncio.gather(*cpu_tasks)
+    return results
+
+
+def orchestrate_batch(input_paths, output_formats, workers=1, subprocess_slots=DEFAULT_MAX_CONCURRENT,
+                      limits=None, **kwargs):
+    """
+    Run convert_batch_async() on a new event loop with a process pool of
+    workers, under limits (a limits.WorkerLimits) if given. Other keyword
+    arguments are passed through.
+    """
+    workers = max(1, min(workers, len(input_paths)))
+    with worker_pool(workers, limits) as executor:
+        return asyncio.run(convert_batch_async(input_paths, output_formats, executor, workers,
+                                               subprocess_slots, limits=limits, **kwargs))
@@ -0,0 +1,98 @@
+"""
+PDF backend registry for NotebookLM Converter.
+
+Every entry point renders PDFs through render_pdf(), so the same backend
+produces the same output whether it runs from the GUI, the console or the
+desktop app:
+
+- "reportlab": styled paragraphs laid out by ReportLab platypus
+- "direct":    plain text pages written straight to disk, no layout engine
+- "canvas":    one line per block on a ReportLab canvas (console default)
+- "xhtml2pdf": styled HTML rendered by pisa (desktop app default)
+
+The backend is picked by an explicit name, else the
+NOTEBOOKLM_CONVERTER_PDF_BACKEND environment variable, else the entry
+point's default.
+"""
+
+import os
+
+from .direct_pdf import write_direct_pdf
+from .html_pdf import XHTML2PDF_AVAILABLE, write_html_pdf
+from .reportlab_pdf import PDF_AVAILABLE, write_book_pdf
+from .text_pdf import iter_book_lines, write_text_pdf
+
+
+PDF_BACKEND_ENV = 'NOTEBOOKLM_CONVERTER_PDF_BACKEND'
+DEFAULT_PDF_BACKEND = 'reportlab'
+
+
+class PdfBackend:
+    """
+    A named PDF renderer: render(book, output_path) writes the PDF.
+    """
+
+    __slots__ = ('name', 'render', 'available', 'requirement')
+
+    def __init__(self, name, render, available=True, requirement=None):
+        self.name = name
+        self.render = render
+        self.available = available  # False when its optional dependency is missing
+        self.requirement = requirement  # Package to install when unavailable
+
+    def __repr__(self):
+        return f"PdfBackend({self.name!r})"
+
+
+PDF_BACKENDS = {}
+
+
+def register_pdf_backend(name, render, available=True, requirement=None):
+    """
+    Add (or replace) a PDF backend under name.
+    """
+    PDF_BACKENDS[name] = PdfBackend(name, render, available, requirement)
+    return PDF_BACKENDS[name]
+
+
+def available_pdf_backends():
+    """Names of the registered backends whose dependencies are installed."""
+    return [name for name, backend in PDF_BACKENDS.items() if backend.available]
+
+
+def resolve_pdf_backend(name=None, default=DEFAULT_PDF_BACKEND):
+    """
+    Return the backend name to use: name if given, else the environment
+    setting, else default.
+    """
+    return name or os.environ.get(PDF_BACKEND_ENV) or default
+
+
+def get_pdf_backend(name=None, default=DEFAULT_PDF_BACKEND):
+    """
+    Look up a backend, raising if it is unknown or cannot run here.
+    """
+    name = resolve_pdf_backend(name, default)
+    backend = PDF_BACKENDS.get(name)
+    if backend is None:
+        raise Exception(f"Unknown PDF backend: {name} (choose from {', '.join(PDF_BACKENDS)})")
+    if not backend.available:
+        raise Exception(f"PDF backend {name} is not available. Please install {backend.requirement}.")
+    return backend
+
+
+def render_pdf(book, output_path, backend=None, default=DEFAULT_PDF_BACKEND):
+    """
+    Render a book to output_path with the selected backend.
+    """
+    get_pdf_backend(backend, default).render(book, output_path)
+
+
+def _render_canvas(book, output_path):
+    write_text_pdf(iter_book_lines(book), output_path)
+
+
+register_pdf_backend('reportlab', write_book_pdf, PDF_AVAILABLE, 'reportlab')
+register_pdf_backend('direct', write_direct_pdf)
+register_pdf_backend('canvas', _render_canvas, PDF_AVAILABLE, 'reportlab')
+register_pdf_backend('xhtml2pdf', write_html_pdf, XHTML2PDF_AVAILABLE, 'xhtml2pdf')
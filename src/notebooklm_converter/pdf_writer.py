@@ -0,0 +1,83 @@
+"""
+Minimal streaming PDF object writer.
+
+PdfWriter writes numbered objects straight to a binary file as they are
+produced and keeps only their byte offsets for the cross-reference table.
+Subclasses add pages (image pages for comics, text pages for the direct
+text backend); close() writes the page tree, catalog, info dictionary and
+xref table.
+"""
+
+import zlib
+
+
+def pdf_text_string(text):
+    """Encode text as a PDF string (UTF-16BE with BOM, hex encoded)."""
+    return b'<feff' + text.encode('utf-16-be').hex().encode('ascii') + b'>'
+
+
+class PdfWriter:
+    """
+    Streams PDF objects to f; pages are registered with _add_page().
+    """
+
+    CATALOG, PAGES, INFO = 1, 2, 3
+
+    def __init__(self, f, compress=False):
+        self.f = f
+        self.compress = compress  # Flate-compress content streams
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 4
+        self.f.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+
+    def _allocate(self):
+        object_id = self.next_id
+        self.next_id += 1
+        return object_id
+
+    def _begin(self, object_id):
+        self.offsets[object_id] = self.f.tell()
+        self.f.write(b'%d 0 obj\n' % object_id)
+
+    def _write_object(self, object_id, body):
+        self._begin(object_id)
+        self.f.write(body)
+        self.f.write(b'\nendobj\n')
+
+    def _write_stream(self, object_id, dictionary, data):
+        self._begin(object_id)
+        self.f.write(b'<< ' + dictionary + b' /Length %d >>\nstream\n' % len(data))
+        self.f.write(data)
+        self.f.write(b'\nendstream\nendobj\n')
+
+    def _write_content(self, object_id, data):
+        """Write a page content stream, compressed if enabled."""
+        if self.compress:
+            self._write_stream(object_id, b'/Filter /FlateDecode', zlib.compress(data))
+        else:
+            self._write_stream(object_id, b'', data)
+
+    def _add_page(self, width, height, resources, content_id):
+        """Write a page object and append it to the page tree."""
+        page_id = self._allocate()
+        self._write_object(page_id, b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] '
+                           b'/Resources %s /Contents %d 0 R >>'
+                           % (self.PAGES, width, height, resources, content_id))
+        self.page_ids.append(page_id)
+
+    def close(self, title=None):
+        """Write the page tree, catalog, info dictionary and cross-reference table."""
+        kids = b' '.join(b'%d 0 R' % page_id for page_id in self.page_ids)
+        self._write_object(self.PAGES, b'<< /Type /Pages /Kids [%s] /Count %d >>'
+                           % (kids, len(self.page_ids)))
+        self._write_object(self.CATALOG, b'<< /Type /Catalog /Pages %d 0 R >>' % self.PAGES)
+        self._write_object(self.INFO, b'<< /Title %s /Producer (NotebookLM Converter) >>'
+                           % pdf_text_string(title or ''))
+
+        xref_offset = self.f.tell()
+        self.f.write(b'xref\n0 %d\n0000000000 65535 f \n' % self.next_id)
+        for object_id in range(1, self.next_id):
+            self.f.write(b'%010d 00000 n \n' % self.offsets[object_id])
+        self.f.write(b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                     % (self.next_id, self.CATALOG, self.INFO, xref_offset))
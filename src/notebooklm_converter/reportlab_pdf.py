@@ -0,0 +1,137 @@
+"""
+Streaming ReportLab PDF rendering for NotebookLM Converter.
+
+ReportLab's doc.build() expects a list of every flowable in the document.
+FlowableStream is a list that refills itself from a generator whenever it
+runs low, so only a few pages' worth of Paragraphs exist at any time and
+the book's chapters can stay a lazy generator all the way to the PDF.
+
+Hard-wrapped lines are merged into real paragraphs, spacing comes from
+the paragraph styles rather than Spacer flowables, and since book text is
+plain (never markup) each Paragraph is handed a ready-made fragment
+instead of going through ReportLab's markup parser.
+"""
+
+import functools
+from itertools import islice
+
+try:
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph
+    from reportlab.platypus.paraparser import ParaFrag
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+from .document import iter_paragraphs
+
+
+# Flowables kept queued ahead of the layout engine, roughly a few pages
+FLOWABLE_BATCH_SIZE = 256
+# Space after body paragraphs and the author line, in points
+PARAGRAPH_SPACING = 12
+
+
+class FlowableStream(list):
+    """
+    List of flowables that pulls the next batch from an iterable when
+    fewer than batch_size remain.
+
+    doc.build() only inspects len(), the head of the list and deletes or
+    inserts at the front, so topping up inside __len__ is enough to keep
+    it fed.
+    """
+
+    def __init__(self, flowables, batch_size=FLOWABLE_BATCH_SIZE):
+        super().__init__()
+        self._source = iter(flowables)
+        self.batch_size = batch_size
+        self._refill()
+
+    def _refill(self):
+        if self._source is not None and list.__len__(self) < self.batch_size:
+            before = list.__len__(self)
+            self.extend(islice(self._source, self.batch_size))
+            if list.__len__(self) == before:
+                self._source = None
+
+    def __len__(self):
+        self._refill()
+        return list.__len__(self)
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+@functools.lru_cache(maxsize=None)
+def notebooklm_styles():
+    """
+    Paragraph styles for NotebookLM PDFs, built once per process.
+    Keys are 'Title', 'Author', 'Body' and heading levels 1-6.
+    """
+    sample = getSampleStyleSheet()
+    styles = {
+        'Title': sample['Title'],
+        'Author': ParagraphStyle('NotebookLMAuthor', parent=sample['Normal'], spaceAfter=PARAGRAPH_SPACING),
+        'Body': ParagraphStyle('NotebookLMBody', parent=sample['Normal'], spaceAfter=PARAGRAPH_SPACING),
+    }
+    for level in range(1, 7):
+        styles[level] = sample[f'Heading{level}']
+    return styles
+
+
+@functools.lru_cache(maxsize=None)
+def _fragment_template(style):
+    """The single text fragment ReportLab's parser would produce for plain text in style."""
+    frag = ParaFrag()
+    frag.fontName = style.fontName
+    frag.fontSize = style.fontSize
+    frag.textColor = style.textColor
+    frag.rise = 0
+    frag.greek = 0
+    frag.bold = 0
+    frag.italic = 0
+    frag.link = []
+    frag.us_lines = []
+    frag.text = ''
+    return frag
+
+
+def plain_paragraph(text, style):
+    """
+    Paragraph for plain text (no markup or entities), skipping the markup parser.
+    """
+    return Paragraph(text, style, frags=[_fragment_template(style).clone(text=text)])
+
+
+def iter_book_flowables(book, styles=None):
+    """
+    Yield the flowables for a book: metadata headers, then chapter titles
+    and paragraphs in order.
+    """
+    styles = styles or notebooklm_styles()
+
+    # Add metadata headers for NotebookLM
+    if book.title:
+        yield plain_paragraph(book.title, styles['Title'])
+    if book.author:
+        yield plain_paragraph(f"Author: {book.author}", styles['Author'])
+
+    # Add content as paragraphs, chapter by chapter
+    for chapter in book.chapters:
+        if chapter.title:
+            yield plain_paragraph(chapter.title, styles[chapter.level])
+        for block in iter_paragraphs(chapter.blocks):
+            yield plain_paragraph(block.text, styles[block.level] if block.level else styles['Body'])
+
+
+def write_book_pdf(book, output_path, batch_size=FLOWABLE_BATCH_SIZE):
+    """
+    Render a book to PDF, feeding ReportLab batch_size flowables at a time.
+    """
+    if not PDF_AVAILABLE:
+        raise Exception("PDF support not available. Please install reportlab.")
+
+    doc = SimpleDocTemplate(output_path, pagesize=letter)
+    doc.build(FlowableStream(iter_book_flowables(book), batch_size))
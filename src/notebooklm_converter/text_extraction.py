@@ -0,0 +1,240 @@
+"""
+Text extraction engines for EPUB/XHTML chapter documents.
+
+The lxml engine streams the document with etree.iterparse and skips
+script/style subtrees as they are encountered, without building a
+BeautifulSoup tree. BeautifulSoup is kept as a fallback for markup lxml
+cannot make sense of, and as a reference engine for benchmarks.
+
+extract_sections() returns the same text split at <h1>-<h6> elements, so
+heading levels come from the markup in the same single pass.
+"""
+
+import io
+import re
+
+from bs4 import BeautifulSoup
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+SKIPPED_TAGS = frozenset(('script', 'style'))
+HEADING_TAGS = {f'h{level}': level for level in range(1, 7)}
+ENGINES = ('auto', 'lxml', 'bs4')
+
+_DECLARED_ENCODING = re.compile(
+    br'''^\s*<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)["']'''
+    br'''|<meta[^>]+charset\s*=\s*["']?([A-Za-z0-9._-]+)''',
+    re.IGNORECASE,
+)
+_BOMS = (
+    (b'\xef\xbb\xbf', 'utf-8'),
+    (b'\xff\xfe', 'utf-16'),
+    (b'\xfe\xff', 'utf-16'),
+)
+
+
+def detect_encoding(data):
+    """
+    Return the encoding declared by a BOM, XML declaration or meta tag (default utf-8).
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+    match = _DECLARED_ENCODING.search(data[:1024])
+    if match:
+        return (match.group(1) or match.group(2)).decode('ascii').lower()
+    return 'utf-8'
+
+
+def extract_text_bs4(data, parser=None):
+    """
+    Extract text with BeautifulSoup, removing script and style tags.
+    """
+    if parser is None:
+        parser = 'lxml' if LXML_AVAILABLE else 'html.parser'
+    soup = BeautifulSoup(data, parser)
+    for script in soup(list(SKIPPED_TAGS)):
+        script.decompose()
+    return soup.get_text()
+
+
+_HEADING_MARK = re.compile(r'\x01([1-6])(.*?)\x02', re.DOTALL)
+
+
+def extract_sections_bs4(data, parser=None):
+    """
+    Like extract_text_bs4(), but split into (heading level, text) sections.
+    """
+    if parser is None:
+        parser = 'lxml' if LXML_AVAILABLE else 'html.parser'
+    soup = BeautifulSoup(data, parser)
+    for script in soup(list(SKIPPED_TAGS)):
+        script.decompose()
+    # Bracket each outermost heading's text with control characters, which
+    # cannot occur in (X)HTML text, then split get_text() at them
+    for heading in soup(list(HEADING_TAGS)):
+        if heading.find_parent(list(HEADING_TAGS)) is None:
+            heading.insert(0, f"\x01{HEADING_TAGS[heading.name]}")
+            heading.append("\x02")
+
+    text = soup.get_text()
+    sections = []
+    position = 0
+    for match in _HEADING_MARK.finditer(text):
+        sections.append((0, text[position:match.start()]))
+        sections.append((int(match.group(1)), match.group(2)))
+        position = match.end()
+    sections.append((0, text[position:]))
+    return [section for section in sections if section[1]]
+
+
+def _walk_lxml(data):
+    """
+    Stream the document through lxml's HTML parser.
+
+    Returns (pieces, boundaries): the text pieces in document order and a
+    list of (piece index, heading level) marking where each outermost
+    <h1>-<h6> starts (its level) and ends (level 0).
+    """
+    pieces = []
+    boundaries = []
+    # Each frame is [element, skipped, last_child, heading]; the pending
+    # text of a frame is its own .text until a child appears, then that
+    # child's tail.
+    stack = []
+    in_heading = False
+    events = etree.iterparse(
+        io.BytesIO(data),
+        events=('start', 'end', 'comment', 'pi'),
+        html=True,
+        encoding=detect_encoding(data),
+        no_network=True,
+        huge_tree=True,
+    )
+
+    for event, element in events:
+        if event == 'end':
+            frame = stack.pop()
+            if not frame[1]:
+                last_child = frame[2]
+                if last_child is None:
+                    if element.text:
+                        pieces.append(element.text)
+                else:
+                    if last_child.tail:
+                        pieces.append(last_child.tail)
+                    last_child.clear()
+            if frame[3]:
+                boundaries.append((len(pieces), 0))
+                in_heading = False
+            if stack:
+                stack[-1][2] = element
+            continue
+
+        # A new child (element, comment or PI) closes off the parent's pending text
+        skipped = False
+        if stack:
+            parent = stack[-1]
+            skipped = parent[1]
+            if not skipped:
+                last_child = parent[2]
+                if last_child is None:
+                    if parent[0].text:
+                        pieces.append(parent[0].text)
+                else:
+                    if last_child.tail:
+                        pieces.append(last_child.tail)
+                    last_child.clear()
+
+        if event == 'start':
+            tag = element.tag
+            skipped = skipped or tag in SKIPPED_TAGS
+            heading = not skipped and not in_heading and tag in HEADING_TAGS
+            if heading:
+                boundaries.append((len(pieces), HEADING_TAGS[tag]))
+                in_heading = True
+            stack.append([element, skipped, None, heading])
+        elif stack:
+            # Comments and PIs contribute only their tail
+            stack[-1][2] = element
+
+    return pieces, boundaries
+
+
+def extract_text_lxml(data):
+    """
+    Extract text by streaming the document through lxml's HTML parser.
+
+    Produces the same strings as BeautifulSoup.get_text() with the lxml
+    parser: element text and tails in document order, excluding comments,
+    processing instructions and anything inside script/style. The only
+    difference is whitespace after the closing </html>, which lxml drops.
+    """
+    if not data.strip():
+        return ''
+    pieces, _ = _walk_lxml(data)
+    return ''.join(pieces)
+
+
+def extract_sections_lxml(data):
+    """
+    Like extract_text_lxml(), but split into (heading level, text) sections.
+    """
+    if not data.strip():
+        return []
+    pieces, boundaries = _walk_lxml(data)
+    sections = []
+    start = 0
+    level = 0
+    for index, next_level in boundaries:
+        sections.append((level, ''.join(pieces[start:index])))
+        start, level = index, next_level
+    sections.append((level, ''.join(pieces[start:])))
+    return [section for section in sections if section[1]]
+
+
+def extract_text(data, engine='auto'):
+    """
+    Extract the visible text of an HTML/XHTML document given as bytes.
+
+    engine='auto' uses lxml and falls back to BeautifulSoup when lxml is
+    unavailable or cannot parse the markup; 'lxml' and 'bs4' force one engine.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extraction engine: {engine}")
+
+    if engine == 'bs4' or not LXML_AVAILABLE:
+        return extract_text_bs4(data)
+    if engine == 'lxml':
+        return extract_text_lxml(data)
+
+    try:
+        return extract_text_lxml(data)
+    except (etree.LxmlError, LookupError, ValueError):
+        # Malformed markup or an unknown declared encoding
+        return extract_text_bs4(data)
+
+
+def extract_sections(data, engine='auto'):
+    """
+    Extract the visible text of a document as (heading level, text)
+    sections: level 1-6 for the text of an <h1>-<h6> element, 0 for the
+    body text between headings. Engines are chosen as in extract_text().
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown extraction engine: {engine}")
+
+    if engine == 'bs4' or not LXML_AVAILABLE:
+        return extract_sections_bs4(data)
+    if engine == 'lxml':
+        return extract_sections_lxml(data)
+
+    try:
+        return extract_sections_lxml(data)
+    except (etree.LxmlError, LookupError, ValueError):
+        # Malformed markup or an unknown declared encoding
+        return extract_sections_bs4(data)
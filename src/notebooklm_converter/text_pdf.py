@@ -0,0 +1,106 @@
+"""
+Fast plain-text PDF rendering for NotebookLM Converter.
+
+Used by the console converter for large plain-text books. Each page is a
+single ReportLab text object (one BT/ET block with a T* per line) instead
+of a positioned drawString() per line, and lines are wrapped greedily with
+word widths measured once per distinct word rather than on every
+occurrence.
+"""
+
+try:
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    PDF_AVAILABLE = True
+except ImportError:
+    PDF_AVAILABLE = False
+
+
+def iter_book_lines(book):
+    """Yield output lines: one per block, a blank line between chapters."""
+    for index, chapter in enumerate(book.chapters):
+        if index:
+            yield ''
+        if chapter.title:
+            yield chapter.title
+        for block in chapter.blocks:
+            yield block.text
+
+
+class WordWidths(dict):
+    """Rendered width of each word in one font and size, measured on first use."""
+
+    def __init__(self, font_name, font_size):
+        super().__init__()
+        self.font_name = font_name
+        self.font_size = font_size
+        self.space = stringWidth(' ', font_name, font_size)
+
+    def __missing__(self, word):
+        width = self[word] = stringWidth(word, self.font_name, self.font_size)
+        return width
+
+
+def wrap_line(text, max_width, widths):
+    """
+    Greedily wrap text to max_width, like ReportLab's simpleSplit().
+
+    Runs of whitespace collapse to one space, a word wider than the line
+    gets a line of its own, and an empty line yields nothing.
+    """
+    space = widths.space
+    words = []
+    line_width = 0
+    for word in text.split():
+        width = widths[word]
+        if words and line_width + space + width > max_width:
+            yield ' '.join(words)
+            words = [word]
+            line_width = width
+        else:
+            line_width = line_width + space + width if words else width
+            words.append(word)
+    if words:
+        yield ' '.join(words)
+
+
+def write_text_pdf(lines, output_path, font_name="Helvetica", font_size=12, leading=15,
+                   margin=50, pagesize=None):
+    """
+    Render lines of plain text to PDF, wrapped to the page width.
+
+    A blank line leaves one line of space, except at the top of a page.
+    """
+    if not PDF_AVAILABLE:
+        raise Exception("PDF support not available. Please install reportlab.")
+
+    pagesize = pagesize or letter
+    width, height = pagesize
+    top = height - margin
+    lines_per_page = int((top - margin) // leading) + 1
+    widths = WordWidths(font_name, font_size)
+
+    c = canvas.Canvas(str(output_path), pagesize=pagesize)
+    text = None
+    count = 0
+    for line in lines:
+        if not line.strip():
+            if text is not None and count < lines_per_page:
+                text.textLine('')
+                count += 1
+            continue
+        for wrapped_line in wrap_line(line, width - 2 * margin, widths):
+            if count == lines_per_page:  # Start new page
+                c.drawText(text)
+                c.showPage()
+                text = None
+            if text is None:
+                text = c.beginText(margin, top)
+                text.setFont(font_name, font_size, leading)
+                count = 0
+            text.textLine(wrapped_line)
+            count += 1
+    if text is not None:
+        c.drawText(text)
+    c.save()
@@ -0,0 +1,121 @@
+"""
+Streaming TXT and Markdown writers for NotebookLM Converter.
+
+Both writers consume a book's chapters one at a time and write each line
+through a buffered file handle as soon as it is formatted, so memory does
+not grow with the size of the book. The TXT header's content length is
+not known until the body is written; a fixed-width field is reserved for
+it and patched in by seeking back once the body is done.
+"""
+
+from .normalizer import normalize_line
+
+
+WRITE_BUFFER_SIZE = 1 << 16
+# Reserved for "<N> characters" in the TXT header, padded with trailing spaces
+LENGTH_FIELD_WIDTH = 32
+PARAGRAPH_SEPARATOR = '\n\n'
+
+
+def iter_text_lines(book):
+    """
+    Yield the cleaned TXT body lines: metadata, then chapter titles and
+    blocks, with special characters filtered and empty lines dropped.
+    """
+    def raw_lines():
+        yield book.title
+        yield f"Author: {book.author}" if book.author else None
+        yield "---"
+        for chapter in book.chapters:
+            yield chapter.title
+            for block in chapter.blocks:
+                yield block.text
+
+    for line in raw_lines():
+        if line:
+            line = normalize_line(line, filter_chars=True)
+            if line:
+                yield line
+
+
+def iter_markdown_lines(book):
+    """
+    Yield the Markdown body lines. Headers come from the block levels the
+    reader took from the source markup; body text is never promoted.
+    """
+    if book.title:
+        yield f"# {book.title}"
+    if book.author:
+        yield f"**Author:** {book.author}"
+    yield "---"
+
+    for chapter in book.chapters:
+        if chapter.title:
+            yield f"{'#' * chapter.level} {chapter.title}"
+        for block in chapter.blocks:
+            if block.level:
+                yield f"{'#' * block.level} {block.text}"
+            else:
+                yield block.text
+
+
+def text_header(timestamp, length_field):
+    """The TXT header, with length_field after "Content Length: "."""
+    return f"""DOCUMENT OPTIMIZED FOR NOTEBOOKLM
+Generated: {timestamp}
+Content Length: {length_field}
+
+---
+
+"""
+
+
+def markdown_header(timestamp):
+    """The Markdown front matter and document heading."""
+    return f"""---
+title: "Document for NotebookLM"
+format: "Markdown"
+generated: "{timestamp}"
+---
+
+# Document for NotebookLM Analysis
+
+"""
+
+
+def _write_paragraphs(f, lines):
+    """Write lines separated by blank lines; return the characters written."""
+    length = 0
+    for index, line in enumerate(lines):
+        if index:
+            f.write(PARAGRAPH_SEPARATOR)
+            length += len(PARAGRAPH_SEPARATOR)
+        f.write(line)
+        length += len(line)
+    return length
+
+
+def write_notebooklm_txt(book, output_path, timestamp):
+    """
+    Stream a book to a NotebookLM TXT file. Returns the body length in characters.
+    """
+    prefix, suffix = text_header(timestamp, '\0').split('\0')
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(prefix)
+        field_position = f.tell()
+        f.write(' ' * LENGTH_FIELD_WIDTH + suffix)
+
+        length = _write_paragraphs(f, iter_text_lines(book))
+
+        f.seek(field_position)
+        f.write(f"{length} characters".ljust(LENGTH_FIELD_WIDTH))
+    return length
+
+
+def write_notebooklm_markdown(book, output_path, timestamp):
+    """
+    Stream a book to a NotebookLM Markdown file.
+    """
+    with open(output_path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(markdown_header(timestamp))
+        _write_paragraphs(f, iter_markdown_lines(book))
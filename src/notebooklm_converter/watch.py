@@ -0,0 +1,277 @@
+"""
+Watch-folder mode for NotebookLM Converter.
+
+    notebooklm-converter watch inbox/ --formats pdf md --out-dir converted/
+
+Polls an inbox directory and converts books that are new or have changed
+since they were last converted. A file is only picked up once its size and
+modification time have stayed the same for the settle time, so books that
+are still being copied in are left alone. Conversions run in a worker
+pool while polling continues.
+
+Finished work is recorded in a small JSON state file (path relative to the
+inbox -> size, mtime and outcome), so a restarted watcher skips books it
+has already converted. Books that failed are retried only once they change.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+from .cache import ConversionCache, default_cache_dir
+from .cli import add_limit_arguments, format_result, limits_from_args, parse_formats, result_json, scan_directory
+from .converter import convert_file_formats, default_batch_workers
+from .limits import worker_pool
+from .pdf_backends import PDF_BACKENDS
+
+
+STATE_FILE_NAME = '.notebooklm-converter-state.json'
+DEFAULT_INTERVAL = 2.0
+DEFAULT_SETTLE = 5.0
+
+
+def _ignore_interrupt():
+    """Pool initializer: Ctrl+C stops the watcher, which lets workers finish."""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def file_signature(path):
+    """(size, mtime in ns) of a file, or None if it is gone."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+class WatchState:
+    """
+    The state file: converted books by path relative to the inbox.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}  # Relative path -> [size, mtime_ns, "ok" | "failed"]
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f).get('files', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Ignoring unreadable state file {path}: {e}", file=sys.stderr)
+
+    def is_done(self, name, signature):
+        """True if the book was converted (or failed) at exactly this size and mtime."""
+        entry = self.entries.get(name)
+        return entry is not None and tuple(entry[:2]) == signature
+
+    def record(self, name, signature, success):
+        self.entries[name] = [signature[0], signature[1], "ok" if success else "failed"]
+
+    def prune(self, names):
+        """Forget books that are no longer in the inbox."""
+        for name in set(self.entries) - set(names):
+            del self.entries[name]
+
+    def save(self):
+        """Write the state atomically, so a crash never leaves it half written."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': 1, 'files': self.entries}, f, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+class FolderWatcher:
+    """
+    Polls inbox and converts settled new or changed books with a worker pool.
+
+    Usage:
+        watcher = FolderWatcher("inbox", ["PDF"], out_dir="converted")
+        watcher.run()          # until stop() or SIGINT/SIGTERM
+        watcher.run(once=True) # convert what is there now, then return
+    """
+
+    def __init__(self, inbox, output_formats, out_dir=None, state_path=None, workers=1,
+                 interval=DEFAULT_INTERVAL, settle=DEFAULT_SETTLE, cache=None, pdf_backend=None,
+                 on_result=None, limits=None):
+        self.inbox = inbox
+        self.output_formats = output_formats
+        self.out_dir = out_dir
+        self.state = WatchState(state_path or os.path.join(out_dir or inbox, STATE_FILE_NAME))
+        self.workers = workers
+        self.interval = interval
+        self.settle = settle
+        self.cache = cache
+        self.pdf_backend = pdf_backend
+        self.on_result = on_result
+        self.limits = limits  # WorkerLimits for each book, or None
+        self._seen = {}  # Relative path -> (signature, first time seen with it)
+        self._in_flight = set()
+        self._stop = threading.Event()
+
+    def stop(self):
+        """Ask run() to return once the conversions in flight have finished."""
+        self._stop.set()
+
+    def output_dir_for(self, name):
+        if self.out_dir is None:
+            return None
+        return os.path.normpath(os.path.join(self.out_dir, os.path.dirname(name)))
+
+    def scan(self, now=None):
+        """
+        Return [(relative path, signature)] of the books ready to convert:
+        not converted at their current size and mtime, not in flight, and
+        unchanged for at least the settle time.
+        """
+        now = time.monotonic() if now is None else now
+        ready = []
+        present = []
+        for path in scan_directory(self.inbox):
+            name = os.path.relpath(path, self.inbox)
+            present.append(name)
+            signature = file_signature(path)
+            if signature is None or name in self._in_flight or self.state.is_done(name, signature):
+                continue
+            seen = self._seen.get(name)
+            if seen is None or seen[0] != signature:
+                # New or still changing: start (or restart) the settle clock
+                self._seen[name] = seen = (signature, now)
+                if self.settle > 0:
+                    continue
+            if now - seen[1] >= self.settle:
+                ready.append((name, signature))
+
+        for name in set(self._seen) - set(present):
+            del self._seen[name]
+        self.state.prune(present + list(self._in_flight))
+        return ready
+
+    def _finish(self, name, signature, results):
+        success = all(result.success for result in results)
+        self.state.record(name, signature, success)
+        if self.on_result:
+            for result in results:
+                self.on_result(result)
+
+    def run(self, once=False):
+        """
+        Poll and convert until stop() is called, or with once=True, convert
+        the books present now (after they settle) and return. Returns the
+        number of books that failed.
+        """
+        failures = 0
+        with worker_pool(self.workers, self.limits, initializer=_ignore_interrupt) as executor:
+            pending = {}
+            deadline = time.monotonic() + self.settle
+            while True:
+                for name, signature in [] if self._stop.is_set() else self.scan():
+                    if len(pending) >= self.workers * 2:
+                        break  # Still settled on the next poll
+                    future = executor.submit(
+                        convert_file_formats, os.path.join(self.inbox, name), self.output_formats,
+                        cache=self.cache, pdf_backend=self.pdf_backend, output_dir=self.output_dir_for(name))
+                    pending[future] = (name, signature)
+                    del self._seen[name]
+                    self._in_flight.add(name)
+
+                if pending:
+                    done, _ = wait(pending, timeout=self.interval, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name, signature = pending.pop(future)
+                        self._in_flight.discard(name)
+                        try:
+                            results = future.result()
+                        except Exception as e:
+                            # The worker process died or breached a limit; record it so it is not
+                            # retried in a loop
+                            print(f"FAIL  {name}: {e}", file=sys.stderr)
+                            failures += 1
+                            self.state.record(name, signature, False)
+                            continue
+                        failures += not all(result.success for result in results)
+                        self._finish(name, signature, results)
+                    if done:
+                        self.state.save()
+                elif once and not self._seen and time.monotonic() >= deadline:
+                    break
+                else:
+                    self._stop.wait(min(self.interval, self.settle) if once else self.interval)
+
+                if self._stop.is_set() and not pending:
+                    break
+        self.state.save()
+        return failures
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='notebooklm-converter watch',
+        description="Watch a folder and convert new or changed ebooks as they arrive.",
+    )
+    parser.add_argument('inbox', help="directory to watch (searched recursively)")
+    parser.add_argument('-f', '--formats', nargs='+', default=['pdf'], metavar='FORMAT',
+                        help="output formats: pdf, txt, md (default: pdf)")
+    parser.add_argument('-j', '--jobs', type=int, default=default_batch_workers(),
+                        help="books converted in parallel (default: number of CPUs)")
+    parser.add_argument('-o', '--out-dir', help="write outputs here, mirroring the inbox folders")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL,
+                        help=f"seconds between polls (default: {DEFAULT_INTERVAL:g})")
+    parser.add_argument('--settle', type=float, default=DEFAULT_SETTLE,
+                        help=f"seconds a file must stay unchanged before it is converted "
+                             f"(default: {DEFAULT_SETTLE:g})")
+    parser.add_argument('--state', help=f"state file (default: {STATE_FILE_NAME} in the output directory)")
+    parser.add_argument('--once', action='store_true', help="convert what is in the inbox now, then exit")
+    parser.add_argument('--pdf-backend', choices=list(PDF_BACKENDS), help="PDF renderer")
+    parser.add_argument('--cache', nargs='?', const=default_cache_dir(), metavar='DIR',
+                        help="reuse outputs and parsed books from a conversion cache")
+    add_limit_arguments(parser)
+    parser.add_argument('--json', action='store_true', help="print one JSON object per result")
+    return parser
+
+
+def watch_main(argv):
+    """
+    Run the watch command; returns the exit status (1 if a book failed in --once mode).
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        output_formats = parse_formats(args.formats)
+    except argparse.ArgumentTypeError as e:
+        parser.error(str(e))
+    if not os.path.isdir(args.inbox):
+        parser.error(f"not a directory: {args.inbox}")
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    limits = limits_from_args(parser, args)
+
+    def on_result(result):
+        print(result_json(result) if args.json else format_result(result), flush=True)
+
+    watcher = FolderWatcher(args.inbox, output_formats, out_dir=args.out_dir, state_path=args.state,
+                            workers=args.jobs, interval=args.interval, settle=args.settle,
+                            cache=ConversionCache(args.cache) if args.cache else None,
+                            pdf_backend=args.pdf_backend, on_result=on_result, limits=limits)
+
+    def handle_signal(signum, frame):
+        print("Stopping after the conversions in progress...", file=sys.stderr, flush=True)
+        watcher.stop()
+
+    previous = {signum: signal.signal(signum, handle_signal) for signum in (signal.SIGINT, signal.SIGTERM)}
+    try:
+        if not args.once:
+            print(f"Watching {args.inbox} (Ctrl+C to stop)", file=sys.stderr, flush=True)
+        failures = watcher.run(once=args.once)
+    finally:
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    return 1 if args.once and failures else 0
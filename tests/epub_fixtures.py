@@ -0,0 +1,90 @@
+"""
+Helpers for building small EPUB archives in tests.
+"""
+
+import zipfile
+from urllib.parse import unquote
+
+
+CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+CHAPTER_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><title>{title}</title><style>p {{ margin: 0; }}</style></head>
+<body>
+<h1>{title}</h1>
+{body}
+<script>var ignored = 1;</script>
+</body>
+</html>
+"""
+
+
+def chapter_html(title, paragraphs):
+    """Render a simple XHTML chapter."""
+    body = "\n".join(f"<p>{paragraph}</p>" for paragraph in paragraphs)
+    return CHAPTER_TEMPLATE.format(title=title, body=body)
+
+
+def write_epub(path, chapters, title="Test Book", author="Test Author", extra_items=None,
+               nav=None, ncx=None):
+    """
+    Write a minimal EPUB 3 archive.
+
+    chapters is a list of (href, xhtml) pairs in spine order; extra_items is
+    a list of (href, media_type, bytes) manifest entries left out of the spine.
+    nav and ncx are optional navigation documents, stored as nav/toc.xhtml
+    and toc.ncx.
+    """
+    extra_items = extra_items or []
+    manifest = []
+    spine = []
+    toc_attribute = ''
+    if nav is not None:
+        manifest.append('<item id="nav" href="nav/toc.xhtml" media-type="application/xhtml+xml" properties="nav"/>')
+    if ncx is not None:
+        manifest.append('<item id="ncx" href="toc.ncx" media-type="application/x-dtbncx+xml"/>')
+        toc_attribute = ' toc="ncx"'
+    for index, (href, _) in enumerate(chapters):
+        manifest.append(f'<item id="ch{index}" href="{href}" media-type="application/xhtml+xml"/>')
+        spine.append(f'<itemref idref="ch{index}"/>')
+    for index, (href, media_type, _) in enumerate(extra_items):
+        manifest.append(f'<item id="extra{index}" href="{href}" media-type="{media_type}"/>')
+
+    opf = f"""<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="id">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:identifier id="id">test-book</dc:identifier>
+    <dc:title>{title}</dc:title>
+    <dc:creator>{author}</dc:creator>
+    <dc:language>en</dc:language>
+  </metadata>
+  <manifest>
+    {''.join(manifest)}
+  </manifest>
+  <spine{toc_attribute}>
+    {''.join(spine)}
+  </spine>
+</package>
+"""
+
+    with zipfile.ZipFile(path, 'w') as archive:
+        archive.writestr('mimetype', 'application/epub+zip', compress_type=zipfile.ZIP_STORED)
+        archive.writestr('META-INF/container.xml', CONTAINER_XML)
+        archive.writestr('OEBPS/content.opf', opf)
+        for href, xhtml in chapters:
+            archive.writestr(f'OEBPS/{unquote(href)}', xhtml, compress_type=zipfile.ZIP_DEFLATED)
+        for href, _, data in extra_items:
+            archive.writestr(f'OEBPS/{href}', data)
+        if nav is not None:
+            archive.writestr('OEBPS/nav/toc.xhtml', nav)
+        if ncx is not None:
+            archive.writestr('OEBPS/toc.ncx', ncx)
+    return path
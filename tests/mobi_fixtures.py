@@ -0,0 +1,141 @@
+"""
+Helpers for building small MOBI/AZW3 files in tests.
+"""
+
+import struct
+
+
+RECORD_SIZE = 4096
+NULL = 0xFFFFFFFF
+
+
+def palmdoc_compress(data):
+    """
+    Greedy PalmDOC compressor exercising every token type: literal runs,
+    escaped high bytes, space+character pairs and back-references.
+    """
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        # Longest match of 3-10 bytes within the last 2047 bytes
+        best_length = best_distance = 0
+        for distance in range(1, min(i, 2047) + 1):
+            length = 0
+            while length < 10 and i + length < n and data[i + length - distance] == data[i + length]:
+                length += 1
+            if length > best_length:
+                best_length, best_distance = length, distance
+        if best_length >= 3:
+            pair = 0x8000 | (best_distance << 3) | (best_length - 3)
+            out += struct.pack('>H', pair)
+            i += best_length
+            continue
+
+        c = data[i]
+        if c == 0x20 and i + 1 < n and 0x40 <= data[i + 1] <= 0x7F:
+            out.append(data[i + 1] ^ 0x80)
+            i += 2
+        elif c == 0 or 0x09 <= c <= 0x7F:
+            out.append(c)
+            i += 1
+        else:
+            out.append(1)
+            out.append(c)
+            i += 1
+    return bytes(out)
+
+
+def _exth(records):
+    body = b''.join(struct.pack('>LL', record_type, len(value) + 8) + value
+                    for record_type, value in records)
+    padding = (-len(body)) % 4
+    return b'EXTH' + struct.pack('>LL', len(body) + 12 + padding, len(records)) + body + b'\0' * padding
+
+
+def _section(text, title, author, kf8, encoding, compression, encryption, extra_flags, fdst_index=None,
+             boundary=None, text_length=None):
+    """Return (record 0, text records) for one MOBI/KF8 section."""
+    chunks = [text[i:i + RECORD_SIZE] for i in range(0, len(text), RECORD_SIZE)] or [b'']
+    text_records = []
+    for chunk in chunks:
+        record = palmdoc_compress(chunk) if compression == 2 else chunk
+        if extra_flags & 1:
+            # No multibyte overlap: a single length byte of 0
+            record += b'\x00'
+        if extra_flags & 2:
+            # One 3-byte trailing entry whose size (3) is stored in its last byte
+            record += b'\x00\x00\x83'
+        text_records.append(record)
+
+    exth_records = [(100, author.encode('utf-8'))] if author else []
+    if boundary is not None:
+        exth_records.append((121, struct.pack('>L', boundary)))
+    exth = _exth(exth_records)
+    header_length = 0xE8
+    full_name = title.encode('utf-8')
+    full_name_offset = 16 + header_length + len(exth)
+
+    mobi = bytearray(header_length)
+    mobi[0:4] = b'MOBI'
+    struct.pack_into('>LLL', mobi, 4, header_length, 2, 65001 if encoding == 'utf-8' else 1252)
+    struct.pack_into('>L', mobi, 20, 8 if kf8 else 6)
+    struct.pack_into('>LL', mobi, 84 - 16, full_name_offset, len(full_name))
+    struct.pack_into('>L', mobi, 128 - 16, 0x40)
+    struct.pack_into('>LL', mobi, 0xC0 - 16, NULL if fdst_index is None else fdst_index, 2 if fdst_index else 0)
+    struct.pack_into('>H', mobi, 0xF2 - 16, extra_flags)
+
+    palmdoc = struct.pack('>HHLHHHH', compression, 0, len(text) if text_length is None else text_length,
+                          len(text_records), RECORD_SIZE, encryption, 0)
+    record0 = palmdoc + bytes(mobi) + exth + full_name + b'\0\0'
+    return record0, text_records
+
+
+def write_palmdb(path, records, palm_type=b'BOOKMOBI'):
+    """Write records as a PalmDB file."""
+    header = bytearray(78)
+    header[:8] = b'fixture\0'
+    header[60:68] = palm_type
+    struct.pack_into('>H', header, 76, len(records))
+    offset = 78 + 8 * len(records) + 2
+    table = bytearray()
+    for index, record in enumerate(records):
+        table += struct.pack('>LL', offset, index * 2)
+        offset += len(record)
+    with open(path, 'wb') as f:
+        f.write(bytes(header) + bytes(table) + b'\0\0' + b''.join(records))
+
+
+def write_mobi(path, text, title="Fixture", author=None, encoding='utf-8', compression=2,
+               encryption=0, extra_flags=3):
+    """Write a MOBI 6 book whose text is the given markup."""
+    record0, text_records = _section(text, title, author, False, encoding, compression,
+                                     encryption, extra_flags)
+    write_palmdb(path, [record0] + text_records)
+
+
+def write_azw3(path, parts, css=b'p { margin: 0 }', title="Fixture", author=None, combination=False):
+    """
+    Write a KF8 book from a list of XHTML parts, followed by a CSS flow that
+    the FDST record marks as outside the text. With combination=True a
+    MOBI 6 section with different text precedes the KF8 section.
+    """
+    text = b''.join(parts)
+    raw = text + css
+    records = []
+    if combination:
+        old0, old_text = _section(b'<html><body><p>Old MOBI 6 text</p></body></html>', title, author,
+                                  False, 'utf-8', 2, 0, 0)
+        boundary = 1 + len(old_text) + 1
+        records = [old0] + old_text + [b'BOUNDARY']
+        # Patch the KF8 boundary into the first section's EXTH
+        old0, _ = _section(b'<html><body><p>Old MOBI 6 text</p></body></html>', title, author,
+                           False, 'utf-8', 2, 0, 0, boundary=boundary)
+        records[0] = old0
+
+    chunks = max(1, (len(raw) + RECORD_SIZE - 1) // RECORD_SIZE)
+    fdst_index = 1 + chunks
+    record0, text_records = _section(raw, title, author, True, 'utf-8', 2, 0, 3, fdst_index=fdst_index)
+    fdst = b'FDST' + struct.pack('>LL', 12, 2) + struct.pack('>LLLL', 0, len(text), len(text), len(raw))
+    records += [record0] + text_records + [fdst]
+    write_palmdb(path, records)
@@ -0,0 +1,115 @@
+"""
+Tests for the .nlmbook parsed-book format and rendering from it
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.book_file import BookFile, read_book_file, write_book_file
+from notebooklm_converter.cache import ConversionCache
+from notebooklm_converter.converter import NotebookLMConverter, output_path_for, render
+from notebooklm_converter.document import Block, Book, Chapter
+
+
+class TestBookFile(unittest.TestCase):
+    """Test the round trip through the binary format"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "book.nlmbook")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        """Metadata, chapter fields and block levels survive unchanged"""
+        chapters = [
+            Chapter([Block("Café — naïve"), Block("Heading", 2), Block(""), Block("😀 end")],
+                    title="Première", level=2, href="text/one.xhtml"),
+            Chapter([], title=None, href=None),
+        ]
+        book = Book("Title", None, iter(chapters), source="book.epub")
+        self.assertEqual(write_book_file(book, self.path), 2)
+
+        loaded = read_book_file(self.path)
+        self.assertEqual((loaded.title, loaded.author, loaded.source), ("Title", None, self.path))
+        self.assertIsInstance(loaded.chapters, types.GeneratorType)
+        for expected, actual in zip(chapters, loaded.chapters):
+            self.assertEqual((actual.title, actual.level, actual.href, actual.blocks),
+                             (expected.title, expected.level, expected.href, expected.blocks))
+
+        with BookFile(self.path) as book_file:
+            self.assertEqual(len(book_file), 2)
+            self.assertEqual(book_file.source, "book.epub")
+            self.assertEqual(book_file.chapter(1).blocks, [])
+
+    def test_rejects_incomplete_files(self):
+        """Truncated, empty and foreign files raise instead of loading"""
+        write_book_file(Book("Title", "Author", [Chapter([Block("text")])]), self.path)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        for name, content in (("empty", b""), ("foreign", b"%PDF-1.4" + data[8:]),
+                              ("unfinished", bytes(24) + data[24:])):
+            with self.subTest(name):
+                with open(self.path, 'wb') as f:
+                    f.write(content)
+                with self.assertRaises(Exception):
+                    BookFile(self.path)
+
+
+class TestRender(unittest.TestCase):
+    """Test rendering saved and cached parsed books"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.epub = write_epub(os.path.join(self.temp_dir.name, "book.epub"),
+                               [("c1.xhtml", chapter_html("One", ["First.", "Second."]))])
+        self.converter = NotebookLMConverter()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @mock.patch.object(NotebookLMConverter, 'get_current_timestamp', return_value="2024-01-01 00:00:00")
+    def test_render_matches_direct_conversion(self, _):
+        """Rendering a saved book gives the same output as converting the EPUB"""
+        book_path = os.path.join(self.temp_dir.name, "saved.nlmbook")
+        self.converter.save_parsed(self.epub, book_path)
+        direct = output_path_for(self.epub, "MD")
+        self.converter.convert(self.epub, direct, "MD")
+
+        results = render(book_path, ["MD", "TXT"], output_dir=self.temp_dir.name)
+        self.assertTrue(all(result.success for result in results), results)
+        with open(direct, encoding='utf-8') as f, open(results[0].output_path, encoding='utf-8') as g:
+            self.assertEqual(g.read(), f.read())
+
+    def test_render_requires_book_file(self):
+        """render() only accepts parsed book files"""
+        with self.assertRaisesRegex(Exception, "Not a parsed book file"):
+            render(self.epub, "TXT")
+
+    def test_cached_parse_reused_across_settings(self):
+        """Changing the PDF backend re-renders from the parsed book without re-reading the EPUB"""
+        cache = ConversionCache(os.path.join(self.temp_dir.name, "cache"))
+        output_path = output_path_for(self.epub, "PDF")
+        NotebookLMConverter(cache=cache, pdf_backend='direct').convert(self.epub, output_path, "PDF")
+
+        converter = NotebookLMConverter(cache=cache, pdf_backend='canvas')
+        with mock.patch.object(converter, 'extract_from_epub') as extract:
+            self.assertFalse(converter.convert(self.epub, output_path, "PDF"))
+            extract.assert_not_called()
+        with open(output_path, 'rb') as f:
+            self.assertEqual(f.read(5), b'%PDF-')
+        self.assertEqual(converter.parsed_cache().stats()['hits'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Tests for the content-addressed conversion cache
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.cache import STAT_FILE_GRACE, ConversionCache
+from notebooklm_converter.converter import NotebookLMConverter, convert_batch, output_path_for
+
+
+class TestConversionCache(unittest.TestCase):
+    """Test cache keys, hits, misses and LRU eviction"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = ConversionCache(os.path.join(self.temp_dir.name, "cache"))
+        self.book = os.path.join(self.temp_dir.name, "book.epub")
+        write_epub(self.book, [("c1.xhtml", chapter_html("One", ["Cached paragraph."]))], title="Cached")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_key_depends_on_content_format_and_options(self):
+        """Same bytes under another name hit; other bytes, formats or options miss"""
+        first = self.write("a.epub", b"same bytes")
+        renamed = self.write("b.epub", b"same bytes")
+        other = self.write("c.epub", b"other bytes")
+        key = self.cache.key(first, "TXT")
+        self.assertEqual(self.cache.key(renamed, "TXT"), key)
+        self.assertNotEqual(self.cache.key(other, "TXT"), key)
+        self.assertNotEqual(self.cache.key(first, "MD"), key)
+        self.assertNotEqual(self.cache.key(first, "TXT", {"backend": "direct"}), key)
+
+    def test_changed_file_is_rehashed(self):
+        """Rewriting a file in place changes its key"""
+        path = self.write("a.epub", b"version one")
+        key = self.cache.key(path, "TXT")
+        with open(path, 'wb') as f:
+            f.write(b"version two, longer")
+        self.assertNotEqual(self.cache.key(path, "TXT"), key)
+
+    def test_convert_hits_skip_parsing(self):
+        """A second conversion is copied from the cache without reading the book"""
+        converter = NotebookLMConverter(cache=self.cache)
+        output_path = output_path_for(self.book, "TXT")
+        self.assertFalse(converter.convert(self.book, output_path, "TXT"))
+        with open(output_path, 'rb') as f:
+            expected = f.read()
+        os.remove(output_path)
+
+        with mock.patch.object(converter, 'extract_from_epub') as extract:
+            self.assertTrue(converter.convert_ebook(self.book, output_path, "TXT"))
+            extract.assert_not_called()
+        with open(output_path, 'rb') as f:
+            self.assertEqual(f.read(), expected)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['entries']), (1, 1, 1))
+
+    def test_batch_reports_cached_results(self):
+        """Batch results flag outputs served from the cache"""
+        first = convert_batch([self.book], "MD", cache=self.cache)
+        second = convert_batch([self.book], "MD", cache=self.cache)
+        self.assertEqual([r.cached for r in first + second], [False, True])
+
+    def test_pooled_batch_counts_lookups(self):
+        """Lookups made in worker processes show up in the parent's counters"""
+        other = os.path.join(self.temp_dir.name, "other.epub")
+        write_epub(other, [("c1.xhtml", chapter_html("Two", ["Other paragraph."]))])
+        for _ in range(2):
+            convert_batch([self.book, other], "MD", workers=2, cache=self.cache)
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 2))
+
+    def test_lru_eviction(self):
+        """The least recently used entries are evicted first once over max_bytes"""
+        self.cache.max_bytes = 250
+        output = self.write("out.txt", b"x" * 100)
+        inputs = [self.write(f"in{i}.epub", bytes([i])) for i in range(3)]
+        keys = [self.cache.key(path, "TXT") for path in inputs]
+        self.cache.store(keys[0], output)
+        self.cache.store(keys[1], output)
+        # Touch the first entry so the second becomes least recently used
+        object_paths = [self.cache._object_path(key) for key in keys]
+        os.utime(object_paths[1], (1, 1))
+        self.assertTrue(self.cache.fetch(keys[0], os.path.join(self.temp_dir.name, "copy.txt")))
+        self.cache.store(keys[2], output)
+        self.assertEqual([os.path.exists(path) for path in object_paths], [True, False, True])
+        self.assertEqual(self.cache.stats()['size_bytes'], 200)
+
+        # The evicted entry took its input's remembered hash with it
+        self.assertEqual([self.cache.known_hash(path) is not None for path in inputs], [True, False, True])
+        self.assertFalse(os.path.exists(object_paths[1] + ".stat"))
+
+    def test_unreferenced_stat_files_swept(self):
+        """Stat files of inputs that were never stored go once past the grace period"""
+        output = self.write("out.txt", b"x" * 10)
+        stored, failed, recent = [self.write(f"in{i}.epub", bytes([i])) for i in range(3)]
+        self.cache.store(self.cache.key(stored, "TXT"), output)
+        self.cache.key(failed, "TXT")
+        self.cache.key(recent, "TXT")
+        old = os.path.getmtime(stored) - STAT_FILE_GRACE - 60
+        for path in (stored, failed):
+            stat_path = self.cache._content_hash(path)[1]
+            os.utime(stat_path, (old, old))
+        self.cache.evict()
+        self.assertEqual([self.cache.known_hash(path) is not None for path in (stored, failed, recent)],
+                         [True, False, True])
+
+    def test_store_keeps_running_total(self):
+        """Stores under max_bytes do not rescan the cache directory"""
+        output = self.write("out.txt", b"x" * 100)
+        inputs = [self.write(f"in{i}.epub", bytes([i])) for i in range(5)]
+        with mock.patch.object(self.cache, '_entries', wraps=self.cache._entries) as entries:
+            for path in inputs:
+                self.cache.store(self.cache.key(path, "TXT"), output)
+            self.assertEqual(entries.call_count, 1)  # The first store learns the size
+            self.cache.max_bytes = 450
+            self.cache.store(self.cache.key(inputs[0], "MD"), output)
+            self.assertEqual(entries.call_count, 2)
+        self.assertEqual(self.cache.stats()['size_bytes'], 400)
+        self.assertEqual(self.cache._key_stat_paths, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,189 @@
+"""
+Tests for the Calibre bridge, using a stand-in ebook-convert script
+"""
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.cache import ConversionCache
+from notebooklm_converter.calibre import CALIBRE_BINARY_ENV, CalibreBridge, find_ebook_convert, get_bridge
+from notebooklm_converter.converter import NotebookLMConverter, convert_batch
+from notebooklm_converter.limits import WorkerLimits, resource
+
+
+# Stand-in for ebook-convert: the test "MOBI" files are EPUBs, so copying
+# the input is a valid conversion. Each call is logged; inputs containing
+# "broken" fail like Calibre does, "hang" never finish and "spin" burn CPU.
+STAND_IN_SCRIPT = """#!{python}
+import shutil
+import sys
+import time
+
+with open({log!r}, 'a') as log:
+    log.write(sys.argv[1] + '\\n')
+if 'broken' in sys.argv[1]:
+    sys.stderr.write('Unsupported input\\n')
+    sys.exit(1)
+if 'hang' in sys.argv[1]:
+    time.sleep(600)
+while 'spin' in sys.argv[1]:
+    pass
+shutil.copyfile(sys.argv[1], sys.argv[2])
+"""
+
+
+@unittest.skipIf(os.name == 'nt', "stand-in script needs a POSIX shebang")
+class TestCalibreBridge(unittest.TestCase):
+    """Test Calibre conversions, the EPUB cache and the missing-binary path"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.temp_dir.name, "calls.log")
+        script_path = os.path.join(self.temp_dir.name, "ebook-convert")
+        with open(script_path, 'w') as f:
+            f.write(STAND_IN_SCRIPT.format(python=sys.executable, log=self.log_path))
+        os.chmod(script_path, os.stat(script_path).st_mode | stat.S_IEXEC)
+
+        patcher = mock.patch.dict(os.environ, {CALIBRE_BINARY_ENV: script_path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        find_ebook_convert.cache_clear()
+        self.addCleanup(find_ebook_convert.cache_clear)
+
+        self.books = []
+        for index in range(3):
+            path = os.path.join(self.temp_dir.name, f"book{index}.mobi")
+            write_epub(path, [("c1.xhtml", chapter_html("Kindle", [f"Mobi text {index}."]))],
+                       title=f"Mobi {index}")
+            self.books.append(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def calls(self):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path) as f:
+            return f.read().split()
+
+    def test_binary_probed_once(self):
+        """find_ebook_convert resolves the override once and remembers it"""
+        with mock.patch('os.path.isfile', return_value=True) as isfile:
+            find_ebook_convert()
+            find_ebook_convert()
+        self.assertEqual(isfile.call_count, 1)
+
+    def test_epub_cached_by_input_hash(self):
+        """The same book, even renamed, is only converted once"""
+        bridge = CalibreBridge(os.path.join(self.temp_dir.name, "epubs"))
+        self.addCleanup(bridge.shutdown)
+        first = bridge.to_epub(self.books[0])
+        renamed = os.path.join(self.temp_dir.name, "renamed.azw3")
+        shutil.copyfile(self.books[0], renamed)
+        self.assertEqual(bridge.to_epub(renamed), first)
+        self.assertEqual(len(self.calls()), 1)
+
+    def test_conversion_error(self):
+        """Calibre's stderr is reported in the extraction error"""
+        broken = os.path.join(self.temp_dir.name, "broken.mobi")
+        with open(broken, 'wb') as f:
+            f.write(b"not a book")
+        converter = NotebookLMConverter(cache=ConversionCache(os.path.join(self.temp_dir.name, "cache")))
+        with self.assertRaisesRegex(Exception, "MOBI conversion error: Unsupported input"):
+            converter.extract_from_mobi(broken)
+
+    def test_missing_calibre(self):
+        """A missing binary gives the install hint without running anything"""
+        with mock.patch.dict(os.environ, {CALIBRE_BINARY_ENV: os.path.join(self.temp_dir.name, "absent")}):
+            find_ebook_convert.cache_clear()
+            with self.assertRaisesRegex(Exception, "Calibre is not installed"):
+                NotebookLMConverter().extract_from_mobi(self.books[0])
+
+    def test_batch_prefetch(self):
+        """A sequential batch prefetches every Calibre input exactly once"""
+        cache = ConversionCache(os.path.join(self.temp_dir.name, "cache"))
+        results = convert_batch(self.books, "TXT", cache=cache)
+        self.assertEqual([result.success for result in results], [True, True, True])
+        self.assertCountEqual(self.calls(), self.books)
+        with open(results[2].output_path, encoding='utf-8') as f:
+            self.assertIn("Mobi text 2.", f.read())
+
+    def test_prefetch_skip_existing(self):
+        """A sequential re-run whose outputs all exist does not prefetch anything"""
+        convert_batch(self.books, "TXT", cache=ConversionCache(os.path.join(self.temp_dir.name, "cache")))
+        os.remove(self.log_path)
+        cache = ConversionCache(os.path.join(self.temp_dir.name, "cache2"))
+        results = convert_batch(self.books, "TXT", skip_existing=True, cache=cache)
+        get_bridge(os.path.join(cache.directory, 'calibre')).shutdown()  # Wait for any prefetch
+        self.assertEqual([result.skipped for result in results], [True, True, True])
+        self.assertEqual(self.calls(), [])
+
+    def test_orchestrated_mixed_batch(self):
+        """A pooled mixed batch runs Calibre once per book and keeps results in input order"""
+        broken = os.path.join(self.temp_dir.name, "broken.mobi")
+        with open(broken, 'wb') as f:
+            f.write(b"not a book")
+        native = os.path.join(self.temp_dir.name, "native.epub")
+        write_epub(native, [("c1.xhtml", chapter_html("Native", ["Epub text."]))])
+        inputs = [self.books[0], native, broken, self.books[1]]
+
+        cache = ConversionCache(os.path.join(self.temp_dir.name, "cache"))
+        streamed = []
+        results = convert_batch(inputs, ["TXT", "MD"], workers=2, cache=cache, on_result=streamed.append)
+        self.assertEqual([(r.input_path, r.output_format) for r in results],
+                         [(path, fmt) for path in inputs for fmt in ("TXT", "MD")])
+        self.assertEqual([r.success for r in results], [True, True, True, True, False, False, True, True])
+        self.assertIn("Unsupported input", results[4].error)
+        self.assertCountEqual(streamed, results)
+        # Workers found the EPUBs in the Calibre cache instead of converting again
+        self.assertCountEqual(self.calls(), [self.books[0], broken, self.books[1]])
+        with open(results[6].output_path, encoding='utf-8') as f:
+            self.assertIn("Mobi text 1.", f.read())
+
+    def test_orchestrated_skip_existing(self):
+        """A re-run whose outputs all exist does not run Calibre"""
+        first = convert_batch(self.books, "TXT", workers=2,
+                              cache=ConversionCache(os.path.join(self.temp_dir.name, "cache")))
+        self.assertEqual([result.success for result in first], [True, True, True])
+        os.remove(self.log_path)
+        # A fresh cache, so only skip_existing can avoid the conversions
+        results = convert_batch(self.books, "TXT", workers=2, skip_existing=True,
+                                cache=ConversionCache(os.path.join(self.temp_dir.name, "cache2")))
+        self.assertEqual([result.skipped for result in results], [True, True, True])
+        self.assertEqual(self.calls(), [])
+
+    @unittest.skipIf(resource is None, "needs the resource module")
+    def test_orchestrated_limits(self):
+        """A hung or spinning ebook-convert fails its own book only"""
+        inputs = [self.books[0]]
+        for name in ("hang.mobi", "spin.mobi"):
+            path = os.path.join(self.temp_dir.name, name)
+            shutil.copyfile(self.books[1], path)
+            inputs.append(path)
+
+        cache = ConversionCache(os.path.join(self.temp_dir.name, "cache"))
+        start = time.monotonic()
+        results = convert_batch(inputs[:2], "TXT", workers=2, cache=cache, limits=WorkerLimits(timeout=2))
+        self.assertLess(time.monotonic() - start, 60)
+        self.assertEqual([r.success for r in results], [True, False])
+        self.assertEqual(results[1].error, "Calibre conversion error: Timed out after 2 s")
+
+        if hasattr(resource, 'prlimit'):
+            results = convert_batch(inputs[2:], "TXT", cache=cache, limits=WorkerLimits(cpu_time=1))
+            self.assertEqual(results[0].error,
+                             "Calibre conversion error: ebook-convert stopped: CPU time limit exceeded")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Tests for the headless batch command line
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter import console as console_module
+from notebooklm_converter.cli import collect_inputs, is_console_command, main
+
+
+class TestCli(unittest.TestCase):
+    """Test input expansion, output placement and exit status"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.library = os.path.join(self.root, "library")
+        for name in ("a/book.epub", "b/book.epub", "top.epub", ".hidden/skip.epub"):
+            path = os.path.join(self.library, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_epub(path, [("c1.xhtml", chapter_html("One", ["Batch paragraph."]))])
+        with open(os.path.join(self.library, "notes.txt"), 'w') as f:
+            f.write("not a book")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = main(list(argv))
+        return status, stdout.getvalue()
+
+    def test_collect_inputs(self):
+        """Directories recurse (files first, then subdirectories by name), globs expand, duplicates collapse"""
+        top = os.path.join(self.library, "top.epub")
+        inputs, missing = collect_inputs([self.library, os.path.join(self.library, "*.epub"), "nothing/*.epub"])
+        self.assertEqual(inputs, [
+            (top, "."),
+            (os.path.join(self.library, "a", "book.epub"), "a"),
+            (os.path.join(self.library, "b", "book.epub"), "b"),
+        ])
+        self.assertEqual(missing, ["nothing/*.epub"])
+
+    def test_out_dir_mirrors_directories(self):
+        """Books with the same name in different folders get separate outputs"""
+        out_dir = os.path.join(self.root, "out")
+        status, output = self.run_cli(self.library, "--formats", "txt,md", "--jobs", "1", "--out-dir", out_dir)
+        self.assertEqual(status, 0, output)
+        for name in ("a/book_NotebookLM.txt", "b/book_NotebookLM.md", "top_NotebookLM.txt"):
+            self.assertTrue(os.path.exists(os.path.join(out_dir, name)), name)
+        self.assertEqual(output.count("ok "), 6)
+
+    def test_skip_existing_and_failures(self):
+        """Existing outputs are skipped; a bad file or missing path exits non-zero"""
+        out_dir = os.path.join(self.root, "out")
+        self.run_cli(os.path.join(self.library, "top.epub"), "-f", "md", "-j", "1", "-o", out_dir)
+
+        bad = os.path.join(self.root, "bad.epub")
+        with open(bad, 'wb') as f:
+            f.write(b"not a zip")
+        status, output = self.run_cli(os.path.join(self.library, "top.epub"), bad, "-f", "md", "-j", "1",
+                                      "-o", out_dir, "--skip-existing", "--json")
+        records = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(status, 1)
+        self.assertEqual([record['status'] for record in records], ['skipped', 'failed'])
+
+        status, _ = self.run_cli(os.path.join(self.root, "missing.epub"), "-j", "1")
+        self.assertEqual(status, 1)
+
+    def test_console_form(self):
+        """'<input> <format> ...' still runs the single-file console converter"""
+        book = os.path.join(self.library, "top.epub")
+        self.assertTrue(is_console_command([book, "txt", "--pdf-backend", "direct", "markdown"]))
+        self.assertTrue(is_console_command([book, "pdf,txt"]))
+        self.assertFalse(is_console_command([book]))
+        self.assertFalse(is_console_command([book, os.path.join(self.library, "a", "book.epub")]))
+        self.assertFalse(is_console_command([book, "txt", "--jobs", "2"]))
+
+        status, output = self.run_cli(book, "txt", "markdown")
+        self.assertEqual(status, 0, output)
+        self.assertIn("Console Mode", output)
+        for suffix in (".txt", ".markdown"):
+            self.assertTrue(os.path.exists(os.path.join(self.library, "top" + suffix)), suffix)
+
+    def test_console_pdf_fallback(self):
+        """A failed PDF falls back to text by reading the book again"""
+        book = os.path.join(self.library, "top.epub")
+        with mock.patch.object(console_module, 'render_pdf', side_effect=Exception("no fonts")):
+            status, output = self.run_cli(book, "pdf,markdown")
+        self.assertEqual(status, 0, output)
+        self.assertIn("Error creating PDF: no fonts", output)
+        self.assertIn("top.txt", output)
+        with open(os.path.join(self.library, "top.txt"), encoding='utf-8') as f:
+            self.assertIn("Batch paragraph.", f.read())
+        with open(os.path.join(self.library, "top.markdown"), encoding='utf-8') as f:
+            self.assertIn("Batch paragraph.", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Tests for the comic-to-PDF image renderer
+"""
+
+import io
+import os
+import re
+import sys
+import tempfile
+import unittest
+import zipfile
+
+from PIL import Image
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.comic_pdf import prepare_page, render_comic_pdf
+from notebooklm_converter.converter import NotebookLMConverter
+
+
+def image_bytes(fmt, size=(300, 400), mode='RGB', color=(200, 30, 30)):
+    """Encode a solid-color test image."""
+    buffer = io.BytesIO()
+    Image.new(mode, size, color).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class TestComicPdf(unittest.TestCase):
+    """Test JPEG passthrough, downscaling and the PDF structure"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.jpeg = image_bytes('JPEG')
+        self.comic_path = os.path.join(self.temp_dir.name, "issue.cbz")
+        with zipfile.ZipFile(self.comic_path, 'w') as archive:
+            archive.writestr("p1.jpg", self.jpeg)
+            archive.writestr("p2.png", image_bytes('PNG', mode='RGBA', color=(0, 0, 255, 128)))
+            archive.writestr("p10.gif", image_bytes('GIF', size=(100, 50), mode='P', color=3))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_prepare_page(self):
+        """RGB JPEGs pass through; other images are re-encoded and reduced"""
+        self.assertEqual(prepare_page(self.jpeg), (self.jpeg, 300, 400, b'/DeviceRGB'))
+
+        data, width, height, color_space = prepare_page(image_bytes('PNG', size=(1000, 500)), max_pixels=300)
+        self.assertEqual((width, height, color_space), (250, 125, b'/DeviceRGB'))
+        self.assertEqual(Image.open(io.BytesIO(data)).format, 'JPEG')
+
+        cmyk = image_bytes('JPEG', mode='CMYK', color=(0, 0, 0, 0))
+        self.assertNotEqual(prepare_page(cmyk)[0], cmyk)
+
+    def test_render(self):
+        """Every page is written in order, with JPEG bytes embedded verbatim"""
+        output_path = os.path.join(self.temp_dir.name, "issue.pdf")
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                self.assertEqual(render_comic_pdf(self.comic_path, output_path, title="Issue", workers=workers), 3)
+                with open(output_path, 'rb') as f:
+                    pdf = f.read()
+                self.assertTrue(pdf.startswith(b'%PDF-1.4'))
+                self.assertTrue(pdf.rstrip().endswith(b'%%EOF'))
+                self.assertIn(self.jpeg, pdf)
+                self.assertEqual(re.findall(rb'/Width (\d+) /Height (\d+)', pdf),
+                                 [(b'300', b'400'), (b'300', b'400'), (b'100', b'50')])
+                xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+                self.assertTrue(pdf[xref:].startswith(b'xref\n0 13\n'))
+
+    def test_no_pages(self):
+        """An archive without images fails before the output is created"""
+        empty_path = os.path.join(self.temp_dir.name, "empty.cbz")
+        with zipfile.ZipFile(empty_path, 'w') as archive:
+            archive.writestr("notes.txt", "no pages")
+        output_path = os.path.join(self.temp_dir.name, "empty.pdf")
+        with self.assertRaisesRegex(Exception, "No page images"):
+            render_comic_pdf(empty_path, output_path)
+        self.assertFalse(os.path.exists(output_path))
+
+    def test_converter_uses_image_pdf(self):
+        """Comic to PDF conversions produce the image PDF"""
+        output_path = os.path.join(self.temp_dir.name, "out.pdf")
+        NotebookLMConverter().convert(self.comic_path, output_path, "PDF")
+        with open(output_path, 'rb') as f:
+            self.assertIn(self.jpeg, f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Tests for the lazy comic archive manifest
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.comic_reader import ComicArchive, natural_sort_key, read_comic
+
+
+class TestComicReader(unittest.TestCase):
+    """Test page ordering and that scanning never reads page bytes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, "issue.cbz")
+        with zipfile.ZipFile(self.path, 'w') as archive:
+            for name in ("page10.jpg", "page2.png", "page1.jpg", "__MACOSX/._page1.jpg",
+                         "credits.txt", "extras/", "extras/Page3.JPG"):
+                archive.writestr(name, b"" if name.endswith('/') else name.encode('ascii') * 100)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_natural_sort_key(self):
+        """Numbers inside names sort by value"""
+        names = ["p10.jpg", "p9.jpg", "P1.jpg", "p1a.jpg"]
+        self.assertEqual(sorted(names, key=natural_sort_key), ["P1.jpg", "p1a.jpg", "p9.jpg", "p10.jpg"])
+
+    def test_manifest_skips_non_pages(self):
+        """Only images are listed, in natural order, without reading them"""
+        with mock.patch.object(zipfile.ZipFile, 'read', side_effect=AssertionError("page read")), \
+                mock.patch.object(zipfile.ZipFile, 'open', side_effect=AssertionError("page opened")):
+            with ComicArchive(self.path) as comic:
+                pages = comic.pages
+            book = read_comic(self.path)
+        self.assertEqual([page.name for page in pages],
+                         ["extras/Page3.JPG", "page1.jpg", "page2.png", "page10.jpg"])
+        self.assertEqual([page.number for page in pages], [1, 2, 3, 4])
+        self.assertEqual(pages[1].size, len(b"page1.jpg") * 100)
+        self.assertEqual(book.chapters[0].blocks[0].text, "Total pages: 4")
+        self.assertEqual(book.chapters[-1].title, "Page 4: page10.jpg")
+
+    def test_page_data_on_demand(self):
+        """Pages are read one at a time when asked for"""
+        with ComicArchive(self.path) as comic:
+            data = [(page.name, content[:9]) for page, content in comic.iter_page_data()]
+            with comic.open_page(comic.pages[-1]) as stream:
+                self.assertEqual(stream.read(10), b"page10.jp" + b"g")
+        self.assertEqual(data[1], ("page1.jpg", b"page1.jpg"))
+
+    def test_cbr_rejected(self):
+        """CBR archives keep the existing unsupported-format message"""
+        with self.assertRaisesRegex(Exception, "CBR format is not supported"):
+            ComicArchive(os.path.join(self.temp_dir.name, "issue.cbr"))
+
+
+if __name__ == '__main__':
+    unittest.main()
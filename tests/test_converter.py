@@ -0,0 +1,176 @@
+"""
+Tests for the headless conversion core
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter import converter as converter_module
+from notebooklm_converter.cache import ConversionCache
+from notebooklm_converter.converter import (
+    NotebookLMConverter,
+    convert_batch,
+    convert_file,
+    output_path_for,
+)
+from notebooklm_converter.document import Block, Book, Chapter, fan_out
+
+
+class TestConverter(unittest.TestCase):
+    """Test single-file and batch conversion without a GUI"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.books = []
+        for index in range(3):
+            path = os.path.join(self.temp_dir.name, f"book{index}.epub")
+            write_epub(path, [("c1.xhtml", chapter_html(f"Book {index}", [f"Text of book {index}."]))],
+                       title=f"Book {index}")
+            self.books.append(path)
+        self.broken = os.path.join(self.temp_dir.name, "broken.epub")
+        with open(self.broken, 'wb') as f:
+            f.write(b"not a zip file")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_output_path_for(self):
+        """Outputs are written next to the input with a _NotebookLM suffix"""
+        self.assertEqual(output_path_for(os.path.join("dir", "book.epub"), "MD"),
+                         os.path.join("dir", "book_NotebookLM.md"))
+
+    def test_convert_ebook(self):
+        """convert_ebook returns True and writes the output"""
+        output_path = output_path_for(self.books[0], "TXT")
+        self.assertTrue(NotebookLMConverter().convert_ebook(self.books[0], output_path, "TXT"))
+        with open(output_path, encoding='utf-8') as f:
+            self.assertIn("Text of book 0.", f.read())
+
+    def test_convert_file_reports_errors(self):
+        """Failures are returned as results, not raised"""
+        result = convert_file(self.broken, "TXT")
+        self.assertFalse(result.success)
+        self.assertTrue(result.error)
+
+    def test_batch_sequential_and_parallel(self):
+        """Both batch modes return per-file results in input order"""
+        inputs = self.books + [self.broken]
+        for workers in (1, 2):
+            with self.subTest(workers=workers):
+                reported = []
+                results = convert_batch(inputs, "MD", workers=workers, on_result=reported.append)
+                self.assertEqual([result.input_path for result in results], inputs)
+                self.assertEqual([result.success for result in results], [True, True, True, False])
+                self.assertCountEqual(reported, results)
+                for result in results[:3]:
+                    self.assertTrue(os.path.exists(result.output_path))
+
+    def test_pool_failure_without_message(self):
+        """A worker failure whose exception has no message still reports an error"""
+        with mock.patch.object(converter_module, 'worker_pool', lambda workers, limits: ThreadPoolExecutor(workers)), \
+                mock.patch.object(converter_module, 'convert_file_formats', side_effect=MemoryError()):
+            results = convert_batch(self.books[:2], "TXT", workers=2)
+        self.assertEqual([result.error for result in results], ["MemoryError", "MemoryError"])
+
+    def test_multiple_formats(self):
+        """Each book is read once for all formats, with one result per file and format"""
+        formats = ["PDF", "TXT", "MD"]
+        inputs = self.books[:2] + [self.broken]
+        with mock.patch.object(converter_module, 'read_book', wraps=converter_module.read_book) as read:
+            results = convert_batch(inputs, formats)
+        self.assertEqual(read.call_count, len(inputs))
+        self.assertEqual([(result.input_path, result.output_format) for result in results],
+                         [(path, fmt) for path in inputs for fmt in formats])
+        self.assertEqual([result.success for result in results], [True] * 6 + [False] * 3)
+        for result in results[:6]:
+            self.assertEqual(result.output_path, output_path_for(result.input_path, result.output_format))
+            self.assertTrue(os.path.exists(result.output_path))
+        with open(results[1].output_path, encoding='utf-8') as f:
+            self.assertIn("Text of book 0.", f.read())
+
+        cache = ConversionCache(os.path.join(self.temp_dir.name, "cache"))
+        convert_batch(self.books[:1], ["TXT"], cache=cache)
+        results = convert_batch(self.books[:1], formats, cache=cache)
+        self.assertEqual([result.cached for result in results], [False, True, False])
+
+    def test_writer_error_is_per_format(self):
+        """A failing writer fails its own format only"""
+        with mock.patch.object(NotebookLMConverter, 'create_notebooklm_markdown', side_effect=Exception("boom")):
+            outcomes = NotebookLMConverter().convert_many(self.books[0], {
+                "TXT": output_path_for(self.books[0], "TXT"),
+                "MD": output_path_for(self.books[0], "MD"),
+            })
+        self.assertIs(outcomes["TXT"], False)
+        self.assertEqual(str(outcomes["MD"]), "boom")
+
+    def test_unread_book_is_closed(self):
+        """A writer that fails before reading any chapter still releases the archive"""
+        books = []
+        extract = NotebookLMConverter.extract
+
+        def tracked_extract(converter, input_path):
+            books.append(extract(converter, input_path))
+            return books[-1]
+
+        with mock.patch.object(NotebookLMConverter, 'extract', tracked_extract), \
+                mock.patch.object(NotebookLMConverter, 'create_notebooklm_txt', side_effect=Exception("boom")):
+            outcomes = NotebookLMConverter().convert_many(self.books[0], {"TXT": output_path_for(self.books[0], "TXT")})
+        self.assertEqual(str(outcomes["TXT"]), "boom")
+        self.assertIsNone(books[0].reader.zip_file.fp)
+
+
+class TestFanOut(unittest.TestCase):
+    """Test sharing one lazily read chapter stream between consumer threads"""
+
+    def book(self, count=50, fail_at=None):
+        self.read = []
+
+        def chapters():
+            for index in range(count):
+                if index == fail_at:
+                    raise ValueError("bad chapter")
+                self.read.append(threading.current_thread().name)
+                yield Chapter([Block(f"Text {index}")], title=f"Chapter {index}")
+        return Book("Title", "Author", chapters())
+
+    def test_every_consumer_sees_every_chapter(self):
+        """Chapters are read once, in the calling thread, and reach every consumer"""
+        seen = [[], [], []]
+        consumers = [lambda book, out=out: out.extend(chapter.title for chapter in book.chapters)
+                     for out in seen]
+        self.assertEqual(fan_out(self.book(), consumers), [None, None, None])
+        self.assertEqual(self.read, [threading.current_thread().name] * 50)
+        for out in seen:
+            self.assertEqual(out, [f"Chapter {index}" for index in range(50)])
+
+    def test_consumer_errors(self):
+        """A consumer that stops early does not stall the others"""
+        seen = []
+
+        def failing(book):
+            next(iter(book.chapters))
+            raise RuntimeError("writer failed")
+
+        errors = fan_out(self.book(), [failing, lambda book: seen.extend(book.chapters)], queue_size=1)
+        self.assertIsInstance(errors[0], RuntimeError)
+        self.assertIsNone(errors[1])
+        self.assertEqual(len(seen), 50)
+
+    def test_read_error(self):
+        """An error reading the chapters is raised after the consumers stop"""
+        with self.assertRaises(ValueError):
+            fan_out(self.book(fail_at=10), [lambda book: list(book.chapters)] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
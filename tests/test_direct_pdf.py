@@ -0,0 +1,101 @@
+"""
+Tests for the direct text PDF backend
+"""
+
+import os
+import re
+import sys
+import tempfile
+import unittest
+import zlib
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.converter import NotebookLMConverter, output_path_for
+from notebooklm_converter.direct_pdf import FontWidths, write_direct_pdf
+from notebooklm_converter.document import Block, Book, Chapter
+
+
+def read_pdf(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def page_text(data):
+    """Decompressed content of every page stream, in order."""
+    contents = []
+    for match in re.finditer(rb'/Filter /FlateDecode /Length (\d+) >>\nstream\n', data):
+        length = int(match.group(1))
+        contents.append(zlib.decompress(data[match.end():match.end() + length]))
+    return contents
+
+
+class TestDirectPdf(unittest.TestCase):
+    """Test the structure and text of directly written PDFs"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "book.pdf")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_text_and_escaping(self):
+        """Text is WinAnsi encoded and PDF string delimiters are escaped"""
+        book = Book("Title", "Author", [Chapter([Block("Café (1) \\ ✓")], title="One")])
+        self.assertEqual(write_direct_pdf(book, self.output_path), 1)
+        content = page_text(read_pdf(self.output_path))[0]
+        self.assertIn(b'(Title) Tj', content)
+        self.assertIn(b'(Author: Author) Tj', content)
+        self.assertIn(b'(Caf\xe9 \\(1\\) \\\\ ?) Tj', content)
+
+    def test_pages_and_xref(self):
+        """Long books span several pages and every xref offset points at its object"""
+        blocks = [Block(f"Paragraph {index} " + "word " * 80 + ".") for index in range(300)]
+        pages = write_direct_pdf(Book("Long", None, [Chapter(blocks, title="One")]), self.output_path)
+        self.assertGreater(pages, 10)
+
+        data = read_pdf(self.output_path)
+        self.assertEqual(len(re.findall(rb'/Type /Page\b(?!s)', data)), pages)
+        self.assertIn(b'/Count %d' % pages, data)
+        xref = int(re.search(rb'startxref\n(\d+)', data).group(1))
+        size = int(re.search(rb'/Size (\d+)', data).group(1))
+        entries = data[xref:].split(b'\n')[3:size + 2]
+        for object_id, entry in enumerate(entries, start=1):
+            offset = int(entry[:10])
+            self.assertTrue(data[offset:].startswith(b'%d 0 obj' % object_id))
+
+        texts = b''.join(page_text(data))
+        self.assertIn(b'(Paragraph 0 word', texts)
+        self.assertIn(b'(Paragraph 299 word', texts)
+
+    def test_uncompressed(self):
+        """Compression can be turned off"""
+        write_direct_pdf(Book("Plain", None, []), self.output_path, compress=False)
+        data = read_pdf(self.output_path)
+        self.assertNotIn(b'/FlateDecode', data)
+        self.assertIn(b'(Plain) Tj', data)
+
+    def test_font_widths(self):
+        """Word widths come from the built-in Helvetica metrics"""
+        widths = FontWidths(b'F1', 10)
+        self.assertAlmostEqual(widths.space, 2.78)
+        self.assertAlmostEqual(widths["Hi"], 7.22 + 2.22)
+
+    def test_converter_backend(self):
+        """The converter renders PDFs with the selected backend"""
+        epub_path = os.path.join(self.temp_dir.name, "book.epub")
+        write_epub(epub_path, [("c1.xhtml", chapter_html("Chapter", ["Direct text."]))])
+        output_path = output_path_for(epub_path, "PDF")
+        NotebookLMConverter(pdf_backend="direct").convert(epub_path, output_path, "PDF")
+        self.assertIn(b'(Direct text.) Tj', b''.join(page_text(read_pdf(output_path))))
+
+        with self.assertRaises(Exception):
+            NotebookLMConverter(pdf_backend="missing").convert(epub_path, output_path, "PDF")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,197 @@
+"""
+Tests for the streaming EPUB reader
+"""
+
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter import epub_reader
+from notebooklm_converter.epub_reader import EpubReader, read_book
+
+
+class TestEpubReader(unittest.TestCase):
+    """Test the zipfile-based EPUB reader"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.epub_path = write_epub(
+            os.path.join(self.temp_dir.name, "book.epub"),
+            [
+                ("text/chapter%201.xhtml", chapter_html("One", ["First paragraph."])),
+                ("text/chapter2.xhtml", chapter_html("Two", ["Second paragraph."])),
+            ],
+            extra_items=[("images/cover.jpg", "image/jpeg", b"\xff\xd8" + b"\0" * 1024)],
+        )
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_metadata(self):
+        """Title and creator come from the OPF metadata"""
+        with EpubReader(self.epub_path) as reader:
+            self.assertEqual(reader.title, "Test Book")
+            self.assertEqual(reader.creator, "Test Author")
+
+    def test_documents_follow_spine_order(self):
+        """Only spine documents are yielded, in reading order, with unquoted hrefs"""
+        with EpubReader(self.epub_path) as reader:
+            documents = reader.iter_documents()
+            self.assertIsInstance(documents, types.GeneratorType)
+            hrefs = [href for href, data in documents]
+        self.assertEqual(hrefs, ["text/chapter 1.xhtml", "text/chapter2.xhtml"])
+
+    def test_matches_ebooklib_spine_content(self):
+        """Raw document bytes are identical to what ebooklib loads"""
+        import ebooklib
+        from ebooklib import epub
+
+        book = epub.read_epub(self.epub_path)
+        expected = []
+        for item_id, _ in book.spine:
+            item = book.get_item_with_id(item_id)
+            if item.get_type() == ebooklib.ITEM_DOCUMENT:
+                expected.append(item.content)
+
+        with EpubReader(self.epub_path) as reader:
+            actual = [data for href, data in reader.iter_documents()]
+        self.assertEqual(actual, expected)
+
+    def test_read_book_yields_chapter_records(self):
+        """read_book extracts normalized blocks chapter by chapter"""
+        book = read_book(self.epub_path)
+        self.assertIsInstance(book, Book)
+        self.assertEqual(book.title, "Test Book")
+        self.assertIsInstance(book.chapters, types.GeneratorType)
+
+        chapters = list(book.chapters)
+        self.assertEqual([chapter.href for chapter in chapters], ["text/chapter 1.xhtml", "text/chapter2.xhtml"])
+        self.assertIsInstance(chapters[0], Chapter)
+        self.assertIn(Block("First paragraph."), chapters[0].blocks)
+        self.assertFalse(hasattr(chapters[0].blocks[0], '__dict__'))
+
+    def test_materialize(self):
+        """materialize() turns lazy chapters into a reusable list"""
+        book = read_book(self.epub_path).materialize()
+        self.assertEqual(len(book.chapters), 2)
+        self.assertEqual(len(book.materialize().chapters), 2)
+
+    def test_close_without_iterating(self):
+        """Closing a book releases the archive even if no chapter was read"""
+        with read_book(self.epub_path) as book:
+            self.assertIsNotNone(book.reader.zip_file.fp)
+        self.assertIsNone(book.reader.zip_file.fp)
+
+    def test_parallel_chapters_keep_spine_order(self):
+        """Chapters parsed in a process pool come back in spine order"""
+        chapters = [
+            (f"c{index}.xhtml", chapter_html(f"Chapter {index}", [f"Paragraph {index}."] * (index % 5 + 1)))
+            for index in range(30)
+        ]
+        path = write_epub(os.path.join(self.temp_dir.name, "large.epub"), chapters)
+        serial = list(read_book(path).chapters)
+
+        with mock.patch.object(epub_reader, 'PARALLEL_MIN_BYTES', 0), \
+                mock.patch.object(epub_reader, 'CHAPTER_BATCH_BYTES', 1000):
+            parallel = list(read_book(path, chapter_workers=2).chapters)
+
+        self.assertEqual([c.href for c in parallel], [c.href for c in serial])
+        self.assertEqual([c.blocks for c in parallel], [c.blocks for c in serial])
+
+    def test_missing_container(self):
+        """Archives without a container document are rejected"""
+        import zipfile
+        bad_path = os.path.join(self.temp_dir.name, "bad.epub")
+        with zipfile.ZipFile(bad_path, 'w') as archive:
+            archive.writestr('mimetype', 'application/epub+zip')
+        with self.assertRaises(Exception):
+            EpubReader(bad_path)
+
+
+
+NAV = """<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">
+<body>
+<nav epub:type="landmarks"><ol><li><a href="../text/chapter2.xhtml">Wrong</a></li></ol></nav>
+<nav epub:type="toc"><ol>
+  <li><a href="../text/chapter%201.xhtml">Part   One</a>
+    <ol><li><a href="../text/chapter2.xhtml#start">Two</a></li>
+        <li><a href="../text/chapter2.xhtml#later">Ignored</a></li></ol></li>
+</ol></nav>
+</body>
+</html>
+"""
+
+NCX = """<?xml version="1.0" encoding="UTF-8"?>
+<ncx xmlns="http://www.daisy.org/z3986/2005/ncx/" version="2005-1">
+<navMap>
+  <navPoint id="p1"><navLabel><text>One</text></navLabel><content src="text/chapter%201.xhtml"/>
+    <navPoint id="p2"><navLabel><text>Nested Two</text></navLabel><content src="text/chapter2.xhtml"/></navPoint>
+  </navPoint>
+</navMap>
+</ncx>
+"""
+
+
+class TestEpubStructure(unittest.TestCase):
+    """Test that heading levels come from the markup and the table of contents"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        long_heading = "A heading that is much longer than fifty characters, ending in a period."
+        self.chapters = [
+            ("text/chapter%201.xhtml", chapter_html("One", ["First paragraph."])),
+            ("text/chapter2.xhtml", chapter_html("Two", ["SHORT CAPS LINE", "Body."]).replace(
+                "<p>Body.</p>", f"<h3>{long_heading}</h3><p>Body.</p>")),
+        ]
+        self.long_heading = long_heading
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, **kwargs):
+        return write_epub(os.path.join(self.temp_dir.name, "book.epub"), self.chapters, **kwargs)
+
+    def test_heading_blocks(self):
+        """h1-h6 become blocks at their level; paragraphs stay body text"""
+        for engine in ('lxml', 'bs4'):
+            with self.subTest(engine=engine):
+                chapters = read_book(self.write(), engine=engine).materialize().chapters
+                self.assertIsNone(chapters[1].title)
+                self.assertEqual(chapters[1].blocks, [
+                    Block("Two"), Block("Two", 1), Block("SHORT CAPS LINE"), Block(self.long_heading, 3), Block("Body."),
+                ])
+
+    def test_nav_titles(self):
+        """The EPUB 3 toc nav titles chapters and sets their depth"""
+        book = read_book(self.write(nav=NAV, ncx=NCX)).materialize()
+        self.assertEqual([(c.title, c.level) for c in book.chapters], [("Part One", 1), ("Two", 2)])
+        # Lines repeating the TOC title are dropped, a differing h1 is kept
+        self.assertEqual(book.chapters[0].blocks, [Block("One"), Block("One", 1), Block("First paragraph.")])
+        self.assertEqual(book.chapters[1].blocks[0], Block("SHORT CAPS LINE"))
+
+    def test_ncx_titles(self):
+        """EPUB 2 books fall back to the NCX"""
+        with EpubReader(self.write(ncx=NCX)) as reader:
+            self.assertEqual(reader.toc_titles(), {
+                "text/chapter 1.xhtml": ("One", 1),
+                "text/chapter2.xhtml": ("Nested Two", 2),
+            })
+
+    def test_broken_toc(self):
+        """An unreadable TOC leaves chapters untitled instead of failing"""
+        book = read_book(self.write(ncx="not xml")).materialize()
+        self.assertEqual([c.title for c in book.chapters], [None, None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests for the SQLite job ledger
+"""
+
+import contextlib
+import io
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter import converter as converter_module
+from notebooklm_converter.cache import ConversionCache, hash_file
+from notebooklm_converter.cli import main
+from notebooklm_converter.converter import ConversionResult, convert_batch
+from notebooklm_converter.ledger import JobLedger
+
+
+class TestJobLedger(unittest.TestCase):
+    """Test recording, batching and resume planning"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "ledger.sqlite")
+        self.books = []
+        for name in ("a.epub", "b.epub"):
+            path = os.path.join(self.temp_dir.name, name)
+            write_epub(path, [("c1.xhtml", chapter_html("One", [f"Book {name}."]))])
+            self.books.append(path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def output(self, book, fmt):
+        path = f"{book}.{fmt.lower()}"
+        with open(path, 'w') as f:
+            f.write("out")
+        return path
+
+    def test_plan_retries_failures_and_changes(self):
+        """Done jobs are skipped until their input changes or their output disappears"""
+        a, b = self.books
+        with JobLedger(self.db_path) as ledger:
+            self.assertEqual(ledger.plan(self.books, ["PDF"]), {a: ["PDF"], b: ["PDF"]})
+            ledger.record(ConversionResult(a, self.output(a, "PDF"), True, elapsed=0.5, output_format="PDF"))
+            ledger.record(ConversionResult(b, None, False, "broken", output_format="PDF"))
+
+        with JobLedger(self.db_path) as ledger:
+            self.assertEqual(ledger.plan(self.books, ["PDF", "TXT"]), {a: ["TXT"], b: ["PDF", "TXT"]})
+            self.assertEqual(ledger.failures(), [(b, "PDF", "broken")])
+            self.assertEqual(ledger.summary(), {"ok": 1, "failed": 1})
+
+            os.remove(f"{a}.pdf")
+            self.assertEqual(ledger.plan([a], ["PDF"]), {a: ["PDF"]})
+            self.output(a, "PDF")
+            with open(a, 'ab') as f:
+                f.write(b"changed")
+            self.assertEqual(ledger.plan([a], ["PDF"]), {a: ["PDF"]})
+
+    def test_writes_are_batched(self):
+        """Results are committed in batches, in WAL mode, and flushed on close"""
+        ledger = JobLedger(self.db_path, batch_size=3, flush_interval=float('inf'))
+        reader = sqlite3.connect(self.db_path)
+        self.assertEqual(reader.execute("PRAGMA journal_mode").fetchone(), ("wal",))
+
+        def count():
+            return reader.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+        for fmt in ("PDF", "TXT"):
+            ledger.record(ConversionResult(self.books[0], None, True, output_format=fmt))
+        self.assertEqual(count(), 0)
+        ledger.record(ConversionResult(self.books[0], None, True, output_format="MD"))
+        self.assertEqual(count(), 3)
+        ledger.record(ConversionResult(self.books[1], None, True, output_format="MD"))
+        ledger.close()
+        self.assertEqual(count(), 4)
+        reader.close()
+
+    def test_hash_computed_by_worker(self):
+        """Every converted input's hash is recorded, with or without a cache"""
+        a, b = self.books
+        out_dir = os.path.join(self.temp_dir.name, "out")
+        cache = ConversionCache(os.path.join(self.temp_dir.name, "cache"))
+        with JobLedger(self.db_path) as ledger:
+            convert_batch([a], "TXT", output_dirs=[out_dir], on_result=ledger.record)
+            convert_batch([b], "TXT", output_dirs=[out_dir], cache=cache, on_result=ledger.record)
+            # A skipped input is not read again and keeps its recorded hash
+            ledger.flush()
+            with mock.patch.object(converter_module, 'hash_file', side_effect=AssertionError("input read")):
+                self.assertEqual(ledger.plan([a], ["TXT"]), {})
+                convert_batch([a], "TXT", output_dirs=[out_dir], skip_existing=True, on_result=ledger.record)
+            ledger.flush()
+            hashes = dict(ledger.connection.execute("SELECT input_path, input_hash FROM jobs"))
+        self.assertEqual(hashes, {os.path.abspath(path): hash_file(path) for path in (a, b)})
+
+    def test_cli_resumes(self):
+        """A second CLI run with the same ledger converts only what failed"""
+        bad = os.path.join(self.temp_dir.name, "bad.epub")
+        with open(bad, 'wb') as f:
+            f.write(b"not a zip")
+        out_dir = os.path.join(self.temp_dir.name, "out")
+        argv = [self.temp_dir.name, "-f", "txt", "-j", "1", "-o", out_dir, "--ledger", self.db_path]
+
+        for expected_lines in (3, 1):
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(main(argv), 1)
+            self.assertEqual(len(stdout.getvalue().splitlines()), expected_lines)
+        with JobLedger(self.db_path) as ledger:
+            self.assertEqual(ledger.summary(), {"ok": 2, "failed": 1})
+            self.assertEqual(ledger.connection.execute(
+                "SELECT attempts FROM jobs WHERE status = 'failed'").fetchone(), (2,))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests for per-file worker limits
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.cli import main
+from notebooklm_converter.limits import LimitedProcessPool, WorkerLimits, resource
+
+
+def double(value):
+    return value * 2
+
+
+def spin():
+    while True:
+        pass
+
+
+def allocate(size):
+    return len(bytearray(size))
+
+
+class TestLimitedProcessPool(unittest.TestCase):
+    """Test that breaching a limit fails one task and the pool carries on"""
+
+    def results(self, limits, tasks, workers=1):
+        outcomes = []
+        with LimitedProcessPool(workers, limits) as executor:
+            futures = [executor.submit(fn, *args) for fn, *args in tasks]
+            for future in futures:
+                try:
+                    outcomes.append(future.result())
+                except Exception as e:
+                    outcomes.append(str(e))
+        return outcomes
+
+    def test_timeout_replaces_worker(self):
+        """A task past the timeout is killed; the next one runs in a fresh worker"""
+        start = time.monotonic()
+        outcomes = self.results(WorkerLimits(timeout=0.5), [(double, 1), (time.sleep, 60), (double, 3)])
+        self.assertEqual(outcomes, [2, "Timed out after 0.5 s", 6])
+        self.assertLess(time.monotonic() - start, 30)
+
+    @unittest.skipIf(resource is None, "needs the resource module")
+    def test_cpu_limit(self):
+        """A task that burns its CPU allowance is killed by the kernel"""
+        outcomes = self.results(WorkerLimits(cpu_time=1), [(spin,), (double, 4)])
+        self.assertEqual(outcomes, ["Worker process died (CPU time limit exceeded)", 8])
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "RLIMIT_AS is enforced on Linux")
+    def test_memory_limit(self):
+        """An allocation over the memory limit fails that task only"""
+        outcomes = self.results(WorkerLimits(memory=1024 ** 3),
+                                [(allocate, 4 * 1024 ** 3), (allocate, 1024)], workers=2)
+        self.assertEqual(outcomes, ["Out of memory (worker memory limit exceeded)", 1024])
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "RLIMIT_AS is enforced on Linux")
+    def test_memory_limit_single_worker(self):
+        """The worker that ran out of memory is replaced before the next task"""
+        tasks = [(allocate, 4 * 1024 ** 3), (allocate, 1024)] * 5
+        outcomes = self.results(WorkerLimits(memory=1024 ** 3), tasks, workers=1)
+        self.assertEqual(outcomes, ["Out of memory (worker memory limit exceeded)", 1024] * 5)
+
+
+@unittest.skipUnless(hasattr(os, 'mkfifo'), "needs named pipes")
+class TestBatchLimits(unittest.TestCase):
+    """Test that a stalled book fails while the rest of the batch converts"""
+
+    def test_stalled_book_times_out(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            books = []
+            for name in ("a.epub", "stalled.epub", "b.epub"):
+                path = os.path.join(temp_dir, name)
+                if name == "stalled.epub":
+                    os.mkfifo(path)  # Opening it blocks forever
+                else:
+                    write_epub(path, [("c1.xhtml", chapter_html("One", [f"Book {name}."]))])
+                books.append(path)
+
+            stdout = io.StringIO()
+            with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(io.StringIO()):
+                status = main(books + ["-f", "txt", "-j", "2", "--timeout", "3", "--json"])
+            records = {os.path.basename(record['input']): record
+                       for record in map(json.loads, stdout.getvalue().splitlines())}
+
+            self.assertEqual(status, 1)
+            self.assertEqual(records["a.epub"]['status'], 'ok')
+            self.assertEqual(records["b.epub"]['status'], 'ok')
+            self.assertEqual(records["stalled.epub"]['status'], 'failed')
+            self.assertEqual(records["stalled.epub"]['error'], "Timed out after 3 s")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+Tests for the native MOBI/AZW3 reader
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from mobi_fixtures import palmdoc_compress, write_azw3, write_mobi
+from notebooklm_converter.converter import NotebookLMConverter
+from notebooklm_converter.mobi_reader import (
+    UnsupportedMobiError,
+    palmdoc_decompress,
+    read_mobi,
+    trim_trailing_entries,
+)
+
+
+def mobi6_markup(chapters):
+    """Kindle-style markup: no newlines, chapters separated by page breaks."""
+    bodies = []
+    for title, paragraphs in chapters:
+        bodies.append(f"<h1>{title}</h1>" + ''.join(f"<p>{text}</p>" for text in paragraphs))
+    return ("<html><head><guide></guide></head><body>"
+            + "<mbp:pagebreak/>".join(bodies) + "</body></html>")
+
+
+class TestPalmDoc(unittest.TestCase):
+    """Test PalmDOC decompression and trailing-entry trimming"""
+
+    def test_round_trip(self):
+        """Every token type decompresses back to the original bytes"""
+        rng = random.Random(7)
+        samples = [
+            b'',
+            b'The cat sat on the mat. The cat sat on the mat again.',
+            b'a' * 200,  # overlapping back-references
+            bytes(rng.randrange(256) for _ in range(2000)),
+            'Ünïcödé text, with spaces '.encode('utf-8') * 40,
+        ]
+        for sample in samples:
+            with self.subTest(sample=sample[:20]):
+                self.assertEqual(palmdoc_decompress(palmdoc_compress(sample)), sample)
+
+    def test_trailing_entries(self):
+        """Trailing entries and the multibyte overlap byte are stripped"""
+        self.assertEqual(trim_trailing_entries(b'text' + b'\x00' + b'\x00\x00\x83', 3), b'text')
+        self.assertEqual(trim_trailing_entries(b'caf\xc3' + b'\x01', 1), b'caf')
+        self.assertEqual(trim_trailing_entries(b'text', 0), b'text')
+
+
+class TestMobiReader(unittest.TestCase):
+    """Test reading MOBI 6 and KF8 books into chapters"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.chapters = [
+            ("Chapter One", [f"Paragraph {i} of the first chapter, café." for i in range(400)]),
+            ("Chapter Two", ["The last paragraph."]),
+        ]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def test_mobi6(self):
+        """Page breaks split chapters and each paragraph becomes a block"""
+        path = self.path("book.mobi")
+        write_mobi(path, mobi6_markup(self.chapters).encode('utf-8'), title="Kindle Book", author="A. Writer")
+        book = read_mobi(path).materialize()
+        self.assertEqual((book.title, book.author), ("Kindle Book", "A. Writer"))
+        self.assertEqual(len(book.chapters), 2)
+        first, second = book.chapters
+        self.assertEqual([block.text for block in first.blocks],
+                         ["Chapter One"] + self.chapters[0][1])
+        self.assertEqual([block.text for block in second.blocks], ["Chapter Two", "The last paragraph."])
+
+    def test_cp1252_uncompressed(self):
+        """Windows-1252 text without compression or trailing entries"""
+        path = self.path("old.mobi")
+        write_mobi(path, mobi6_markup(self.chapters).encode('cp1252'), encoding='cp1252',
+                   compression=1, extra_flags=0)
+        book = read_mobi(path).materialize()
+        self.assertEqual(book.chapters[0].blocks[1].text, "Paragraph 0 of the first chapter, café.")
+
+    def test_kf8_combination_file(self):
+        """The KF8 half of a combination file is read, without its CSS flow"""
+        parts = [
+            f'<?xml version="1.0"?><html><head><title>Part {i}</title></head>'
+            f'<body aid="0"></body></html><div><p>Text of part {i}.</p></div>'.encode('utf-8')
+            for i in range(3)
+        ]
+        path = self.path("book.azw3")
+        write_azw3(path, parts, author="K. Author", combination=True)
+        book = read_mobi(path).materialize()
+        self.assertEqual(book.author, "K. Author")
+        self.assertEqual([[block.text for block in chapter.blocks] for chapter in book.chapters],
+                         [[f"Part {i}", f"Text of part {i}."] for i in range(3)])
+
+    def test_unsupported_books(self):
+        """Encrypted books and non-MOBI files are left to Calibre"""
+        encrypted = self.path("drm.azw")
+        write_mobi(encrypted, b'<p>secret</p>', encryption=2)
+        garbage = self.path("garbage.mobi")
+        with open(garbage, 'wb') as f:
+            f.write(b'not a palm database' * 10)
+        for path in (encrypted, garbage):
+            with self.subTest(path=path):
+                with self.assertRaises(UnsupportedMobiError):
+                    read_mobi(path)
+
+    def test_converter_skips_calibre(self):
+        """Natively readable books never reach the Calibre bridge"""
+        path = self.path("book.mobi")
+        write_mobi(path, mobi6_markup(self.chapters).encode('utf-8'))
+        converter = NotebookLMConverter()
+        output_path = self.path("book.txt")
+        with mock.patch.object(converter, 'calibre_bridge') as bridge:
+            converter.convert(path, output_path, "TXT")
+            bridge.assert_not_called()
+        with open(output_path, encoding='utf-8') as f:
+            self.assertIn("The last paragraph.", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for the shared text normalizer
+"""
+
+import os
+import re
+import sys
+import time
+import unittest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.normalizer import CHARACTER_FILTER, iter_lines, normalize_line
+
+
+class TestNormalizer(unittest.TestCase):
+    """Test normalizer output"""
+
+    def test_filter_matches_legacy_regex(self):
+        """The translate table removes exactly what the old regex removed"""
+        sample = ''.join(chr(code_point) for code_point in range(0x3000))
+        legacy = re.sub(r'[^\w\s\.\,\!\?\:\;\-\(\)\[\]\{\}\"\'\/]', '', sample)
+        self.assertEqual(sample.translate(CHARACTER_FILTER), legacy)
+
+    def test_normalize_line(self):
+        """Whitespace collapses; the filter is optional"""
+        self.assertEqual(normalize_line("  a \t b  "), "a b")
+        self.assertEqual(normalize_line("\u00a9 2024 \u2014 Press", filter_chars=True), "2024 Press")
+
+    def test_iter_lines(self):
+        """Empty lines are dropped, filtered lines are stripped"""
+        lines = list(iter_lines("  # Title\n\n© 2024 Author — Press\n***\n", filter_chars=True))
+        self.assertEqual(lines, ["Title", "2024 Author Press"])
+
+
+class TestNormalizerLinearTime(unittest.TestCase):
+    """Adversarial inputs must not take superlinear time"""
+
+    SIZE = 4_000_000
+    # A linear pass over SIZE characters takes well under a second; anything
+    # quadratic would need hours, so this bound is generous for loaded machines
+    TIME_LIMIT = 20.0
+
+    ADVERSARIAL = {
+        'whitespace run': lambda n: "\n" + " " * n + "x",
+        'alternating blank lines': lambda n: "\n \t" * (n // 3),
+        'newlines only': lambda n: "\n" * n,
+        'spaces between words': lambda n: "a " * (n // 2),
+        'long line': lambda n: "x" * n,
+        'symbols': lambda n: "©\n" * (n // 2),
+    }
+
+    def test_filtered_lines_linear(self):
+        for name, make in self.ADVERSARIAL.items():
+            text = make(self.SIZE)
+            with self.subTest(input=name):
+                start = time.perf_counter()
+                list(iter_lines(text, filter_chars=True))
+                elapsed = time.perf_counter() - start
+                self.assertLess(elapsed, self.TIME_LIMIT, f"{name}: {elapsed:.2f}s")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for the PDF backend registry
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter.pdf_backends import (
+    PDF_BACKEND_ENV,
+    PDF_BACKENDS,
+    available_pdf_backends,
+    get_pdf_backend,
+    register_pdf_backend,
+    render_pdf,
+    resolve_pdf_backend,
+)
+
+
+class TestPdfBackends(unittest.TestCase):
+    """Test backend selection and that every installed backend renders"""
+
+    def test_resolve(self):
+        """An explicit name wins over the environment, which wins over the default"""
+        with mock.patch.dict(os.environ, {PDF_BACKEND_ENV: 'direct'}):
+            self.assertEqual(resolve_pdf_backend('canvas'), 'canvas')
+            self.assertEqual(resolve_pdf_backend(), 'direct')
+        with mock.patch.dict(os.environ, clear=True):
+            self.assertEqual(resolve_pdf_backend(), 'reportlab')
+            self.assertEqual(resolve_pdf_backend(default='canvas'), 'canvas')
+
+    def test_unknown_and_unavailable(self):
+        """Unknown names and missing dependencies raise with a helpful message"""
+        with self.assertRaisesRegex(Exception, "Unknown PDF backend"):
+            get_pdf_backend('missing')
+        register_pdf_backend('uninstalled', None, available=False, requirement='somepackage')
+        try:
+            self.assertNotIn('uninstalled', available_pdf_backends())
+            with self.assertRaisesRegex(Exception, "install somepackage"):
+                get_pdf_backend('uninstalled')
+        finally:
+            del PDF_BACKENDS['uninstalled']
+
+    def test_render_all(self):
+        """Every available backend writes a PDF for the same book"""
+        self.assertIn('direct', available_pdf_backends())
+        with tempfile.TemporaryDirectory() as temp_dir:
+            for name in available_pdf_backends():
+                with self.subTest(backend=name):
+                    book = Book("Title", "Author",
+                                [Chapter([Block("Heading", level=2), Block("Fish & <chips>.")], title="One")])
+                    output_path = os.path.join(temp_dir, f"{name}.pdf")
+                    render_pdf(book, output_path, name)
+                    with open(output_path, 'rb') as f:
+                        self.assertEqual(f.read(5), b'%PDF-')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests for the streaming ReportLab PDF writer
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.document import Block, Book, Chapter, iter_paragraphs
+from notebooklm_converter.reportlab_pdf import (
+    FlowableStream, iter_book_flowables, notebooklm_styles, plain_paragraph, write_book_pdf
+)
+
+
+class TestReportLabPdf(unittest.TestCase):
+    """Test that flowables are pulled lazily in bounded batches"""
+
+    def test_flowable_stream(self):
+        """The list behaves like a list while refilling from its source"""
+        stream = FlowableStream(range(10), batch_size=4)
+        self.assertEqual(list.__len__(stream), 4)
+        items = []
+        while len(stream):
+            items.append(stream[0])
+            del stream[0]
+        self.assertEqual(items, list(range(10)))
+        self.assertFalse(stream)
+
+    def test_lazy_chapters(self):
+        """Chapters are consumed as the document is laid out, not up front"""
+        consumed = []
+        batch_size = 8
+
+        def chapters():
+            for index in range(60):
+                consumed.append(index)
+                yield Chapter([Block(f"Paragraph {index}.{line} " * 10) for line in range(5)],
+                              title=f"Chapter {index}")
+
+        pulled_ahead = []
+        original_len = FlowableStream.__len__
+
+        def tracking_len(stream):
+            # Paragraphs already pulled from the generator but not yet laid out
+            pulled_ahead.append(list.__len__(stream))
+            return original_len(stream)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "book.pdf")
+            with mock.patch.object(FlowableStream, '__len__', tracking_len):
+                write_book_pdf(Book("Lazy", "Author", chapters()), output_path, batch_size=batch_size)
+            with open(output_path, 'rb') as f:
+                self.assertEqual(f.read(5), b'%PDF-')
+
+        self.assertEqual(consumed, list(range(60)))
+        self.assertLessEqual(max(pulled_ahead), 2 * batch_size)
+
+    def test_iter_paragraphs(self):
+        """Hard-wrapped lines are joined; sentences and headings stay apart"""
+        blocks = [
+            Block("It was a dark and"),
+            Block("stormy night."),
+            Block("Then it rained"),
+            Block("Heading", level=2),
+            Block("after the heading"),
+            Block("and more."),
+            Block("New paragraph."),
+        ]
+        self.assertEqual([(b.text, b.level) for b in iter_paragraphs(blocks)], [
+            ("It was a dark and stormy night.", 0),
+            ("Then it rained", 0),
+            ("Heading", 2),
+            ("after the heading and more.", 0),
+            ("New paragraph.", 0),
+        ])
+
+    def test_flowables(self):
+        """Styles are built once and plain text is not parsed as markup"""
+        self.assertIs(notebooklm_styles(), notebooklm_styles())
+
+        paragraph = plain_paragraph("Fish & <chips>", notebooklm_styles()['Body'])
+        paragraph.wrap(400, 800)
+        self.assertEqual(paragraph.getPlainText(), "Fish & <chips>")
+
+        book = Book("Title", "Author", [Chapter([Block("one"), Block("two.")], title="Chapter 1")])
+        texts = [flowable.getPlainText() for flowable in iter_book_flowables(book)]
+        self.assertEqual(texts, ["Title", "Author: Author", "Chapter 1", "one two."])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Tests for the chapter text extraction engines
+"""
+
+import os
+import sys
+import unittest
+import warnings
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html
+from notebooklm_converter.text_extraction import (
+    detect_encoding,
+    extract_text,
+    extract_text_bs4,
+    extract_text_lxml,
+)
+
+
+DOCUMENTS = [
+    chapter_html("One", ["Hello   world.", "Café <b>bold</b> tail &amp; more"]).encode('utf-8'),
+    b'<html><body><p>unclosed <div>nest<script>x<p>y</script>after</div><style>z</style>t',
+    b'<p>no html</p> trailing',
+    '<?xml version="1.0" encoding="iso-8859-1"?><html><body><p>caf\xe9</p></body></html>'.encode('latin-1'),
+    b'<html><head><meta charset="utf-8"></head><body>\xc3\xa9<!--c-->x<?pi y?>z</body></html>',
+    b'<html><body><table><tr><td>a</td><td>b</td></tr></table>&nbsp;<br/>c</body></html>',
+    b'\xef\xbb\xbf<html><body>bom \xe2\x80\x94</body></html>',
+]
+
+
+class TestTextExtraction(unittest.TestCase):
+    """Test that the lxml engine matches BeautifulSoup"""
+
+    def setUp(self):
+        warnings.simplefilter('ignore')
+
+    def test_lxml_matches_bs4(self):
+        """Both engines produce the same text, up to trailing whitespace"""
+        for document in DOCUMENTS:
+            with self.subTest(document=document[:40]):
+                self.assertEqual(extract_text_lxml(document).rstrip(), extract_text_bs4(document).rstrip())
+
+    def test_script_and_style_skipped(self):
+        """Script and style contents never reach the output"""
+        text = extract_text(DOCUMENTS[0])
+        self.assertNotIn("ignored", text)
+        self.assertNotIn("margin", text)
+        self.assertIn("Hello   world.", text)
+
+    def test_empty_document(self):
+        """Empty documents extract to an empty string"""
+        self.assertEqual(extract_text(b''), '')
+        self.assertEqual(extract_text(b'  \n'), '')
+
+    def test_detect_encoding(self):
+        """Declared encodings are honoured, utf-8 is the default"""
+        self.assertEqual(detect_encoding(DOCUMENTS[3]), 'iso-8859-1')
+        self.assertEqual(detect_encoding(DOCUMENTS[4]), 'utf-8')
+        self.assertEqual(detect_encoding(b'<p>x</p>'), 'utf-8')
+
+    def test_unknown_encoding_falls_back_to_bs4(self):
+        """Markup lxml cannot handle goes through BeautifulSoup"""
+        document = b'<?xml version="1.0" encoding="x-no-such-codec"?><html><body>text</body></html>'
+        self.assertEqual(extract_text(document).strip(), "text")
+
+    def test_unknown_engine(self):
+        """Unknown engine names are rejected"""
+        with self.assertRaises(ValueError):
+            extract_text(b'<p>x</p>', engine='regex')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Tests for the console's plain-text PDF renderer
+"""
+
+import os
+import random
+import re
+import sys
+import tempfile
+import unittest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from reportlab.lib.utils import simpleSplit
+
+from notebooklm_converter.text_pdf import WordWidths, wrap_line, write_text_pdf
+
+
+class TestTextPdf(unittest.TestCase):
+    """Test wrapping and page layout of the text-object renderer"""
+
+    def test_wrap_matches_simple_split(self):
+        """Greedy wrapping gives the same lines as ReportLab's simpleSplit"""
+        rng = random.Random(3)
+        words = ["a", "notebook", "WWWW", "extraordinarily", "café", "x" * 120, "i.e."]
+        widths = WordWidths("Helvetica", 12)
+        lines = ["", "   ", "one  two\tthree"]
+        lines += [' '.join(rng.choice(words) for _ in range(rng.randint(1, 150))) for _ in range(50)]
+        for line in lines:
+            self.assertEqual(list(wrap_line(line, 512, widths)), simpleSplit(line, "Helvetica", 12, 512))
+        self.assertIn("notebook", widths)
+        self.assertLessEqual(len(widths), len(words) + 3)
+
+    def test_pages(self):
+        """Letter pages hold 47 lines; a full last page adds no blank page"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "book.pdf")
+            for lines, pages in ((47, 1), (48, 2), (94, 2)):
+                write_text_pdf((f"Line {index}" for index in range(lines)), output_path)
+                with open(output_path, 'rb') as f:
+                    data = f.read()
+                self.assertEqual(len(re.findall(rb'/Type /Page\b(?!s)', data)), pages)
+
+    def test_blank_lines(self):
+        """A blank line takes one line of space but never starts a page"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            output_path = os.path.join(temp_dir, "book.pdf")
+            for lines, pages in ((["a"] * 46 + [""] + ["b"], 2), (["a"] * 47 + ["", "b"], 2),
+                                 (["a"] * 47 + ["", ""], 1)):
+                write_text_pdf(lines, output_path)
+                with open(output_path, 'rb') as f:
+                    data = f.read()
+                self.assertEqual(len(re.findall(rb'/Type /Page\b(?!s)', data)), pages)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Tests for the streaming TXT and Markdown writers
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from notebooklm_converter.converter import NotebookLMConverter
+from notebooklm_converter.document import Block, Book, Chapter
+from notebooklm_converter.text_writers import (
+    LENGTH_FIELD_WIDTH,
+    write_notebooklm_markdown,
+    write_notebooklm_txt,
+)
+
+TIMESTAMP = "2024-01-01 00:00:00"
+
+
+def sample_book(lazy=False):
+    def chapters():
+        yield Chapter([Block("Première ligne — café."), Block("Section", level=2), Block("   ")],
+                      title="Chapter 1")
+        yield Chapter([Block("CHAPTER TWO"), Block("Last line.")], title="Chapter 2")
+    return Book("Title", "Author", chapters() if lazy else list(chapters()))
+
+
+class FixedTimeConverter(NotebookLMConverter):
+    def get_current_timestamp(self):
+        return TIMESTAMP
+
+
+class TestTextWriters(unittest.TestCase):
+    """Test that streamed output matches the in-memory formatting"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "out")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read(self):
+        with open(self.output_path, encoding='utf-8') as f:
+            return f.read()
+
+    def test_txt(self):
+        """The body matches and the patched length counts its characters"""
+        length = write_notebooklm_txt(sample_book(lazy=True), self.output_path, TIMESTAMP)
+        written = self.read()
+        expected = FixedTimeConverter().optimize_text_for_notebooklm(sample_book())
+
+        header, body = written.split("\n\n---\n\n", 1)
+        self.assertEqual(len(body), length)
+        self.assertTrue(header.endswith(f"Content Length: {length} characters".ljust(16 + LENGTH_FIELD_WIDTH)))
+        self.assertEqual([line.rstrip() for line in written.split('\n')], expected.split('\n'))
+
+    def test_markdown(self):
+        """Markdown output is identical to the joined document"""
+        write_notebooklm_markdown(sample_book(lazy=True), self.output_path, TIMESTAMP)
+        self.assertEqual(self.read(), FixedTimeConverter().format_content_for_markdown(sample_book()))
+        self.assertIn("\n\n## Section\n\n", self.read())
+
+    def test_markdown_headers_from_levels(self):
+        """Only blocks with a markup level become headers; short caps lines stay text"""
+        book = Book("Title", None, [Chapter([Block("CHAPTER TWO"), Block("A long heading, with a comma.", level=3)])])
+        write_notebooklm_markdown(book, self.output_path, TIMESTAMP)
+        self.assertIn("\n\nCHAPTER TWO\n\n### A long heading, with a comma.", self.read())
+
+    def test_markdown_heading_starting_with_hash(self):
+        """A heading whose text starts with '#' keeps its markup level"""
+        book = Book("Title", None, [Chapter([Block("#1 Bestseller", level=2)])])
+        write_notebooklm_markdown(book, self.output_path, TIMESTAMP)
+        self.assertTrue(self.read().endswith("\n\n## #1 Bestseller"))
+
+
+if __name__ == '__main__':
+    unittest.main()
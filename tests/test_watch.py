@@ -0,0 +1,71 @@
+"""
+Tests for the watch-folder mode
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+# Add src directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from epub_fixtures import chapter_html, write_epub
+from notebooklm_converter.watch import FolderWatcher
+
+
+class TestFolderWatcher(unittest.TestCase):
+    """Test settling, incremental conversion and the state file"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.inbox = os.path.join(self.temp_dir.name, "inbox")
+        self.out_dir = os.path.join(self.temp_dir.name, "out")
+        os.makedirs(os.path.join(self.inbox, "sub"))
+        self.add_book("a.epub", "First.")
+        self.add_book(os.path.join("sub", "b.epub"), "Second.")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def add_book(self, name, paragraph):
+        write_epub(os.path.join(self.inbox, name), [("c1.xhtml", chapter_html("One", [paragraph]))])
+
+    def watcher(self, settle=0):
+        results = []
+        watcher = FolderWatcher(self.inbox, ["TXT"], out_dir=self.out_dir, settle=settle,
+                                interval=0.05, on_result=results.append)
+        return watcher, results
+
+    def test_waits_for_files_to_settle(self):
+        """A file is ready only after staying unchanged for the settle time"""
+        watcher, _ = self.watcher(settle=5)
+        self.assertEqual(watcher.scan(now=0), [])
+        self.assertEqual(watcher.scan(now=4), [])
+        self.add_book("a.epub", "Still being written, and longer.")
+        self.assertEqual([name for name, _ in watcher.scan(now=6)], [os.path.join("sub", "b.epub")])
+        self.assertEqual([name for name, _ in watcher.scan(now=11)], ["a.epub", os.path.join("sub", "b.epub")])
+
+    def test_restart_skips_finished_work(self):
+        """Converted books are recorded; only new or changed ones are converted after a restart"""
+        watcher, results = self.watcher()
+        self.assertEqual(watcher.run(once=True), 0)
+        self.assertEqual(sorted(os.path.basename(r.input_path) for r in results), ["a.epub", "b.epub"])
+        self.assertTrue(os.path.exists(os.path.join(self.out_dir, "sub", "b_NotebookLM.txt")))
+
+        watcher, results = self.watcher()
+        watcher.run(once=True)
+        self.assertEqual(results, [])
+
+        self.add_book("a.epub", "Changed, so converted again.")
+        self.add_book("c.epub", "New.")
+        watcher, results = self.watcher()
+        watcher.run(once=True)
+        self.assertEqual(sorted(os.path.basename(r.input_path) for r in results), ["a.epub", "c.epub"])
+        with open(os.path.join(self.out_dir, "a_NotebookLM.txt"), encoding='utf-8') as f:
+            self.assertIn("Changed, so converted again.", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()